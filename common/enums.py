@@ -17,3 +17,32 @@ STATUS_CHOICES = (
     ("O", "Ongoing"),
     ("C", "Completed"),
 )
+
+ASSIGNMENT_STATUS_CHOICES = (
+    ("A", "Assigned"),
+    ("S", "Submitted"),
+    ("R", "Reviewed"),
+)
+
+EVENT_CHOICES = (
+    ("task_assigned", "Task assigned"),
+    ("task_unassigned", "Task unassigned"),
+    ("task_updated", "Task updated"),
+    ("submission_graded", "Submission graded"),
+)
+
+TOMBSTONE_CHOICES = (
+    ("task", "Task"),
+    ("submission", "Submission"),
+)
+
+DELIVERY_STATUS_CHOICES = (
+    ("P", "Pending"),
+    ("D", "Delivered"),
+    ("F", "Failed"),
+)
+
+ROLLUP_GRANULARITY_CHOICES = (
+    ("H", "Hourly"),
+    ("D", "Daily"),
+)
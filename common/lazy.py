@@ -0,0 +1,23 @@
+from functools import wraps
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """
+    Url callback importing `dotted_path` and calling `as_view` on first use.
+
+    Keeps rarely hit views, such as the API docs, from being imported by every
+    worker while the url configuration loads.
+    """
+    resolved = []
+
+    def view(request, *args, **kwargs):
+        if not resolved:
+            resolved.append(import_string(dotted_path).as_view(**initkwargs))
+        return resolved[0](request, *args, **kwargs)
+
+    module, _, name = dotted_path.rpartition(".")
+    view.__module__ = module
+    view.__name__ = view.__qualname__ = name
+    view.csrf_exempt = True
+    return view
@@ -0,0 +1,185 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from common.routers import end_replica_reads, replica_alias, start_replica_reads
+
+logger = logging.getLogger("common.sql")
+
+
+def token_user_id(request):
+    """User id carried by the request's JWT, validated without a query."""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    if header is None:
+        return None
+    raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+    return str(token.get(settings.SIMPLE_JWT.get("USER_ID_CLAIM", "user_id")))
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Serves safe requests to the routes in `REPLICA_READ_ROUTES` from the
+    read replica.
+
+    A successful write pins its user to the primary for
+    `REPLICA_PIN_SECONDS`, so the reads right after it see the change even
+    when the replica has not caught up yet. Pins live in the cache shared
+    by the workers, so the next read is pinned whichever worker serves it.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.routes = set(getattr(settings, "REPLICA_READ_ROUTES", []))
+        self.pin_seconds = getattr(settings, "REPLICA_PIN_SECONDS", 5)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        token = getattr(request, "_replica_token", None)
+        if token is not None:
+            end_replica_reads(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            self.pin(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if replica_alias() is None:
+            return None
+        if request.method not in SAFE_METHODS:
+            return None
+        if request.resolver_match.url_name not in self.routes:
+            return None
+        user_id = token_user_id(request)
+        if user_id is not None and cache.get(self.pin_key(user_id)):
+            return None
+        request._replica_token = start_replica_reads()
+        return None
+
+    def pin(self, request):
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            user_id = str(user.pk)
+        else:
+            user_id = token_user_id(request)
+        if user_id is not None:
+            cache.set(self.pin_key(user_id), True, self.pin_seconds)
+
+    def pin_key(self, user_id):
+        return f"replica-pin:{user_id}"
+
+
+class QueryStats:
+    """`execute_wrapper` callable counting and timing every query it sees."""
+
+    def __init__(self, slow_query_ms):
+        self.slow_query_ms = slow_query_ms
+        self.count = 0
+        self.duration = 0.0
+        self.slow = []
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.count += 1
+            self.duration += elapsed
+            self.statements[sql] += 1
+            if elapsed >= self.slow_query_ms:
+                self.slow.append((elapsed, sql))
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Counts and times the SQL run by each request.
+
+    Adds a `Server-Timing` header (db, render, app and total time) and logs
+    slow queries, slow requests and requests running more than
+    `MAX_QUERIES` queries, with the view name. Configured through
+    `SQL_INSTRUMENTATION`; when disabled the middleware removes itself.
+    """
+
+    def __init__(self, get_response):
+        config = getattr(settings, "SQL_INSTRUMENTATION", {})
+        if not config.get("ENABLED"):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_query_ms = config.get("SLOW_QUERY_MS", 100)
+        self.slow_request_ms = config.get("SLOW_REQUEST_MS", 500)
+        self.max_queries = config.get("MAX_QUERIES", 30)
+        self.server_timing = config.get("SERVER_TIMING", True)
+
+    def __call__(self, request):
+        stats = QueryStats(self.slow_query_ms)
+        request._render_timing = [0.0, 0.0]
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(stats))
+            response = self.get_response(request)
+        total = (time.perf_counter() - started) * 1000
+        render = (request._render_timing[1] - request._render_timing[0]) * 1000
+        if self.server_timing:
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={stats.duration:.2f};desc="{stats.count} queries"',
+                    f'render;dur={render:.2f};desc="serialize response"',
+                    f"app;dur={max(total - stats.duration - render, 0):.2f}",
+                    f"total;dur={total:.2f}",
+                ]
+            )
+        self.log(request, stats, total)
+        return response
+
+    def process_template_response(self, request, response):
+        timing = request._render_timing
+        timing[0] = timing[1] = time.perf_counter()
+
+        def rendered(response):
+            timing[1] = time.perf_counter()
+
+        response.add_post_render_callback(rendered)
+        return response
+
+    def log(self, request, stats, total):
+        match = request.resolver_match
+        view = match.view_name if match else request.path
+        for elapsed, sql in stats.slow:
+            logger.warning("Slow query %.1f ms in %s: %s", elapsed, view, sql[:1000])
+        if stats.count > self.max_queries:
+            sql, repeats = stats.statements.most_common(1)[0]
+            logger.warning(
+                "%s %s ran %d queries in %.1f ms; most repeated (%dx): %s",
+                request.method,
+                view,
+                stats.count,
+                stats.duration,
+                repeats,
+                sql[:1000],
+            )
+        if total >= self.slow_request_ms:
+            logger.warning(
+                "Slow request %s %s: %.1f ms total, %d queries in %.1f ms",
+                request.method,
+                view,
+                total,
+                stats.count,
+                stats.duration,
+            )
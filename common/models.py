@@ -1,10 +1,11 @@
 from django.db import models
-from uuid import uuid4
+
+from common.utils import uuid7
 
 
 class CommonInfo(models.Model):
     id = models.UUIDField(
-        primary_key=True, default=uuid4, editable=False, db_index=True
+        primary_key=True, default=uuid7, editable=False, db_index=True
     )
     created_at = models.DateTimeField("Created at", auto_now_add=True, db_index=True)
     creator = models.ForeignKey(
@@ -0,0 +1,16 @@
+from importlib import import_module
+
+from django.conf import settings
+from drf_spectacular.generators import SchemaGenerator as BaseSchemaGenerator
+
+
+class SchemaGenerator(BaseSchemaGenerator):
+    """
+    Imports the modules listed in `SCHEMA_ANNOTATION_MODULES` before any view
+    is inspected, so `extend_schema` blocks only load when a schema is built.
+    """
+
+    def _initialise_endpoints(self):
+        for module in getattr(settings, "SCHEMA_ANNOTATION_MODULES", []):
+            import_module(module)
+        super()._initialise_endpoints()
@@ -1,3 +1,6 @@
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
 from rest_framework.pagination import PageNumberPagination
 from rest_framework.response import Response
 
@@ -18,3 +21,16 @@ class CustomPagination(PageNumberPagination):
                 },
             }
         )
+
+
+class CappedPaginator(Paginator):
+    """
+    Paginator for admin changelists that stops counting at ADMIN_COUNT_CAP
+    rows, so a page of a large table does not pay for a full COUNT(*).
+    Rows past the cap are reached by filtering or searching.
+    """
+
+    @cached_property
+    def count(self):
+        cap = settings.ADMIN_COUNT_CAP
+        return self.object_list[:cap].count()
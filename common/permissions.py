@@ -1,29 +1,34 @@
+import functools
+
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework import permissions
 
 from common import exceptions
+from common.enums import ROLE_CHOICES
 
+ROLE_LABELS = {
+    **dict(ROLE_CHOICES),
+    "HR": "HUMAN RESOURCE",
+}
+# One bit per role, so a set of allowed roles is a single int.
+ROLE_BITS = {role: 1 << index for index, role in enumerate(ROLE_LABELS)}
+ANY_ROLE = "*"
+ALL_ROLES = sum(ROLE_BITS.values())
+NO_ROLES = {}
 
-class IsAuthenticated(permissions.BasePermission):
-    def has_permission(self, request, view):
-        user = request.user
-        if not user.is_anonymous:
-            if user.is_blocked:
-                raise exceptions.UnprocessableEntityException(
-                    detail={
-                        "title": "Account Blocked",
-                        "message": "Accout Blocked",
-                    },
-                    code=417,
-                )
-            if not user.is_active:
-                raise exceptions.UnprocessableEntityException(
-                    detail={
-                        "title": "Account Inactive",
-                        "message": "Account Not Active",
-                    },
-                    code=406,
-                )
-            return True
+
+def role_mask(roles):
+    if roles == ANY_ROLE or ANY_ROLE in roles:
+        return ALL_ROLES
+    return sum(ROLE_BITS[role] for role in set(roles))
+
+
+def role_bit(user):
+    return ROLE_BITS.get(getattr(user, "role", None), 0)
+
+
+def check_account(user):
+    if user.is_anonymous:
         raise exceptions.UnprocessableEntityException(
             detail={
                 "title": "UnAuthenticated",
@@ -31,186 +36,176 @@ class IsAuthenticated(permissions.BasePermission):
             },
             code=401,
         )
-
-    def has_object_permission(self, request, view, obj):
-        return super().has_object_permission(request, view, obj)
-
-
-class IsAuthenticatedOrReadOnly(permissions.BasePermission):
-    """
-    The user is authenticated as a user or is a read-only request.
-    """
-
-    def has_permission(self, request, view):
-        flag = bool(
-            request.method in permissions.SAFE_METHODS
-            or (request.user and request.user.is_authenticated)
+    if user.is_blocked:
+        raise exceptions.UnprocessableEntityException(
+            detail={
+                "title": "Account Blocked",
+                "message": "Accout Blocked",
+            },
+            code=417,
+        )
+    if not user.is_active:
+        raise exceptions.UnprocessableEntityException(
+            detail={
+                "title": "Account Inactive",
+                "message": "Account Not Active",
+            },
+            code=406,
         )
-        if not flag:
-            raise exceptions.UnprocessableEntityException(
-                detail={
-                    "title": "Authenticated",
-                    "message": f"Not Authenticated for {request.method} request",
-                },
-                code=401,
-            )
-        return flag
 
 
-class IsAdmin(permissions.BasePermission):
-    def has_permission(self, request, view):
-        flag = False
-        try:
-            flag = bool(request.user.role == "A")
-        except:
-            pass
-        if not flag:
-            raise exceptions.UnprocessableEntityException(
-                detail={
-                    "title": "Unauthenticated",
-                    "message": "Not authenticated for admin request",
-                },
-                code=401,
-            )
-        return flag
+@functools.lru_cache(maxsize=None)
+def denied_message(mask):
+    labels = [
+        ROLE_LABELS[role].lower() for role, bit in ROLE_BITS.items() if mask & bit
+    ]
+    if mask == ALL_ROLES:
+        labels = ["authenticated"]
+    elif not labels:
+        labels = ["this"]
+    return "Not authenticated for {} request".format(" or ".join(labels))
 
-    def has_object_permission(self, request, view, obj):
-        return True
 
+def role_denied(mask):
+    raise exceptions.UnprocessableEntityException(
+        detail={
+            "title": "Unauthenticated",
+            "message": denied_message(mask),
+        },
+        code=401,
+    )
 
-class IsSuperAdmin(permissions.BasePermission):
-    def has_permission(self, request, view):
-        flag = False
-        try:
-            flag = bool(request.user.role == "SA")
-        except:
-            pass
-        if not flag:
-            raise exceptions.UnprocessableEntityException(
-                detail={
-                    "title": "Unauthenticated",
-                    "message": "Not authenticated for superadmin request",
-                },
-                code=401,
-            )
-        return flag
 
-    def has_object_permission(self, request, view, obj):
-        return True
+class PermissionMatrix:
+    """
+    Declarative (view, method) -> allowed roles table, compiled to bitmasks.
+
+    Views are keyed by url name. `HEAD` follows `GET` and `OPTIONS` is open
+    to every role allowed some method of the view; anything not listed is
+    denied. `bind()` hands every view class its {method: mask} table when
+    the urlconf is loaded, so a check is one lookup and one `&`. Views open
+    to every role check the account status instead, as `IsAuthenticated`
+    did.
+    """
 
+    def __init__(self, table):
+        self.views = {}
+        for view_name, methods in table.items():
+            masks = {
+                method.upper(): role_mask(roles) for method, roles in methods.items()
+            }
+            union = 0
+            for mask in masks.values():
+                union |= mask
+            masks.setdefault("HEAD", masks.get("GET", 0))
+            masks.setdefault("OPTIONS", union)
+            self.views[view_name] = masks
+
+    def allowed_mask(self, view_name, method):
+        return self.views.get(view_name, {}).get(method, 0)
+
+    def bind(self, urlpatterns):
+        """Set `role_masks` on the view class of every url in the table."""
+        for pattern in urlpatterns:
+            masks = self.views.get(pattern.name)
+            view_class = getattr(pattern.callback, "view_class", None)
+            if masks is None or view_class is None:
+                continue
+            bound = view_class.__dict__.get("role_masks")
+            if bound is not None and bound is not masks:
+                raise ImproperlyConfigured(
+                    f"{view_class.__name__} is routed under two url names."
+                )
+            view_class.role_masks = masks
+
+    def permission_class(self):
+        class RolePermission(permissions.BasePermission):
+            def has_permission(self, request, view):
+                try:
+                    mask = view.role_masks[request.method]
+                    if mask != ALL_ROLES and ROLE_BITS[request.user.role] & mask:
+                        return True
+                except (AttributeError, KeyError):
+                    # No role (anonymous) or no mask (view or method unlisted).
+                    mask = getattr(view, "role_masks", NO_ROLES).get(request.method, 0)
+                if mask != ALL_ROLES:
+                    role_denied(mask)
+                # What IsAuthenticated checked on views open to everyone. Role
+                # views only ever checked the role.
+                check_account(request.user)
+                return True
+
+            def has_object_permission(self, request, view, obj):
+                return True
+
+        return RolePermission
+
+
+def role_permission(*roles):
+    """Permission class admitting `roles`, for views outside a matrix."""
+    mask = role_mask(roles)
+
+    class RolePermission(permissions.BasePermission):
+        def has_permission(self, request, view):
+            if mask != ALL_ROLES and not role_bit(request.user) & mask:
+                role_denied(mask)
+            return True
 
-class IsSuperAdminOrAdmin(permissions.BasePermission):
-    def has_permission(self, request, view):
-        flag = False
-        try:
-            flag = bool(request.user.role == "A" or request.user.role == "SA")
-        except:
-            pass
-        if not flag:
-            raise exceptions.UnprocessableEntityException(
-                detail={
-                    "title": "Unauthenticated",
-                    "message": "Not authenticated for super admin request",
-                },
-                code=401,
-            )
-        return flag
+        def has_object_permission(self, request, view, obj):
+            return True
 
-    def has_object_permission(self, request, view, obj):
-        return True
+    return RolePermission
 
 
-class IsIntern(permissions.BasePermission):
+class IsAuthenticated(permissions.BasePermission):
     def has_permission(self, request, view):
-        flag = False
-        try:
-            flag = bool(request.user.role == "I")
-        except:
-            pass
-        if not flag:
-            raise exceptions.UnprocessableEntityException(
-                detail={
-                    "title": "Unauthenticated",
-                    "message": "Not authenticated for Intern request",
-                },
-                code=401,
-            )
-        return flag
-
-    def has_object_permission(self, request, view, obj):
+        check_account(request.user)
         return True
 
-
-class IsSupervisor(permissions.BasePermission):
-    def has_permission(self, request, view):
-        flag = False
-        try:
-            flag = bool(request.user.role == "S")
-        except:
-            pass
-        if not flag:
-            raise exceptions.UnprocessableEntityException(
-                detail={
-                    "title": "Unauthenticated",
-                    "message": "Not authenticated for supervisor request",
-                },
-                code=401,
-            )
-        return flag
-
     def has_object_permission(self, request, view, obj):
-        return True
+        return super().has_object_permission(request, view, obj)
+
 
+class IsAuthenticatedOrReadOnly(permissions.BasePermission):
+    """
+    The user is authenticated as a user or is a read-only request.
+    """
 
-class IsHumanResource(permissions.BasePermission):
     def has_permission(self, request, view):
-        flag = False
-        try:
-            flag = bool(request.user.role == "HR")
-        except:
-            pass
+        flag = bool(
+            request.method in permissions.SAFE_METHODS
+            or (request.user and request.user.is_authenticated)
+        )
         if not flag:
             raise exceptions.UnprocessableEntityException(
                 detail={
-                    "title": "Unauthenticated",
-                    "message": "Not authenticated for human resource request",
+                    "title": "Authenticated",
+                    "message": f"Not Authenticated for {request.method} request",
                 },
                 code=401,
             )
         return flag
 
-    def has_object_permission(self, request, view, obj):
-        return True
+
+IsAdmin = role_permission("A")
+IsSuperAdmin = role_permission("SA")
+IsSuperAdminOrAdmin = role_permission("A", "SA")
+IsIntern = role_permission("I")
+IsSupervisor = role_permission("S")
+IsHumanResource = role_permission("HR")
+IsInternOrSupervisor = role_permission("S", "I")
 
 
 def method_permission_classes(classes):
+    """Check `classes` for one handler without touching the view's own."""
+
     def decorator(func):
         def decorated_func(self, *args, **kwargs):
-            self.permission_classes = classes
-            self.check_permissions(self.request)
+            for permission in classes:
+                if not permission().has_permission(self.request, self):
+                    self.permission_denied(self.request)
             return func(self, *args, **kwargs)
 
         return decorated_func
 
     return decorator
-
-
-class IsInternOrSupervisor(permissions.BasePermission):
-    def has_permission(self, request, view):
-        flag = False
-        try:
-            flag = bool(request.user.role == "S" or request.user.role == "I")
-        except:
-            pass
-        if not flag:
-            raise exceptions.UnprocessableEntityException(
-                detail={
-                    "title": "Unauthenticated",
-                    "message": "Not authenticated for HR Supervisor request",
-                },
-                code=401,
-            )
-        return flag
-
-    def has_object_permission(self, request, view, obj):
-        return True
@@ -0,0 +1,211 @@
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db import models
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from common.exceptions import UnprocessableEntityException
+
+# DRF fields whose representation of a database value is the value itself.
+PASSTHROUGH_FIELDS = (
+    serializers.BooleanField,
+    serializers.CharField,
+    serializers.ChoiceField,
+    serializers.IntegerField,
+)
+# Placeholder converter, bound to the active time zone per page.
+DATETIME = "datetime"
+
+
+def to_str(value):
+    return str(value)
+
+
+def iso_datetime(tz):
+    """Same output as DRF's DateTimeField in ISO 8601 mode, for aware values."""
+
+    if tz is None or tz is dt_timezone.utc or getattr(tz, "key", None) == "UTC":
+        # Values come back from the database in UTC already.
+        def convert(value):
+            value = value.isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    else:
+
+        def convert(value):
+            value = value.astimezone(tz).isoformat()
+            return value[:-6] + "Z" if value.endswith("+00:00") else value
+
+    return convert
+
+
+class ValuesReader:
+    """
+    Read-only stand-in for `serializer_class` over `values_list()` rows.
+
+    The serializer's readable fields are compiled once into column indexes
+    and converters, so a page is serialized without building model
+    instances or running per-field DRF machinery. Many-to-many fields cost
+    one query per page. The output matches `serializer_class(many=True)`
+    once rendered to JSON, which keeps the OpenAPI schema, still generated
+    from `serializer_class`, accurate.
+    """
+
+    serializer_class = None
+
+    def __init__(self, fields=None, exclude=None):
+        """`fields`/`exclude` narrow the output, and the columns read, to a subset."""
+        cls = type(self)
+        if "_fields" not in cls.__dict__:
+            cls._compile()
+        selected = [
+            spec
+            for spec in cls._fields
+            if (fields is None or spec[0] in fields)
+            and (exclude is None or spec[0] not in exclude)
+        ]
+        # The pk always comes first, many-to-many links are keyed by it.
+        self.columns = [cls._pk]
+        self.plan = []
+        self.relations = []
+        for name, attname, convert, m2m in selected:
+            if m2m is not None:
+                self.relations.append((name, m2m))
+                self.plan.append((name, None, None))
+                continue
+            if attname not in self.columns:
+                self.columns.append(attname)
+            self.plan.append((name, self.columns.index(attname), convert))
+
+    @classmethod
+    def field_names(cls):
+        if "_fields" not in cls.__dict__:
+            cls._compile()
+        return [spec[0] for spec in cls._fields]
+
+    @classmethod
+    def _compile(cls):
+        model = cls.serializer_class.Meta.model
+        specs = []
+        for name, field in cls.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                raise ImproperlyConfigured(
+                    f"{cls.__name__} cannot read '{name}', it is not a "
+                    f"{model.__name__} field."
+                )
+            if isinstance(field, serializers.ManyRelatedField):
+                specs.append((name, None, None, model_field))
+            else:
+                converter = cls._converter(field, model_field)
+                specs.append((name, model_field.attname, converter, None))
+        cls._pk = model._meta.pk.attname
+        cls._fields = specs
+
+    @staticmethod
+    def _converter(field, model_field):
+        target = model_field.target_field if model_field.is_relation else model_field
+        if isinstance(target, models.UUIDField):
+            return to_str
+        if isinstance(field, serializers.DateTimeField):
+            output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+            if output_format and output_format.lower() == "iso-8601":
+                return DATETIME
+        elif isinstance(field, PASSTHROUGH_FIELDS) or model_field.is_relation:
+            return None
+        return field.to_representation
+
+    def project(self, queryset):
+        return queryset.values_list(*self.columns)
+
+    def related(self, pks):
+        """Per relation, a mapping of row pk to the related pks, in link order."""
+        groups = {}
+        for name, m2m in self.relations:
+            through = m2m.remote_field.through
+            source = through._meta.get_field(m2m.m2m_field_name()).attname
+            target = through._meta.get_field(m2m.m2m_reverse_field_name()).attname
+            convert = self._converter(
+                serializers.PrimaryKeyRelatedField(read_only=True),
+                m2m.target_field,
+            )
+            links = defaultdict(list)
+            rows = (
+                through._default_manager.filter(**{f"{source}__in": pks})
+                .order_by(through._meta.pk.attname)
+                .values_list(source, target)
+            )
+            for owner, value in rows:
+                links[owner].append(convert(value) if convert else value)
+            groups[name] = links
+        return groups
+
+    def serialize(self, rows):
+        rows = list(rows)
+        groups = self.related([row[0] for row in rows]) if self.relations else {}
+        tz = timezone.get_current_timezone() if settings.USE_TZ else None
+        to_datetime = iso_datetime(tz)
+        plan = [
+            (name, index, to_datetime if convert is DATETIME else convert)
+            for name, index, convert in self.plan
+        ]
+        data = []
+        for row in rows:
+            item = {}
+            for name, index, convert in plan:
+                if index is None:
+                    item[name] = groups[name].get(row[0], [])
+                    continue
+                value = row[index]
+                if convert is not None and value is not None:
+                    value = convert(value)
+                item[name] = value
+            data.append(item)
+        return data
+
+
+class ValuesListMixin:
+    """List action that serializes through `reader_class` instead of instances."""
+
+    reader_class = None
+
+    def get_reader(self):
+        """Reader narrowed by the `?fields=` and `?exclude=` query parameters."""
+        params = self.request.query_params
+        available = self.reader_class.field_names()
+        selection = {}
+        for param in ("fields", "exclude"):
+            value = params.get(param)
+            if value is None:
+                continue
+            names = [name.strip() for name in value.split(",") if name.strip()]
+            if not names:
+                continue
+            unknown = [name for name in names if name not in available]
+            if unknown:
+                raise UnprocessableEntityException(
+                    {
+                        "title": "Fields",
+                        "message": "Unknown field(s) {} in {}. Choose from {}.".format(
+                            ", ".join(unknown), param, ", ".join(available)
+                        ),
+                    }
+                )
+            selection[param] = set(names)
+        return self.reader_class(**selection)
+
+    def list(self, request, *args, **kwargs):
+        reader = self.get_reader()
+        queryset = reader.project(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(reader.serialize(page))
+        return Response(reader.serialize(queryset))
@@ -0,0 +1,124 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+_read_from_replica = ContextVar("read_from_replica", default=False)
+_shard = ContextVar("shard", default=None)
+
+
+def start_replica_reads():
+    """Send ORM reads to the replica until `end_replica_reads(token)`."""
+    return _read_from_replica.set(True)
+
+
+def end_replica_reads(token):
+    _read_from_replica.reset(token)
+
+
+@contextmanager
+def replica_reads():
+    token = start_replica_reads()
+    try:
+        yield
+    finally:
+        end_replica_reads(token)
+
+
+def replica_alias():
+    alias = getattr(settings, "REPLICA_DATABASE", None)
+    if alias and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+class ReplicaRouter:
+    """
+    Routes reads made under `replica_reads()` to `REPLICA_DATABASE`.
+
+    Every other query, and every write, stays on the primary. The replica is
+    a copy of the primary, so it is never migrated on its own.
+    """
+
+    def db_for_read(self, model, **hints):
+        if _read_from_replica.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {"default", replica_alias()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == replica_alias():
+            return False
+        return None
+
+
+def start_shard(alias):
+    """Send ORM queries for tenant models to `alias` until `end_shard(token)`."""
+    return _shard.set(alias)
+
+
+def end_shard(token):
+    _shard.reset(token)
+
+
+@contextmanager
+def use_shard(alias):
+    token = start_shard(alias)
+    try:
+        yield
+    finally:
+        end_shard(token)
+
+
+def shard_alias():
+    """The shard the current request or `use_shard()` block works on."""
+    return _shard.get() or "default"
+
+
+def shard_aliases():
+    return [
+        alias
+        for alias in getattr(settings, "SHARD_DATABASES", ["default"])
+        if alias in settings.DATABASES
+    ]
+
+
+def is_catalog(app_label, model_name):
+    return f"{app_label}.{model_name}" in settings.SHARD_CATALOG_MODELS
+
+
+class ShardRouter:
+    """
+    Routes tenant models to the shard chosen by `use_shard()`, and catalog
+    models (`SHARD_CATALOG_MODELS`) to the default database.
+
+    Without a shard, or on the default one, routing is left to the routers
+    after this one, so the default shard still reads from the replica.
+    Catalog tables are only created on the default database.
+    """
+
+    def db_for_read(self, model, **hints):
+        if is_catalog(model._meta.app_label, model._meta.model_name):
+            return "default"
+        alias = _shard.get()
+        if alias and alias != "default":
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        if is_catalog(model._meta.app_label, model._meta.model_name):
+            return "default"
+        return _shard.get()
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if model_name and is_catalog(app_label, model_name) and db != "default":
+            return False
+        return None
@@ -0,0 +1,232 @@
+import gzip
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils.cache import patch_vary_headers
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+RENDERERS = {
+    "yaml": OpenApiYamlRenderer,
+    "json": OpenApiJsonRenderer,
+}
+
+
+def _iter_patterns(patterns, prefix=""):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _iter_patterns(
+                pattern.url_patterns, prefix + str(pattern.pattern)
+            )
+        elif isinstance(pattern, URLPattern):
+            callback = pattern.callback
+            view = getattr(callback, "view_class", None) or getattr(
+                callback, "cls", callback
+            )
+            yield "{}{} {}.{} {}".format(
+                prefix,
+                pattern.pattern,
+                getattr(view, "__module__", ""),
+                getattr(view, "__qualname__", repr(view)),
+                pattern.name or "",
+            )
+
+
+def _source_files():
+    for directory in getattr(settings, "SCHEMA_CACHE_SOURCE_DIRS", []):
+        yield from sorted(Path(directory).rglob("*.py"))
+
+
+def url_fingerprint():
+    """
+    Hash of the url configuration and of the project sources backing it.
+
+    Source files are included so a changed `extend_schema` block invalidates
+    the cache even when the routes themselves stay the same.
+    """
+    digest = hashlib.sha256()
+    digest.update(spectacular_settings.VERSION.encode())
+    for line in _iter_patterns(get_resolver().url_patterns):
+        digest.update(line.encode())
+    for path in _source_files():
+        try:
+            digest.update(path.read_bytes())
+        except OSError:
+            continue
+    return digest.hexdigest()[:32]
+
+
+class SchemaEntry:
+    def __init__(self, body):
+        self.body = body
+        self.gzipped = gzip.compress(body, compresslevel=9, mtime=0)
+        self.etag = '"{}"'.format(hashlib.sha256(body).hexdigest()[:32])
+        self.gzip_etag = '"{}-gz"'.format(self.etag.strip('"'))
+
+
+class SchemaCache:
+    """
+    Process wide cache of the rendered OpenAPI schema.
+
+    Rendered bytes live in memory and under `SCHEMA_CACHE_DIR`, keyed by the
+    url fingerprint, so a new worker picks up the file written by the
+    `generate_schema` command instead of introspecting every view again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fingerprint = None
+        self._entries = {}
+
+    @property
+    def directory(self):
+        return Path(settings.SCHEMA_CACHE_DIR)
+
+    @property
+    def fingerprint(self):
+        if self._fingerprint is None:
+            self._fingerprint = url_fingerprint()
+        return self._fingerprint
+
+    def path_for(self, fmt):
+        return self.directory / f"schema-{self.fingerprint}.{fmt}"
+
+    def get(self, fmt):
+        entry = self._entries.get(fmt)
+        if entry is not None:
+            return entry
+        with self._lock:
+            entry = self._entries.get(fmt)
+            if entry is None:
+                entry = self._load(fmt) or self._build(fmt)
+                self._entries[fmt] = entry
+        return entry
+
+    def generate(self, formats=None):
+        """Render every format, write it to disk and drop stale files."""
+        with self._lock:
+            self._fingerprint = url_fingerprint()
+            self._entries = {}
+            schema = self._generate_schema()
+            for fmt in formats or RENDERERS:
+                self._entries[fmt] = self._write(fmt, self._render(fmt, schema))
+            self._prune()
+        return self._entries
+
+    def clear(self):
+        with self._lock:
+            self._fingerprint = None
+            self._entries = {}
+
+    def _generate_schema(self):
+        generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(
+            urlconf=spectacular_settings.SERVE_URLCONF
+        )
+        return generator.get_schema(
+            request=None, public=spectacular_settings.SERVE_PUBLIC
+        )
+
+    def _render(self, fmt, schema):
+        return RENDERERS[fmt]().render(schema, renderer_context={})
+
+    def _load(self, fmt):
+        try:
+            body = self.path_for(fmt).read_bytes()
+        except OSError:
+            return None
+        return SchemaEntry(body)
+
+    def _build(self, fmt):
+        return self._write(fmt, self._render(fmt, self._generate_schema()))
+
+    def _write(self, fmt, body):
+        path = self.path_for(fmt)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{fmt}.{os.getpid()}.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+        return SchemaEntry(body)
+
+    def _prune(self):
+        current = {self.path_for(fmt).name for fmt in RENDERERS}
+        try:
+            paths = list(self.directory.glob("schema-*"))
+        except OSError:
+            return
+        for path in paths:
+            if path.name not in current:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+
+schema_cache = SchemaCache()
+
+
+def accepts_gzip(header):
+    """
+    Whether an Accept-Encoding header allows gzip: listed, or covered by
+    `*`, with a non-zero q-value.
+    """
+    quality = {}
+    for item in header.split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding:
+            quality[coding.lower()] = q
+    return quality.get("gzip", quality.get("*", 0.0)) > 0
+
+
+class CachedSpectacularAPIView(SpectacularAPIView):
+    """
+    `SpectacularAPIView` serving pre-rendered, pre-compressed schema bytes.
+
+    Responses carry a strong ETag so Swagger and Redoc revalidate with a 304
+    instead of downloading the document on every page load.
+    """
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        if self.urlconf is not None or self.custom_settings or self.patterns:
+            return super().get(request, *args, **kwargs)
+
+        renderer, media_type = self.perform_content_negotiation(request)
+        entry = schema_cache.get(renderer.format)
+        use_gzip = accepts_gzip(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        etag = entry.gzip_etag if use_gzip else entry.etag
+
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH", "")
+        if etag in [tag.strip() for tag in if_none_match.split(",")]:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                entry.gzipped if use_gzip else entry.body,
+                content_type=media_type,
+            )
+            if use_gzip:
+                response["Content-Encoding"] = "gzip"
+            response["Content-Disposition"] = 'inline; filename="{}.{}"'.format(
+                spectacular_settings.TITLE or "schema", renderer.format
+            )
+        response["ETag"] = etag
+        response["Cache-Control"] = "no-cache"
+        patch_vary_headers(response, ("Accept", "Accept-Encoding"))
+        return response
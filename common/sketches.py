@@ -0,0 +1,63 @@
+"""
+Mergeable histogram sketches for streaming percentiles.
+
+A sketch is a JSON object of bin -> count, so it can be stored in a
+JSONField, updated one value at a time and merged by adding counts. Bins
+are either exact values, for small integer domains such as scores, or
+logarithmic: every value in log bin i lies within RELATIVE_ACCURACY of
+the bin's representative value (the DDSketch layout).
+"""
+
+import math
+
+RELATIVE_ACCURACY = 0.02
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+
+def log_bin(value):
+    """Log bin of a non-negative value; values below 1 share bin 0."""
+    if value < 1:
+        return 0
+    return math.ceil(math.log(value) / LOG_GAMMA)
+
+
+def log_bin_value(index):
+    if index == 0:
+        return 0.0
+    return 2 * GAMMA**index / (GAMMA + 1)
+
+
+def add(sketch, index, count=1):
+    key = str(index)
+    count += sketch.get(key, 0)
+    if count:
+        sketch[key] = count
+    else:
+        sketch.pop(key, None)
+
+
+def merge(sketch, other):
+    for key, count in other.items():
+        add(sketch, key, count)
+
+
+def quantiles(sketch, qs, value=int):
+    """
+    The `qs` quantiles of `sketch`, each the value of the bin holding that
+    rank, or None for an empty sketch. `value` maps a bin to its value.
+    """
+    bins = sorted((int(key), count) for key, count in sketch.items() if count > 0)
+    total = sum(count for _, count in bins)
+    if not total:
+        return [None for _ in qs]
+    result = []
+    for q in qs:
+        rank = q * (total - 1)
+        seen = 0
+        for index, count in bins:
+            seen += count
+            if seen > rank:
+                result.append(value(index))
+                break
+    return result
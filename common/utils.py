@@ -1,6 +1,7 @@
 import re
 from django.utils.text import slugify
 import string, random, re
+import os, time, uuid
 
 
 def random_string_generator(size=10, chars=string.ascii_lowercase + string.digits):
@@ -65,3 +66,19 @@ def validate_uuid(id):
     if re.match(p, id):
         return True
     return False
+
+
+def uuid7():
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48 bits of Unix milliseconds,
+    12 bits of sub-millisecond time, then 62 random bits. Newer ids sort
+    after older ones, so inserts append to the primary key index and to the
+    foreign key indexes that reference it instead of landing on random pages.
+    """
+    milliseconds, nanoseconds = divmod(time.time_ns(), 1_000_000)
+    value = (milliseconds & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= (nanoseconds * 4096 // 1_000_000) << 64
+    value |= 0b10 << 62
+    value |= int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    return uuid.UUID(int=value)
@@ -9,8 +9,18 @@ https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "intern_management.settings")
 
 application = get_asgi_application()
+
+# What runserver does for the admin's static files.
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
+
+from internapp.search import warm_up  # noqa: E402
+
+warm_up()
@@ -14,7 +14,6 @@ from pathlib import Path
 from datetime import timedelta
 import os
 
-
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -49,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "common.middleware.QueryInstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -56,8 +56,30 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "internapp.tenants.ShardRoutingMiddleware",
+    "common.middleware.ReplicaRoutingMiddleware",
 ]
 
+# Per request query counts and timings, see QueryInstrumentationMiddleware.
+SQL_INSTRUMENTATION = {
+    "ENABLED": os.environ.get("SQL_INSTRUMENTATION", "1" if DEBUG else "0") == "1",
+    "SERVER_TIMING": True,
+    "SLOW_QUERY_MS": 100,
+    "SLOW_REQUEST_MS": 500,
+    "MAX_QUERIES": 30,
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "common": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
+
 ROOT_URLCONF = "intern_management.urls"
 
 TEMPLATES = [
@@ -82,13 +104,135 @@ WSGI_APPLICATION = "intern_management.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# common.db.sqlite3 applies its DEFAULT_PRAGMAS to every connection;
+# OPTIONS["pragmas"] overrides single entries. journal_mode=WAL is stored
+# in the database file itself, so the first connection switches a local
+# db.sqlite3 to WAL and git then shows it modified; leave that change out
+# of commits. The -wal and -shm files next to it are git-ignored.
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
+        "ENGINE": "common.db.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 600)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "transaction_mode": "IMMEDIATE",
+        },
+    }
+}
+
+# Optional read replica. Locally a second SQLite file kept in step with
+# `manage.py sync_replica` stands in for it.
+if os.environ.get("DB_REPLICA_NAME"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": os.environ["DB_REPLICA_NAME"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+# Tenant shards. Every organization lives in one database alias; DB_SHARDS
+# lists the extra aliases, kept locally as SQLite files next to the
+# default one. The default alias is a shard as well and also holds the
+# catalog of organizations. The shard tests need one, e.g.
+# `DB_SHARDS=test_shard python manage.py test`.
+SHARDS = [name for name in os.environ.get("DB_SHARDS", "").split(",") if name]
+for shard in SHARDS:
+    DATABASES[shard] = {
+        **DATABASES["default"],
+        "NAME": BASE_DIR / f"db_{shard}.sqlite3",
+    }
+SHARD_DATABASES = ["default", *SHARDS]
+# Slug of the organization that registrations without one join.
+DEFAULT_ORGANIZATION = "default"
+# Models kept on the default database whatever the shard.
+SHARD_CATALOG_MODELS = ["internapp.organization", "internapp.organizationmember"]
+# How long a worker caches which shard a user is on, and so how long a
+# tenant move waits for the workers to see it.
+SHARD_CACHE_SECONDS = 10
+
+# Shared by every worker on the host: replica pins and shard lookups set by
+# one worker must be seen by the others. Point it at Redis or Memcached
+# once workers run on more than one host.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.environ.get("CACHE_LOCATION", BASE_DIR / ".cache"),
     }
 }
 
+DATABASE_ROUTERS = ["common.routers.ShardRouter", "common.routers.ReplicaRouter"]
+REPLICA_DATABASE = "replica"
+# Safe requests to these routes read from the replica.
+REPLICA_READ_ROUTES = [
+    "task-list-intern",
+    "task-list-supervisor",
+    "submitted-task-list",
+    "archived-task-list",
+]
+# After a write its user reads from the primary for this many seconds.
+REPLICA_PIN_SECONDS = 5
+
+# `manage.py archive_tasks`: completed tasks untouched for this long move to
+# the archive tables, this many per transaction.
+ARCHIVE_AFTER_DAYS = 180
+ARCHIVE_BATCH_SIZE = 500
+
+# Notifications go through the outbox, delivered by
+# `manage.py deliver_notifications`. Locally they are written to files.
+EMAIL_BACKEND = os.environ.get(
+    "EMAIL_BACKEND", "django.core.mail.backends.filebased.EmailBackend"
+)
+EMAIL_FILE_PATH = BASE_DIR / "sent_emails"
+DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", "noreply@intern-apis.local")
+OUTBOX_BATCH_SIZE = 100
+# A claimed batch must be sent within this, or it is claimed again.
+OUTBOX_LEASE_SECONDS = 60
+OUTBOX_MAX_ATTEMPTS = 5
+# First retry delay, doubled on every further attempt.
+OUTBOX_RETRY_SECONDS = 30
+OUTBOX_RETENTION_DAYS = 7
+
+# `events/` server-sent events stream.
+SSE_HEARTBEAT_SECONDS = 15
+# How often a worker looks for events written by the other workers.
+SSE_POLL_SECONDS = 1.0
+# Streams are closed after this long; clients reconnect with Last-Event-ID.
+SSE_MAX_STREAM_SECONDS = 300
+# Reconnect delay sent to EventSource clients.
+SSE_RETRY_MS = 3000
+# How long a stream token from `events/token/` can open a stream for.
+SSE_TOKEN_SECONDS = 60
+EVENT_LOG_RETENTION_HOURS = 24
+
+# `sync/` delta endpoint. Changes younger than the settle window wait for
+# the next sync, so late committing transactions are not skipped.
+SYNC_PAGE_SIZE = 500
+SYNC_SETTLE_SECONDS = 2
+# Older sync tokens must start over, their tombstones may be purged.
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+
+# Most submissions one `submit-task-grade/` request may grade.
+BULK_GRADE_MAX_ITEMS = 200
+
+# Responses to POSTs with an `Idempotency-Key` header are replayed to
+# retries for this long. A retry waits up to IDEMPOTENCY_WAIT_SECONDS for
+# the first request to finish; a claim older than IDEMPOTENCY_LOCK_SECONDS
+# without a response is considered abandoned.
+IDEMPOTENCY_KEY_TTL_HOURS = 24
+IDEMPOTENCY_WAIT_SECONDS = 10
+IDEMPOTENCY_LOCK_SECONDS = 60
+
+# Admin changelists count at most this many rows.
+ADMIN_COUNT_CAP = 10000
+
+# `user-search/` typeahead. Each worker rebuilds its in-memory intern index
+# once it is this old, to pick up changes made by the other workers.
+USER_SEARCH_INDEX_TTL_SECONDS = 300
+USER_SEARCH_MAX_RESULTS = 20
+
+# `submission-report/` answers at most this many hourly or daily buckets.
+ROLLUP_REPORT_MAX_BUCKETS = 1000
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -154,8 +298,32 @@ SPECTACULAR_SETTINGS = {
     "DESCRIPTION": "Management All Apis",
     "VERSION": "1.0.0",
     "SERVE_INCLUDE_SCHEMA": False,
+    "DEFAULT_GENERATOR_CLASS": "common.openapi.SchemaGenerator",
 }
 
+# Cold start targets checked by `manage.py profile_startup --enforce`.
+STARTUP_BUDGET_MS = {
+    "apps.populate": 400,
+    "urlconf": 150,
+    "first request": 150,
+    "total": 1000,
+}
+
+# Modules holding `extend_schema` annotations, imported only when a schema
+# is generated.
+SCHEMA_ANNOTATION_MODULES = [
+    "internapp.api.schemas.accounts",
+]
+
+# Rendered OpenAPI schema, written by `manage.py generate_schema` or on the
+# first schema request. Sources listed here are part of the cache key.
+SCHEMA_CACHE_DIR = BASE_DIR / ".schema_cache"
+SCHEMA_CACHE_SOURCE_DIRS = [
+    BASE_DIR / "common",
+    BASE_DIR / "intern_management",
+    BASE_DIR / "internapp",
+]
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=1440),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=14),
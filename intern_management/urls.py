@@ -1,10 +1,6 @@
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularRedocView,
-    SpectacularSwaggerView,
-)
+from common.lazy import lazy_view
 from intern_management import settings
 from django.conf.urls.static import static
 from django.contrib.staticfiles.urls import staticfiles_urlpatterns
@@ -15,15 +11,25 @@ urlpatterns = [
         "api/v1/",
         include(
             [
-                path("doc/schema/", SpectacularAPIView.as_view(), name="schema"),
+                path(
+                    "doc/schema/",
+                    lazy_view("common.schema.CachedSpectacularAPIView"),
+                    name="schema",
+                ),
                 path(
                     "doc/",
-                    SpectacularSwaggerView.as_view(url_name="schema"),
+                    lazy_view(
+                        "drf_spectacular.views.SpectacularSwaggerView",
+                        url_name="schema",
+                    ),
                     name="swagger-ui",
                 ),
                 path(
                     "redoc/",
-                    SpectacularRedocView.as_view(url_name="schema"),
+                    lazy_view(
+                        "drf_spectacular.views.SpectacularRedocView",
+                        url_name="schema",
+                    ),
                     name="redoc",
                 ),
                 path("", include("internapp.urls")),
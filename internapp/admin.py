@@ -1,11 +1,175 @@
 from django.contrib import admin
+from django.db import transaction
+from django.utils import timezone
+
+from common.pagination import CappedPaginator
+from internapp import counters, events
+from internapp.archive import delete_tasks
+from internapp.search import user_index
 from internapp.models import (
     User,
+    Cohort,
     Task,
+    TaskAssignment,
     InternProfile,
     SupervisorProfile,
     SubmittedTask,
+    ArchivedTask,
+    ArchivedSubmission,
 )
 
-# Register your models here.
-admin.site.register([User, InternProfile, SupervisorProfile, Task, SubmittedTask])
+
+class CappedCountAdmin(admin.ModelAdmin):
+    """
+    Changelists count at most ADMIN_COUNT_CAP rows and skip the second,
+    unfiltered count.
+    """
+
+    paginator = CappedPaginator
+    show_full_result_count = False
+
+
+@admin.register(User)
+class UserAdmin(CappedCountAdmin):
+    list_display = [
+        "full_name",
+        "email",
+        "phone",
+        "role",
+        "is_active",
+        "is_blocked",
+        "joined_date",
+    ]
+    list_filter = ["role", "is_blocked"]
+    search_fields = ["^email", "^full_name", "^phone"]
+    ordering = ["-joined_date"]
+    readonly_fields = ["slug", "joined_date"]
+    exclude = ["password"]
+    actions = ["block_users", "unblock_users"]
+
+    @admin.action(description="Block selected users")
+    def block_users(self, request, queryset):
+        # Keep the admin from locking themselves out.
+        count = queryset.exclude(pk=request.user.pk).update(is_blocked=True)
+        # update() skips the receivers that keep the search index current.
+        user_index(queryset.db).invalidate()
+        self.message_user(request, f"Blocked {count} users.")
+
+    @admin.action(description="Unblock selected users")
+    def unblock_users(self, request, queryset):
+        count = queryset.update(is_blocked=False)
+        user_index(queryset.db).invalidate()
+        self.message_user(request, f"Unblocked {count} users.")
+
+
+class ProfileAdmin(CappedCountAdmin):
+    list_display = ["user", "contact_details"]
+    list_select_related = ["user"]
+    autocomplete_fields = ["user"]
+    search_fields = ["^user__email", "^user__full_name"]
+
+
+admin.site.register(InternProfile, ProfileAdmin)
+admin.site.register(SupervisorProfile, ProfileAdmin)
+
+
+@admin.register(Cohort)
+class CohortAdmin(CappedCountAdmin):
+    list_display = ["name", "creator", "created_at"]
+    list_select_related = ["creator"]
+    search_fields = ["^name"]
+    ordering = ["name"]
+    autocomplete_fields = ["members", "creator", "modifier"]
+
+
+class TaskAssignmentInline(admin.TabularInline):
+    """
+    Read-only: formset saves skip the m2m_changed receivers that keep the
+    counters, events and sync tombstones in step.
+    Assign interns through the API, or link cohorts on the task.
+    """
+
+    model = TaskAssignment
+    fields = ["user", "status", "deadline", "assigned_at"]
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Task)
+class TaskAdmin(CappedCountAdmin):
+    list_display = ["title", "creator", "status", "deadline", "created_at"]
+    list_select_related = ["creator"]
+    list_filter = ["status", "created_at"]
+    search_fields = ["^title"]
+    ordering = ["-created_at"]
+    autocomplete_fields = ["cohorts", "creator", "modifier"]
+    readonly_fields = counters.COUNTERS
+    inlines = [TaskAssignmentInline]
+    actions = ["close_tasks"]
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            return super().save_model(request, obj, form, change)
+        # The counters on obj were read when the form was loaded; a full save
+        # would undo the submissions and grades made since.
+        obj.save(
+            update_fields=[
+                field.name
+                for field in Task._meta.concrete_fields
+                if not field.primary_key and field.name not in counters.COUNTERS
+            ]
+        )
+
+    def delete_queryset(self, request, queryset):
+        # In bulk, with the tombstones, rather than a delete per row.
+        with transaction.atomic(using=queryset.db):
+            delete_tasks(list(queryset.values_list("pk", flat=True)), queryset.db)
+
+    @admin.action(description="Mark selected tasks completed")
+    def close_tasks(self, request, queryset):
+        tasks = {
+            task.pk: task
+            for task in queryset.select_related(None)
+            .exclude(status="C")
+            .only("title", "deadline")
+        }
+        count = Task.objects.filter(pk__in=tasks).update(
+            status="C", modified_at=timezone.now(), modifier=request.user
+        )
+        # update() skips the post_save receiver.
+        for task in tasks.values():
+            task.status = "C"
+        events.tasks_updated(tasks)
+        self.message_user(request, f"Completed {count} tasks.")
+
+
+@admin.register(SubmittedTask)
+class SubmittedTaskAdmin(CappedCountAdmin):
+    list_display = ["task", "creator", "score", "is_approved", "submission_date"]
+    # __str__ and the task column read the task's title.
+    list_select_related = ["task", "creator"]
+    list_filter = ["is_approved", "created_at"]
+    ordering = ["-created_at"]
+    autocomplete_fields = ["task", "creator", "modifier"]
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(CappedCountAdmin):
+    list_display = ["title", "creator", "status", "deadline", "archived_at"]
+    list_select_related = ["creator"]
+    search_fields = ["^title"]
+    ordering = ["-archived_at"]
+    autocomplete_fields = ["creator", "modifier"]
+
+
+@admin.register(ArchivedSubmission)
+class ArchivedSubmissionAdmin(CappedCountAdmin):
+    list_display = ["task", "creator", "score", "is_approved", "submission_date"]
+    list_select_related = ["task", "creator"]
+    list_filter = ["is_approved"]
+    ordering = ["-created_at"]
+    autocomplete_fields = ["task", "creator", "modifier"]
@@ -0,0 +1,511 @@
+"""
+OpenAPI annotations for the account and task views.
+
+Kept out of the viewsets module so request-serving workers never import
+drf-spectacular; `common.openapi.SchemaGenerator` imports this module right
+before the schema is generated.
+"""
+
+from drf_spectacular.utils import (
+    extend_schema,
+    extend_schema_view,
+    OpenApiResponse,
+    OpenApiExample,
+    OpenApiParameter,
+)
+
+from common.serializer import (
+    OperationError,
+    OperationSuccess,
+)
+from internapp.api.serializers.accounts import (
+    UserSerializer,
+    LoginSerializer,
+    TaskCreateSerializer,
+    TaskEditSerializer,
+    SubmitTaskSerializer,
+    SubmitTaskEditSerializer,
+    BulkGradeSerializer,
+)
+from internapp.api.serializers.readers import (
+    TaskReader,
+    SupervisorTaskReader,
+    SubmittedTaskReader,
+    ArchivedTaskReader,
+)
+from internapp.api.viewsets.accounts import (
+    UserViewSet,
+    LoginViewSet,
+    TaskCreateViewSet,
+    TaskListViewSet,
+    TaskEditViewSet,
+    SubmitTaskViewSet,
+    TaskSubmitListViewSet,
+    SubmitTaskEditViewSet,
+    SubmitTaskGradeViewSet,
+    TaskListInternViewSet,
+    ArchivedTaskListViewSet,
+    SyncViewSet,
+    UserSearchViewSet,
+    SubmissionReportViewSet,
+)
+from internapp.idempotency import KEY_HEADER
+
+IDEMPOTENCY_KEY_PARAMETER = OpenApiParameter(
+    name=KEY_HEADER,
+    type=str,
+    location=OpenApiParameter.HEADER,
+    description=(
+        "Unique key per logical request. Retries with the same key get the "
+        "first response back, marked with an Idempotent-Replayed header."
+    ),
+)
+
+
+def sparse_fields_parameters(reader_class):
+    choices = ", ".join(reader_class.field_names())
+    return [
+        OpenApiParameter(
+            name="fields",
+            type=str,
+            description=f"Comma separated fields to return, out of: {choices}.",
+        ),
+        OpenApiParameter(
+            name="exclude",
+            type=str,
+            description=f"Comma separated fields to leave out, out of: {choices}.",
+        ),
+    ]
+
+
+extend_schema_view(
+    post=extend_schema(
+        summary="Refer to Schema At Bottom",
+        parameters=[IDEMPOTENCY_KEY_PARAMETER],
+        examples=[
+            OpenApiExample(
+                name="Register as Intern",
+                request_only=True,
+                value={
+                    "role": "I",
+                    "email": "intern@example.com",
+                    "password": "securepassword",
+                    "full_name": "John Doe",
+                    "phone": "1234567890",
+                    "gender": "M",
+                    "profile_pic": "string",
+                    "date_of_birth": "1990-01-01",
+                    "contact_details": "Contact details here",
+                    "educational_background": "Educational background here",
+                    "work_experience": "3",
+                },
+            ),
+            OpenApiExample(
+                name="Register as Supervisor",
+                request_only=True,
+                value={
+                    "role": "S",
+                    "email": "supervisor@example.com",
+                    "password": "securepassword",
+                    "full_name": "Jane Smith",
+                    "phone": "9876543210",
+                    "gender": "F",
+                    "profile_pic": "string",
+                    "date_of_birth": "1985-05-15",
+                    "contact_details": "Contact details here",
+                    "educational_background": "Educational background here",
+                    "work_experience": "3",
+                },
+            ),
+        ],
+        description="Login Api",
+        request=UserSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response when user is registered successfully",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["User Unauthenticated Apis"],
+    ),
+)(UserViewSet)
+
+
+extend_schema_view(
+    post=extend_schema(
+        summary="Refer to Schema At Bottom",
+        examples=[
+            OpenApiExample(
+                name="Login by email-email",
+                request_only=True,
+                value={"email": "kingshahi163@gmail.com", "password": "HIGHspeed12@"},
+            ),
+            OpenApiExample(
+                name="Login by phone-phone",
+                request_only=True,
+                value={
+                    "phone": "9809461773",
+                    "password": "HIGHspeed12@",
+                },
+            ),
+        ],
+        description="Login Api",
+        request=LoginSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response when Loggedin successfully",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["User Unauthenticated Apis"],
+    ),
+)(LoginViewSet)
+
+
+extend_schema_view(
+    post=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        parameters=[IDEMPOTENCY_KEY_PARAMETER],
+        description="Task Create Apis",
+        request=TaskCreateSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response when task is created successfully",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Task Apis"],
+    ),
+)(TaskCreateViewSet)
+
+
+extend_schema_view(
+    get=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        parameters=sparse_fields_parameters(SupervisorTaskReader),
+        description="Task List Apis",
+        request=TaskCreateSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response when Task is listed successfully",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Dashboard Apis[Supervisor/Intern]"],
+    ),
+)(TaskListViewSet)
+
+
+extend_schema_view(
+    patch=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        description="Task Edit Apis",
+        request=TaskEditSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response when Task is edited successfully",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Task Apis"],
+    ),
+)(TaskEditViewSet)
+
+
+extend_schema_view(
+    post=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        parameters=[IDEMPOTENCY_KEY_PARAMETER],
+        description="Submit Task Apis",
+        request=SubmitTaskSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response when task is edited successfully",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Intern Apis"],
+    ),
+)(SubmitTaskViewSet)
+
+
+extend_schema_view(
+    get=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        parameters=sparse_fields_parameters(SubmittedTaskReader),
+        description="Submit Task List Apis",
+        request=SubmitTaskSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response when Submitted Task is listed successfully",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Intern Apis"],
+    ),
+)(TaskSubmitListViewSet)
+
+
+extend_schema_view(
+    patch=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        description="Submit Task Edit Apis",
+        request=SubmitTaskEditSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response when Submitted Task is edited successfully",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Intern Apis"],
+    ),
+)(SubmitTaskEditViewSet)
+
+
+extend_schema_view(
+    post=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        description=(
+            "Bulk Grade Apis. Every item gets a result with status graded, "
+            "invalid or not_found; the valid items are graded even when others "
+            "are not."
+        ),
+        request=BulkGradeSerializer,
+        examples=[
+            OpenApiExample(
+                name="Grade two submissions",
+                request_only=True,
+                value={
+                    "submissions": [
+                        {
+                            "id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                            "score": 8,
+                            "is_approved": True,
+                            "remarks": "Well done",
+                        },
+                        {
+                            "id": "9b2e7c1a-4d3f-4e8b-a6c5-0f1d2e3c4b5a",
+                            "score": 4,
+                            "is_approved": False,
+                        },
+                    ]
+                },
+            ),
+        ],
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response with one result per submission",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Intern Apis"],
+    ),
+)(SubmitTaskGradeViewSet)
+
+
+extend_schema_view(
+    get=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        parameters=sparse_fields_parameters(TaskReader),
+        description="Task List Apis",
+        request=TaskCreateSerializer,
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response when Task is listed successfully",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Dashboard Apis[Supervisor/Intern]"],
+    ),
+)(TaskListInternViewSet)
+
+
+extend_schema_view(
+    get=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        parameters=sparse_fields_parameters(ArchivedTaskReader),
+        description="Archived Task List Apis",
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response when Archived Task is listed successfully",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Dashboard Apis[Supervisor/Intern]"],
+    ),
+)(ArchivedTaskListViewSet)
+
+
+extend_schema_view(
+    get=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        parameters=[
+            OpenApiParameter(
+                name="since",
+                type=str,
+                description="The `next` token of the previous sync. Leave out for a full sync.",
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                description="Maximum rows per kind in one response.",
+            ),
+        ],
+        description=(
+            "Delta Sync Api. Apply the tombstones, then upsert the tasks and "
+            "submissions, and call again with `next` while `has_more` is true."
+        ),
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response with the changes since the token",
+            ),
+            410: OpenApiResponse(
+                response=OperationError,
+                description="Sync token expired, start a full sync!",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Dashboard Apis[Supervisor/Intern]"],
+    ),
+)(SyncViewSet)
+
+
+extend_schema_view(
+    get=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=str,
+                required=True,
+                description="Prefix of the full name, or of a later word of it, the email or the phone.",
+            ),
+            OpenApiParameter(
+                name="role",
+                type=str,
+                enum=["SA", "A", "U", "S", "I"],
+                description="Role of the users to search. Defaults to I.",
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                description="Maximum users in the response.",
+            ),
+        ],
+        description=(
+            "User Search Api, for picking contributors as you type. Active "
+            "interns are matched in memory; other roles by full name, email "
+            "or phone prefix."
+        ),
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response with the matching users",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Dashboard Apis[Supervisor/Intern]"],
+    ),
+)(UserSearchViewSet)
+
+
+extend_schema_view(
+    get=extend_schema(
+        summary="Refer to Schemas At Bottom",
+        parameters=[
+            OpenApiParameter(
+                name="task",
+                type=str,
+                description="Task to report on, live or archived. Give task or cohort.",
+            ),
+            OpenApiParameter(
+                name="cohort",
+                type=str,
+                description="Cohort whose tasks to report on, merged. Give task or cohort.",
+            ),
+            OpenApiParameter(
+                name="granularity",
+                type=str,
+                enum=["H", "D"],
+                description="Hourly or daily buckets. Defaults to D.",
+            ),
+            OpenApiParameter(
+                name="after",
+                type=str,
+                description="Start of the window. Defaults to 48 hours or 30 days before `before`.",
+            ),
+            OpenApiParameter(
+                name="before",
+                type=str,
+                description="End of the window. Defaults to now.",
+            ),
+        ],
+        description=(
+            "Submission Report Api, for supervisors. Submissions per hour or "
+            "day of submission, how many were late and by how long, and the "
+            "score averages and percentiles, read from the rollups."
+        ),
+        responses={
+            200: OpenApiResponse(
+                response=OperationSuccess,
+                description="Success Response with the buckets and their totals",
+            ),
+            422: OpenApiResponse(
+                response=OperationError,
+                description="Json Data Error, occurs when invalid data is sent!",
+            ),
+        },
+        tags=["Dashboard Apis[Supervisor/Intern]"],
+    ),
+)(SubmissionReportViewSet)
@@ -1,12 +1,20 @@
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
 from rest_framework import serializers
 
 from internapp.models import (
     User,
     InternProfile,
     SupervisorProfile,
+    Cohort,
     Task,
+    TaskAssignment,
     SubmittedTask,
+    ArchivedTask,
 )
+from internapp import counters, events, outbox, rollups, tenants
 from common.exceptions import UnprocessableEntityException
 from common.utils import (
     validate_email,
@@ -172,7 +180,9 @@ class UserSerializer(serializers.ModelSerializer):
                 }
             )
 
-        if User.objects.filter(phone=data.get("phone")).exists():
+        # Other organizations' users are on other shards, but in the directory.
+        phone, email = data.get("phone"), data.get("email")
+        if User.objects.filter(phone=phone).exists() or tenants.taken(phone=phone):
             raise UnprocessableEntityException(
                 {
                     "title": "Accounts",
@@ -180,7 +190,7 @@ class UserSerializer(serializers.ModelSerializer):
                 },
             )
 
-        if User.objects.filter(email=data.get("email")).exists():
+        if User.objects.filter(email=email).exists() or tenants.taken(email=email):
             raise UnprocessableEntityException(
                 {
                     "title": "Accounts",
@@ -301,6 +311,7 @@ class TaskCreateSerializer(serializers.ModelSerializer):
             "description",
             "deadline",
             "contributors",
+            "cohorts",
             "status",
             "creator",
         ]
@@ -315,6 +326,9 @@ class TaskCreateSerializer(serializers.ModelSerializer):
             "contributors": {
                 "read_only": True,
             },
+            "cohorts": {
+                "read_only": True,
+            },
             "creator": {
                 "read_only": True,
             },
@@ -350,14 +364,35 @@ class TaskCreateSerializer(serializers.ModelSerializer):
         return super().is_valid(raise_exception=raise_exception)
 
     def create(self, validated_data):
-        user = self.context["request"].user
-        instance = super().create(validated_data)
-        instance.creator = user
-        instance.save()
-        return instance
+        validated_data["creator"] = self.context["request"].user
+        return super().create(validated_data)
+
+
+class SupervisorTaskSerializer(TaskCreateSerializer):
+    """A supervisor's own tasks, with their submission counters."""
+
+    class Meta(TaskCreateSerializer.Meta):
+        fields = [
+            *TaskCreateSerializer.Meta.fields,
+            "assigned_count",
+            "submitted_count",
+            "approved_count",
+            "score_total",
+        ]
+        read_only_fields = [
+            "assigned_count",
+            "submitted_count",
+            "approved_count",
+            "score_total",
+        ]
 
 
 class TaskEditSerializer(serializers.ModelSerializer):
+    # Through-model M2M fields are read-only unless declared.
+    contributors = serializers.PrimaryKeyRelatedField(
+        many=True, queryset=User.objects.all(), allow_empty=False
+    )
+
     class Meta:
         model = Task
         fields = [
@@ -365,6 +400,7 @@ class TaskEditSerializer(serializers.ModelSerializer):
             "title",
             "description",
             "contributors",
+            "cohorts",
             "status",
         ]
 
@@ -417,21 +453,59 @@ class TaskEditSerializer(serializers.ModelSerializer):
                     }
                 )
 
-        return super().is_valid(raise_exception=raise_exception)
-
-    def update(self, instance, validated_data):
-        contributors_data = validated_data.pop("contributors", [])
-        task = super().update(instance, validated_data)
-        for contributor_id in contributors_data:
-            if contributor_id.role == "I":
-                task.contributors.add(contributor_id)
-            else:
+        for cohort in data.get("cohorts", []):
+            if not (
+                validate_uuid(cohort) and Cohort.objects.filter(id=cohort).exists()
+            ):
                 raise UnprocessableEntityException(
                     {
                         "title": "Task",
-                        "message": f"User with ID '{contributor_id}' is not intern role.Ony Intern can be assigned task",
+                        "message": f"Cohort with ID '{cohort}' does not exist.",
                     }
                 )
+
+        return super().is_valid(raise_exception=raise_exception)
+
+    def update(self, instance, validated_data):
+        contributors_data = validated_data.pop("contributors", [])
+        # Added to, like the contributors, rather than replaced.
+        cohorts = validated_data.pop("cohorts", [])
+        with transaction.atomic(using=router.db_for_write(Task)):
+            task = instance
+            for attr, value in validated_data.items():
+                setattr(task, attr, value)
+            # A full save would write back counters read before a submit.
+            task.save(update_fields=[*validated_data, "modified_at"])
+            linked = set(task.cohorts.values_list("id", flat=True))
+            task.cohorts.add(*cohorts)
+            assigned = set(task.contributors.values_list("id", flat=True))
+            for contributor_id in contributors_data:
+                if contributor_id.role == "I":
+                    task.contributors.add(
+                        contributor_id, through_defaults={"deadline": task.deadline}
+                    )
+                else:
+                    raise UnprocessableEntityException(
+                        {
+                            "title": "Task",
+                            "message": f"User with ID '{contributor_id}' is not intern role.Ony Intern can be assigned task",
+                        }
+                    )
+            notice = {
+                "task_id": task.pk,
+                "title": task.title,
+                "deadline": task.deadline,
+            }
+            outbox.record(
+                "task_assigned",
+                [user for user in contributors_data if user.pk not in assigned],
+                **notice,
+            )
+            outbox.record_cohorts(
+                "task_assigned",
+                [cohort for cohort in cohorts if cohort.pk not in linked],
+                **notice,
+            )
         return task
 
 
@@ -481,9 +555,8 @@ class SubmitTaskSerializer(serializers.ModelSerializer):
                     "message": "Task does not exist.",
                 }
             )
-        task = task.first()
-        user = self.context["request"].user.id
-        if user not in task.contributors.values_list("id", flat=True):
+        user = self.context["request"].user
+        if not task.assigned_to(user).exists():
             raise UnprocessableEntityException(
                 {
                     "title": "Submit Task",
@@ -504,9 +577,15 @@ class SubmitTaskSerializer(serializers.ModelSerializer):
                 }
             )
         else:
-            submitter = super().create(validated_data)
-            submitter.creator = user
-            submitter.save()
+            with transaction.atomic(using=router.db_for_write(SubmittedTask)):
+                submitter = super().create(validated_data)
+                submitter.creator = user
+                submitter.save()
+                TaskAssignment.objects.filter(task=task, user=user).update(status="S")
+                counters.add({task.pk: {"submitted_count": 1}})
+                changes = rollups.Changes()
+                changes.submitted(task.pk, submitter.submission_date, task.deadline)
+                changes.save()
             return submitter
 
 
@@ -533,7 +612,211 @@ class SubmitTaskEditSerializer(serializers.ModelSerializer):
 
     def update(self, instance, validated_data):
         validated_data["modifier"] = self.context["request"].user
-        instance = super().update(instance, validated_data)
-        instance.task.status = "O"
-        instance.task.save()
+        was_approved, old_score = instance.is_approved, instance.score
+        was_graded = instance.modifier_id is not None
+        with transaction.atomic(using=router.db_for_write(SubmittedTask)):
+            instance = super().update(instance, validated_data)
+            counters.add(
+                {
+                    instance.task_id: counters.grade_delta(
+                        was_approved, old_score, instance
+                    )
+                }
+            )
+            changes = rollups.Changes()
+            changes.graded(
+                instance.task_id,
+                instance.submission_date,
+                instance.score,
+                old_score if was_graded else None,
+            )
+            changes.save()
+            instance.task.status = "O"
+            instance.task.save(update_fields=["status", "modified_at"])
+            TaskAssignment.objects.filter(
+                task_id=instance.task_id, user_id=instance.creator_id
+            ).update(status="R")
+            if instance.creator_id:
+                outbox.record(
+                    "submission_graded",
+                    [instance.creator_id],
+                    submission_id=instance.pk,
+                    task_id=instance.task_id,
+                    title=instance.task.title,
+                    score=instance.score,
+                    is_approved=instance.is_approved,
+                    remarks=instance.remarks,
+                )
         return instance
+
+
+class GradeItemSerializer(serializers.Serializer):
+    id = serializers.UUIDField()
+    score = serializers.IntegerField(min_value=0, max_value=10)
+    is_approved = serializers.BooleanField(required=False)
+    remarks = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+
+
+class BulkGradeSerializer(serializers.Serializer):
+    """
+    Grades many submissions at once. Each item is validated on its own and
+    reported in the results, so one bad item does not fail the rest.
+    """
+
+    # Items are validated one by one in create(), see GradeItemSerializer.
+    submissions = serializers.ListField(child=serializers.JSONField())
+
+    def validate_submissions(self, value):
+        if not value:
+            raise UnprocessableEntityException(
+                {
+                    "title": "Bulk Grade",
+                    "message": "No submissions to grade",
+                }
+            )
+        if len(value) > settings.BULK_GRADE_MAX_ITEMS:
+            raise UnprocessableEntityException(
+                {
+                    "title": "Bulk Grade",
+                    "message": "At most {} submissions can be graded at once".format(
+                        settings.BULK_GRADE_MAX_ITEMS
+                    ),
+                }
+            )
+        return value
+
+    def create(self, validated_data):
+        """Grade the valid items and return one result per item, in order."""
+        user = self.context["request"].user
+        results = []
+        grades = {}
+        for item in validated_data["submissions"]:
+            result = {"id": item.get("id") if isinstance(item, dict) else None}
+            results.append(result)
+            serializer = GradeItemSerializer(data=item)
+            if not serializer.is_valid():
+                result["status"] = "invalid"
+                result["message"] = "; ".join(
+                    f"{field}: {' '.join(map(str, errors))}"
+                    for field, errors in serializer.errors.items()
+                )
+                continue
+            grade = serializer.validated_data
+            result["id"] = str(grade["id"])
+            if grade["id"] in grades:
+                result["status"] = "invalid"
+                result["message"] = "Duplicate submission id"
+                continue
+            grades[grade["id"]] = (grade, result)
+
+        # Ownership of every submission in one query; others read as missing.
+        submissions = list(
+            SubmittedTask.objects.filter(pk__in=grades, task__creator=user)
+            .select_related("task")
+            .only(
+                "id",
+                "task_id",
+                "creator_id",
+                "modifier_id",
+                "submission_date",
+                "is_approved",
+                "remarks",
+                "score",
+                "task__title",
+                "task__status",
+                "task__deadline",
+            )
+        )
+        now = timezone.now()
+        deltas = {}
+        changes = rollups.Changes()
+        for submission in submissions:
+            grade, result = grades[submission.pk]
+            was_approved, old_score = submission.is_approved, submission.score
+            was_graded = submission.modifier_id is not None
+            submission.score = grade["score"]
+            if "is_approved" in grade:
+                submission.is_approved = grade["is_approved"]
+            if "remarks" in grade:
+                submission.remarks = grade["remarks"]
+            submission.modifier = user
+            submission.modified_at = now
+            delta = deltas.setdefault(submission.task_id, {})
+            for counter, change in counters.grade_delta(
+                was_approved, old_score, submission
+            ).items():
+                delta[counter] = delta.get(counter, 0) + change
+            changes.graded(
+                submission.task_id,
+                submission.submission_date,
+                submission.score,
+                old_score if was_graded else None,
+            )
+            result["status"] = "graded"
+        for grade, result in grades.values():
+            if "status" not in result:
+                result["status"] = "not_found"
+                result["message"] = "Submit Task does  not exist!"
+        if not submissions:
+            return results
+
+        tasks = {submission.task_id: submission.task for submission in submissions}
+        with transaction.atomic(using=router.db_for_write(SubmittedTask)):
+            SubmittedTask.objects.bulk_update(
+                submissions,
+                ["score", "is_approved", "remarks", "modifier", "modified_at"],
+            )
+            Task.objects.filter(pk__in=tasks).update(status="O", modified_at=now)
+            counters.add(deltas)
+            changes.save()
+            reviewed = Q()
+            for submission in submissions:
+                reviewed |= Q(task_id=submission.task_id, user_id=submission.creator_id)
+            TaskAssignment.objects.filter(reviewed).update(status="R")
+            # Bulk writes skip the model signals, so notify here instead,
+            # of the tasks whose status changed.
+            reopened = {pk: task for pk, task in tasks.items() if task.status != "O"}
+            for task in reopened.values():
+                task.status = "O"
+            events.tasks_updated(reopened)
+            graded = [submission for submission in submissions if submission.creator_id]
+            events.log_many(
+                "submission_graded",
+                [
+                    (submission.creator_id, events.grade_payload(submission))
+                    for submission in graded
+                ],
+            )
+            outbox.record_many(
+                "submission_graded",
+                [
+                    (
+                        submission.creator_id,
+                        {
+                            "submission_id": submission.pk,
+                            "task_id": submission.task_id,
+                            "title": submission.task.title,
+                            "score": submission.score,
+                            "is_approved": submission.is_approved,
+                            "remarks": submission.remarks,
+                        },
+                    )
+                    for submission in graded
+                ],
+            )
+        return results
+
+
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedTask
+        fields = [
+            "id",
+            "title",
+            "description",
+            "deadline",
+            "contributors",
+            "status",
+            "creator",
+            "archived_at",
+        ]
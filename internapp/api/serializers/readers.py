@@ -0,0 +1,23 @@
+from common.readers import ValuesReader
+from internapp.api.serializers.accounts import (
+    TaskCreateSerializer,
+    SupervisorTaskSerializer,
+    SubmitTaskListSerializer,
+    ArchivedTaskSerializer,
+)
+
+
+class TaskReader(ValuesReader):
+    serializer_class = TaskCreateSerializer
+
+
+class SupervisorTaskReader(ValuesReader):
+    serializer_class = SupervisorTaskSerializer
+
+
+class SubmittedTaskReader(ValuesReader):
+    serializer_class = SubmitTaskListSerializer
+
+
+class ArchivedTaskReader(ValuesReader):
+    serializer_class = ArchivedTaskSerializer
@@ -1,103 +1,72 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from common.serializer import (
-    OperationError,
-    OperationSuccess,
-)
-from common.pagination import CustomPagination
-from common.permissions import (
-    IsSupervisor,
-    IsAuthenticated,
-    IsIntern,
-    IsInternOrSupervisor,
+from common.enums import (
+    ASSIGNMENT_STATUS_CHOICES,
+    ROLE_CHOICES,
+    ROLLUP_GRANULARITY_CHOICES,
+    STATUS_CHOICES,
 )
-from drf_spectacular.utils import (
-    extend_schema,
-    extend_schema_view,
-    OpenApiResponse,
-    OpenApiExample,
+from common.filters import (
+    IndexedFilterBackend,
+    choice_param,
+    datetime_param,
+    uuid_param,
 )
+from common.pagination import CustomPagination
+from common.routers import use_shard
+from common.readers import ValuesListMixin
 from internapp.api.serializers.accounts import (
     UserDetailSerializer,
     UserSerializer,
     LoginSerializer,
     TaskCreateSerializer,
+    SupervisorTaskSerializer,
     TaskEditSerializer,
     SubmitTaskListSerializer,
     SubmitTaskSerializer,
     SubmitTaskEditSerializer,
+    BulkGradeSerializer,
+    ArchivedTaskSerializer,
 )
+from internapp.api.serializers.readers import (
+    TaskReader,
+    SupervisorTaskReader,
+    SubmittedTaskReader,
+    ArchivedTaskReader,
+)
+from internapp import rollups, tenants
+from internapp.idempotency import IdempotentMixin
+from internapp.permissions import RolePermission
+from internapp.search import search_users
+from internapp.sync import delta
 from internapp.models import (
     User,
     Task,
     SubmittedTask,
+    ArchivedTask,
+    ArchivedContributor,
+    Cohort,
 )
 from common.utils import validate_uuid
 from common.exceptions import UnprocessableEntityException
 
 
-@extend_schema_view(
-    post=extend_schema(
-        summary="Refer to Schema At Bottom",
-        examples=[
-            OpenApiExample(
-                name="Register as Intern",
-                request_only=True,
-                value={
-                    "role": "I",
-                    "email": "intern@example.com",
-                    "password": "securepassword",
-                    "full_name": "John Doe",
-                    "phone": "1234567890",
-                    "gender": "M",
-                    "profile_pic": "string",
-                    "date_of_birth": "1990-01-01",
-                    "contact_details": "Contact details here",
-                    "educational_background": "Educational background here",
-                    "work_experience": "3",
-                },
-            ),
-            OpenApiExample(
-                name="Register as Supervisor",
-                request_only=True,
-                value={
-                    "role": "S",
-                    "email": "supervisor@example.com",
-                    "password": "securepassword",
-                    "full_name": "Jane Smith",
-                    "phone": "9876543210",
-                    "gender": "F",
-                    "profile_pic": "string",
-                    "date_of_birth": "1985-05-15",
-                    "contact_details": "Contact details here",
-                    "educational_background": "Educational background here",
-                    "work_experience": "3",
-                },
-            ),
-        ],
-        description="Login Api",
-        request=UserSerializer,
-        responses={
-            200: OpenApiResponse(
-                response=OperationSuccess,
-                description="Success Response when user is registered successfully",
-            ),
-            422: OpenApiResponse(
-                response=OperationError,
-                description="Json Data Error, occurs when invalid data is sent!",
-            ),
-        },
-        tags=["User Unauthenticated Apis"],
-    ),
-)
-class UserViewSet(generics.CreateAPIView):
+class UserViewSet(IdempotentMixin, generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
 
     def create(self, request, *args, **kwargs):
-        response = super().create(request, *args, **kwargs)
+        # `organization` is a slug; without one the user joins the default shard.
+        shard = tenants.registration_shard(request.data.get("organization"))
+        with use_shard(shard):
+            response = super().create(request, *args, **kwargs)
         return Response(
             {
                 "title": "Accounts",
@@ -107,44 +76,18 @@ class UserViewSet(generics.CreateAPIView):
         )
 
 
-@extend_schema_view(
-    post=extend_schema(
-        summary="Refer to Schema At Bottom",
-        examples=[
-            OpenApiExample(
-                name="Login by email-email",
-                request_only=True,
-                value={"email": "kingshahi163@gmail.com", "password": "HIGHspeed12@"},
-            ),
-            OpenApiExample(
-                name="Login by phone-phone",
-                request_only=True,
-                value={
-                    "phone": "9809461773",
-                    "password": "HIGHspeed12@",
-                },
-            ),
-        ],
-        description="Login Api",
-        request=LoginSerializer,
-        responses={
-            200: OpenApiResponse(
-                response=OperationSuccess,
-                description="Success Response when Loggedin successfully",
-            ),
-            422: OpenApiResponse(
-                response=OperationError,
-                description="Json Data Error, occurs when invalid data is sent!",
-            ),
-        },
-        tags=["User Unauthenticated Apis"],
-    ),
-)
 class LoginViewSet(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = LoginSerializer
 
     def post(self, request, *args, **kwargs):
+        shard = tenants.login_shard(
+            request.data.get("email"), request.data.get("phone")
+        )
+        with use_shard(shard):
+            return self.login(request)
+
+    def login(self, request):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         if "email" in serializer.validated_data:
@@ -166,28 +109,10 @@ class LoginViewSet(generics.CreateAPIView):
         )
 
 
-@extend_schema_view(
-    post=extend_schema(
-        summary="Refer to Schemas At Bottom",
-        description="Task Create Apis",
-        request=TaskCreateSerializer,
-        responses={
-            200: OpenApiResponse(
-                response=OperationSuccess,
-                description="Success Response when task is created successfully",
-            ),
-            422: OpenApiResponse(
-                response=OperationError,
-                description="Json Data Error, occurs when invalid data is sent!",
-            ),
-        },
-        tags=["Task Apis"],
-    ),
-)
-class TaskCreateViewSet(generics.CreateAPIView):
+class TaskCreateViewSet(IdempotentMixin, generics.CreateAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskCreateSerializer
-    permission_classes = [IsSupervisor]
+    permission_classes = [RolePermission]
 
     def create(self, request, *args, **kwargs):
         response = super().create(request, *args, **kwargs)
@@ -200,32 +125,30 @@ class TaskCreateViewSet(generics.CreateAPIView):
         )
 
 
-@extend_schema_view(
-    get=extend_schema(
-        summary="Refer to Schemas At Bottom",
-        description="Task List Apis",
-        request=TaskCreateSerializer,
-        responses={
-            200: OpenApiResponse(
-                response=OperationSuccess,
-                description="Success Response when Task is listed successfully",
-            ),
-            422: OpenApiResponse(
-                response=OperationError,
-                description="Json Data Error, occurs when invalid data is sent!",
-            ),
-        },
-        tags=["Dashboard Apis[Supervisor/Intern]"],
-    ),
-)
-class TaskListViewSet(generics.ListAPIView):
+class TaskListViewSet(ValuesListMixin, generics.ListAPIView):
     queryset = Task.objects.all()
-    serializer_class = TaskCreateSerializer
-    permission_classes = [IsAuthenticated]
+    # Only the supervisor list carries the counters.
+    serializer_class = SupervisorTaskSerializer
+    reader_class = SupervisorTaskReader
+    permission_classes = [RolePermission]
     http_method_names = [
         "get",
     ]
     pagination_class = CustomPagination
+    filter_backends = [IndexedFilterBackend]
+    filter_params = {
+        "status": ("status", choice_param(STATUS_CHOICES)),
+        "deadline_after": ("deadline__gte", datetime_param),
+        "deadline_before": ("deadline__lt", datetime_param),
+    }
+    ordering_fields = ["deadline", "created_at"]
+    default_ordering = "-created_at"
+    # Served by the (creator, [status,] deadline) and
+    # (creator, [status,] created_at) indexes on Task.
+    filter_combinations = [
+        ({"status", "deadline_after", "deadline_before"}, {"deadline"}),
+        ({"status"}, {"created_at"}),
+    ]
 
     def get_queryset(self):
         user = self.request.user
@@ -242,28 +165,10 @@ class TaskListViewSet(generics.ListAPIView):
         )
 
 
-@extend_schema_view(
-    patch=extend_schema(
-        summary="Refer to Schemas At Bottom",
-        description="Task Edit Apis",
-        request=TaskEditSerializer,
-        responses={
-            200: OpenApiResponse(
-                response=OperationSuccess,
-                description="Success Response when Task is edited successfully",
-            ),
-            422: OpenApiResponse(
-                response=OperationError,
-                description="Json Data Error, occurs when invalid data is sent!",
-            ),
-        },
-        tags=["Task Apis"],
-    ),
-)
 class TaskEditViewSet(generics.UpdateAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskEditSerializer
-    permission_classes = [IsSupervisor]
+    permission_classes = [RolePermission]
     http_method_names = [
         "patch",
     ]
@@ -296,28 +201,10 @@ class TaskEditViewSet(generics.UpdateAPIView):
         )
 
 
-@extend_schema_view(
-    post=extend_schema(
-        summary="Refer to Schemas At Bottom",
-        description="Submit Task Apis",
-        request=SubmitTaskSerializer,
-        responses={
-            200: OpenApiResponse(
-                response=OperationSuccess,
-                description="Success Response when task is edited successfully",
-            ),
-            422: OpenApiResponse(
-                response=OperationError,
-                description="Json Data Error, occurs when invalid data is sent!",
-            ),
-        },
-        tags=["Intern Apis"],
-    ),
-)
-class SubmitTaskViewSet(generics.CreateAPIView):
+class SubmitTaskViewSet(IdempotentMixin, generics.CreateAPIView):
     queryset = SubmittedTask.objects.all()
     serializer_class = SubmitTaskSerializer
-    permission_classes = [IsIntern]
+    permission_classes = [RolePermission]
 
     def create(self, request, *args, **kwargs):
         response = super().create(request, *args, **kwargs)
@@ -330,28 +217,11 @@ class SubmitTaskViewSet(generics.CreateAPIView):
         )
 
 
-@extend_schema_view(
-    get=extend_schema(
-        summary="Refer to Schemas At Bottom",
-        description="Submit Task List Apis",
-        request=SubmitTaskSerializer,
-        responses={
-            200: OpenApiResponse(
-                response=OperationSuccess,
-                description="Success Response when Submitted Task is listed successfully",
-            ),
-            422: OpenApiResponse(
-                response=OperationError,
-                description="Json Data Error, occurs when invalid data is sent!",
-            ),
-        },
-        tags=["Intern Apis"],
-    ),
-)
-class TaskSubmitListViewSet(generics.ListAPIView):
+class TaskSubmitListViewSet(ValuesListMixin, generics.ListAPIView):
     queryset = SubmittedTask.objects.all()
     serializer_class = SubmitTaskListSerializer
-    permission_classes = [IsInternOrSupervisor]
+    reader_class = SubmittedTaskReader
+    permission_classes = [RolePermission]
     http_method_names = [
         "get",
     ]
@@ -368,28 +238,10 @@ class TaskSubmitListViewSet(generics.ListAPIView):
         )
 
 
-@extend_schema_view(
-    patch=extend_schema(
-        summary="Refer to Schemas At Bottom",
-        description="Submit Task Edit Apis",
-        request=SubmitTaskEditSerializer,
-        responses={
-            200: OpenApiResponse(
-                response=OperationSuccess,
-                description="Success Response when Submitted Task is edited successfully",
-            ),
-            422: OpenApiResponse(
-                response=OperationError,
-                description="Json Data Error, occurs when invalid data is sent!",
-            ),
-        },
-        tags=["Intern Apis"],
-    ),
-)
 class SubmitTaskEditViewSet(generics.UpdateAPIView):
     queryset = SubmittedTask.objects.all()
     serializer_class = SubmitTaskEditSerializer
-    permission_classes = [IsSupervisor]
+    permission_classes = [RolePermission]
     http_method_names = [
         "patch",
     ]
@@ -422,36 +274,59 @@ class SubmitTaskEditViewSet(generics.UpdateAPIView):
         )
 
 
-@extend_schema_view(
-    get=extend_schema(
-        summary="Refer to Schemas At Bottom",
-        description="Task List Apis",
-        request=TaskCreateSerializer,
-        responses={
-            200: OpenApiResponse(
-                response=OperationSuccess,
-                description="Success Response when Task is listed successfully",
-            ),
-            422: OpenApiResponse(
-                response=OperationError,
-                description="Json Data Error, occurs when invalid data is sent!",
-            ),
-        },
-        tags=["Dashboard Apis[Supervisor/Intern]"],
-    ),
-)
-class TaskListInternViewSet(generics.ListAPIView):
+class SubmitTaskGradeViewSet(generics.CreateAPIView):
+    queryset = SubmittedTask.objects.all()
+    serializer_class = BulkGradeSerializer
+    permission_classes = [RolePermission]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = serializer.save()
+        graded = sum(result["status"] == "graded" for result in results)
+        return Response(
+            {
+                "title": "Bulk Grade",
+                "message": f"{graded} of {len(results)} submissions graded",
+                "data": results,
+            }
+        )
+
+
+class TaskListInternViewSet(ValuesListMixin, generics.ListAPIView):
     queryset = Task.objects.all()
     serializer_class = TaskCreateSerializer
-    permission_classes = [IsAuthenticated]
+    reader_class = TaskReader
+    permission_classes = [RolePermission]
     http_method_names = [
         "get",
     ]
     pagination_class = CustomPagination
+    filter_backends = [IndexedFilterBackend]
+    filter_params = {
+        "status": ("status", choice_param(STATUS_CHOICES)),
+        "progress": ("progress", choice_param(ASSIGNMENT_STATUS_CHOICES)),
+        "deadline_after": ("deadline__gte", datetime_param),
+        "deadline_before": ("deadline__lt", datetime_param),
+        "creator": ("creator", uuid_param),
+    }
+    ordering_fields = ["deadline"]
+    default_ordering = "deadline"
+    # The intern's direct assignments and cohort links, read through the
+    # user-first assignment and membership indexes, narrow the rows to
+    # their own tasks before any of these apply; only the intern's tasks
+    # are sorted by deadline.
+    filter_combinations = [
+        (set(filter_params), {"deadline"}),
+    ]
 
     def get_queryset(self):
         user = self.request.user
-        return Task.objects.filter(contributors=user, status__in=["D", "O"])
+        return (
+            Task.objects.assigned_to(user)
+            .with_progress(user)
+            .filter(status__in=["D", "O"])
+        )
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
@@ -462,3 +337,190 @@ class TaskListInternViewSet(generics.ListAPIView):
                 "data": response.data,
             }
         )
+
+
+class ArchivedTaskListViewSet(ValuesListMixin, generics.ListAPIView):
+    queryset = ArchivedTask.objects.all()
+    serializer_class = ArchivedTaskSerializer
+    reader_class = ArchivedTaskReader
+    permission_classes = [RolePermission]
+    http_method_names = [
+        "get",
+    ]
+    pagination_class = CustomPagination
+    filter_backends = [IndexedFilterBackend]
+    filter_params = {}
+    ordering_fields = ["archived_at"]
+    default_ordering = "-archived_at"
+    filter_combinations = [
+        (set(), {"archived_at"}),
+    ]
+
+    def get_queryset(self):
+        user = self.request.user
+        if user.role == "S":
+            return ArchivedTask.objects.filter(creator=user)
+        # Archived assignments, and the archived links of the intern's
+        # cohorts, so members who joined since see the cohort's tasks too.
+        return ArchivedTask.objects.filter(
+            Q(pk__in=ArchivedContributor.objects.filter(user=user).values("task"))
+            | Q(
+                pk__in=ArchivedTask.cohorts.through.objects.filter(
+                    cohort__members=user
+                ).values("archivedtask")
+            )
+        )
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        return Response(
+            {
+                "title": "Archived Task",
+                "message": "Archived Task Listed successfully",
+                "data": response.data,
+            }
+        )
+
+
+class SyncViewSet(generics.GenericAPIView):
+    queryset = Task.objects.all()
+    permission_classes = [RolePermission]
+    http_method_names = [
+        "get",
+    ]
+
+    def get(self, request, *args, **kwargs):
+        limit = request.query_params.get("limit", "")
+        limit = int(limit) if limit.isdigit() else settings.SYNC_PAGE_SIZE
+        limit = max(1, min(limit, settings.SYNC_PAGE_SIZE))
+        changes = delta(request.user, request.query_params.get("since"), limit)
+        tasks, submissions = TaskReader(), SubmittedTaskReader()
+        return Response(
+            {
+                "title": "Sync",
+                "message": "Changes since the sync token",
+                "data": {
+                    "tasks": tasks.serialize(
+                        tasks.project(Task.objects.filter(pk__in=changes["task_ids"]))
+                    ),
+                    "submissions": submissions.serialize(
+                        submissions.project(
+                            SubmittedTask.objects.filter(
+                                pk__in=changes["submission_ids"]
+                            )
+                        )
+                    ),
+                    "tombstones": changes["tombstones"],
+                    "next": changes["next"],
+                    "has_more": changes["has_more"],
+                },
+            }
+        )
+
+
+class UserSearchViewSet(generics.GenericAPIView):
+    queryset = User.objects.all()
+    permission_classes = [RolePermission]
+    http_method_names = [
+        "get",
+    ]
+
+    def get(self, request, *args, **kwargs):
+        prefix = request.query_params.get("q", "").strip()
+        if not prefix:
+            raise UnprocessableEntityException(
+                {
+                    "title": "User Search",
+                    "message": "q is required and cannot be empty.",
+                }
+            )
+        role = choice_param(ROLE_CHOICES)("role", request.query_params.get("role", "I"))
+        limit = request.query_params.get("limit", "")
+        limit = int(limit) if limit.isdigit() else settings.USER_SEARCH_MAX_RESULTS
+        limit = max(1, min(limit, settings.USER_SEARCH_MAX_RESULTS))
+        return Response(
+            {
+                "title": "User Search",
+                "message": "Users matching the prefix",
+                "data": search_users(prefix, role, limit),
+            }
+        )
+
+
+class SubmissionReportViewSet(generics.GenericAPIView):
+    queryset = Task.objects.all()
+    permission_classes = [RolePermission]
+    http_method_names = [
+        "get",
+    ]
+    # Window when `after` is not given, counted back from `before`.
+    default_windows = {"H": timedelta(hours=48), "D": timedelta(days=30)}
+
+    def invalid(self, message):
+        raise UnprocessableEntityException(
+            {
+                "title": "Submission Report",
+                "message": message,
+            }
+        )
+
+    def report_tasks(self, params):
+        """Ids of the supervisor's tasks, live or archived, the report covers."""
+        user = self.request.user
+        task, cohort = params.get("task"), params.get("cohort")
+        if bool(task) == bool(cohort):
+            self.invalid("Exactly one of task or cohort is required.")
+        if task:
+            uuid_param("task", task)
+            if not (
+                Task.objects.filter(pk=task, creator=user).exists()
+                or ArchivedTask.objects.filter(pk=task, creator=user).exists()
+            ):
+                self.invalid(f"Task with ID '{task}' does not exist.")
+            return [task]
+        uuid_param("cohort", cohort)
+        if not Cohort.objects.filter(pk=cohort).exists():
+            self.invalid(f"Cohort with ID '{cohort}' does not exist.")
+        return [
+            *Task.objects.filter(cohorts=cohort, creator=user).values_list(
+                "pk", flat=True
+            ),
+            *ArchivedTask.objects.filter(cohorts=cohort, creator=user).values_list(
+                "pk", flat=True
+            ),
+        ]
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        task_ids = self.report_tasks(params)
+        granularity = choice_param(ROLLUP_GRANULARITY_CHOICES)(
+            "granularity", params.get("granularity") or "D"
+        )
+        before = params.get("before")
+        before = datetime_param("before", before) if before else timezone.now()
+        after = params.get("after")
+        if after:
+            after = datetime_param("after", after)
+        else:
+            after = before - self.default_windows[granularity]
+        if after >= before:
+            self.invalid("after must be earlier than before.")
+        buckets = (before - after) / rollups.GRANULARITIES[granularity]
+        if buckets > settings.ROLLUP_REPORT_MAX_BUCKETS:
+            self.invalid(
+                "The report is limited to {} buckets; narrow the window.".format(
+                    settings.ROLLUP_REPORT_MAX_BUCKETS
+                )
+            )
+        return Response(
+            {
+                "title": "Submission Report",
+                "message": "Submission rollups for the window",
+                "data": {
+                    "granularity": granularity,
+                    "after": after,
+                    "before": before,
+                    **rollups.report(task_ids, granularity, after, before),
+                },
+            }
+        )
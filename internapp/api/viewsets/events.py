@@ -0,0 +1,151 @@
+"""
+Server-sent events stream of the requesting user's task and grade changes.
+
+Served by the ASGI application, under uvicorn as in the dockerfile;
+`runserver` is WSGI and would buffer the stream instead of sending it.
+
+`EventSource` cannot send headers. Instead of the access token, which
+would end up in URLs and access logs, such clients pass a stream token from
+`events/token/` as `?token=`: it is good for opening the stream only, for
+SSE_TOKEN_SECONDS.
+"""
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.http import HttpResponseNotAllowed, JsonResponse, StreamingHttpResponse
+from rest_framework import generics
+from rest_framework.response import Response
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from internapp.events import events_after, hub, latest_event_id
+from internapp.models import User
+from internapp.permissions import RolePermission
+from internapp.tenants import user_shard
+
+TOKEN_SALT = "internapp.events"
+
+
+def error(title, message, status):
+    return JsonResponse({"title": title, "message": message}, status=status)
+
+
+def stream_token(user_id):
+    return signing.dumps(str(user_id), salt=TOKEN_SALT)
+
+
+def token_user_id(request):
+    """User id from the access token header, or from a `?token=` stream token."""
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        try:
+            return AccessToken(header.split(" ", 1)[1])[jwt_settings.USER_ID_CLAIM]
+        except (TokenError, KeyError):
+            return None
+    raw = request.GET.get("token")
+    if not raw:
+        return None
+    try:
+        return signing.loads(raw, salt=TOKEN_SALT, max_age=settings.SSE_TOKEN_SECONDS)
+    except signing.BadSignature:
+        return None
+
+
+def stream_user(request):
+    """The user the request's token belongs to and their shard."""
+    user_id = token_user_id(request)
+    if user_id is None:
+        return None, None
+    # `?token=` gets past ShardRoutingMiddleware, so look the shard up here.
+    shard, _ = user_shard(user_id)
+    users = User.objects.using(shard)
+    return users.filter(pk=user_id, is_active=True, is_blocked=False).first(), shard
+
+
+def last_event_id(request):
+    value = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    return int(value) if value and value.isdigit() else None
+
+
+def format_event(event):
+    data = json.dumps(event["payload"])
+    return f"id: {event['id']}\nevent: {event['kind']}\ndata: {data}\n\n"
+
+
+async def stream(user_id, shard, cursor):
+    loop = asyncio.get_running_loop()
+    queue = await hub.subscribe(user_id, shard)
+    try:
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+        if cursor is None:
+            cursor = await sync_to_async(latest_event_id)(shard)
+        else:
+            # Replay what was missed while disconnected.
+            while True:
+                backlog = await sync_to_async(events_after)(
+                    cursor, user_id, using=shard
+                )
+                for event in backlog:
+                    cursor = event["id"]
+                    yield format_event(event)
+                if len(backlog) < 500:
+                    break
+
+        closes_at = loop.time() + settings.SSE_MAX_STREAM_SECONDS
+        while loop.time() < closes_at:
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), settings.SSE_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            # The replay and the hub can both carry the same event.
+            if event["id"] > cursor:
+                cursor = event["id"]
+                yield format_event(event)
+    finally:
+        hub.unsubscribe(user_id, queue, shard)
+
+
+async def event_stream(request):
+    # require_GET does not wrap async views before Django 5.0.
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    user, shard = await sync_to_async(stream_user)(request)
+    if user is None:
+        return error("UnAuthenticated", "Not Authenticated", 401)
+    response = StreamingHttpResponse(
+        stream(user.pk, shard, last_event_id(request)),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Keep reverse proxies from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class EventTokenViewSet(generics.GenericAPIView):
+    """Stream token for `EventSource` clients, which cannot send headers."""
+
+    permission_classes = [RolePermission]
+    http_method_names = [
+        "post",
+    ]
+
+    def post(self, request, *args, **kwargs):
+        return Response(
+            {
+                "title": "Events",
+                "message": "Stream token issued",
+                "data": {
+                    "token": stream_token(request.user.pk),
+                    "expires_in": settings.SSE_TOKEN_SECONDS,
+                },
+            }
+        )
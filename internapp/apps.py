@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class InternappConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "internapp"
+
+    def ready(self):
+        # Connect the signal receivers.
+        from internapp import counters, events, search, sync, tenants  # noqa: F401
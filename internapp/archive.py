@@ -0,0 +1,202 @@
+"""
+Moving completed tasks between the hot tables and the archive tables.
+
+Rows are copied with INSERT ... SELECT inside the database and the source
+rows deleted in the same transaction, so a batch is either fully moved or
+left where it was.
+"""
+
+from django.db import connections, models, transaction
+from django.utils import timezone
+
+from internapp import counters
+from internapp.models import (
+    Task,
+    TaskAssignment,
+    SubmittedTask,
+    ArchivedTask,
+    ArchivedContributor,
+    ArchivedSubmission,
+    Tombstone,
+)
+
+TASK_COLUMNS = [
+    "id",
+    "title",
+    "description",
+    "status",
+    "deadline",
+    "created_at",
+    "creator_id",
+    "modified_at",
+    "modifier_id",
+]
+ASSIGNMENT_COLUMNS = ["task_id", "user_id", "status", "assigned_at"]
+SUBMISSION_COLUMNS = [
+    "id",
+    "task_id",
+    "submission_date",
+    "is_approved",
+    "remarks",
+    "score",
+    "created_at",
+    "creator_id",
+    "modified_at",
+    "modifier_id",
+]
+
+
+def copy_rows(queryset, target, columns, **constants):
+    """
+    Insert `columns` of every row of `queryset`, plus `constants`, into
+    `target` as a single INSERT ... SELECT. Constants are values or
+    expressions over the source rows. Returns the number of rows.
+    """
+    connection = connections[queryset.db]
+    quote = connection.ops.quote_name
+    aliases = {}
+    for name, value in constants.items():
+        if not hasattr(value, "resolve_expression"):
+            value = models.Value(value, output_field=target._meta.get_field(name))
+        aliases[f"copy_{name}"] = value
+    queryset = queryset.order_by().annotate(**aliases)
+    # Annotations are selected after the model columns, in this same order.
+    select, params = queryset.values_list(*columns, *aliases).query.sql_with_params()
+    names = ", ".join(
+        quote(target._meta.get_field(name).column) for name in [*columns, *constants]
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(target._meta.db_table)} ({names}) {select}", params
+        )
+        return cursor.rowcount
+
+
+def hot_rows(ids, using):
+    """The tasks `ids`, their assignments, cohort links and submissions."""
+    return (
+        Task.objects.using(using).filter(pk__in=ids),
+        TaskAssignment.objects.using(using).filter(task_id__in=ids),
+        Task.cohorts.through.objects.using(using).filter(task_id__in=ids),
+        SubmittedTask.objects.using(using).filter(task_id__in=ids),
+    )
+
+
+def delete_tasks(ids, using="default"):
+    """
+    Delete the tasks `ids` with their assignments, cohort links and
+    submissions: the tombstones in bulk, then one DELETE per table. The
+    per-row delete receivers in `internapp.sync` would cost several
+    queries a row.
+    """
+    tasks, assignments, cohort_links, submissions = hot_rows(ids, using)
+    bury(tasks, assignments, cohort_links, submissions)
+    for queryset in (submissions, assignments, cohort_links, tasks):
+        # The fast path Django's own delete takes for models without
+        # delete receivers.
+        queryset._raw_delete(using)
+
+
+def bury(tasks, assignments, cohort_links, submissions):
+    """
+    The sync tombstones for deleting `tasks` with their `assignments`,
+    `cohort_links` and `submissions`, one INSERT ... SELECT per audience:
+    each task for its creator, assignees and cohorts, each submission for
+    its intern and supervisor.
+    """
+    now = timezone.now()
+    audiences = [
+        (tasks, "task", "user_id", "creator_id", "id"),
+        (assignments, "task", "user_id", "user_id", "task_id"),
+        (cohort_links, "task", "cohort_id", "cohort_id", "task_id"),
+        (submissions, "submission", "user_id", "creator_id", "id"),
+        (submissions, "submission", "user_id", "task__creator_id", "id"),
+    ]
+    for queryset, kind, field, audience, object_id in audiences:
+        copy_rows(
+            queryset.filter(**{f"{audience}__isnull": False}),
+            Tombstone,
+            [],
+            kind=kind,
+            object_id=models.F(object_id),
+            created_at=now,
+            **{field: models.F(audience)},
+        )
+
+
+def archivable(cutoff, using="default"):
+    return Task.objects.using(using).filter(status="C", modified_at__lt=cutoff)
+
+
+def archive_batch(cutoff, batch_size, using="default"):
+    """
+    Archive up to `batch_size` tasks completed before `cutoff`, with their
+    contributor and cohort links and submissions. Returns (tasks, links,
+    submissions).
+    """
+    with transaction.atomic(using=using):
+        ids = list(
+            archivable(cutoff, using)
+            .select_for_update()
+            .order_by("modified_at")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0, 0, 0
+        tasks, assignments, cohort_links, submission_rows = hot_rows(ids, using)
+        copy_rows(tasks, ArchivedTask, TASK_COLUMNS, archived_at=timezone.now())
+        links = copy_rows(assignments, ArchivedContributor, ASSIGNMENT_COLUMNS)
+        copy_rows(
+            cohort_links,
+            ArchivedTask.cohorts.through,
+            ["cohort_id"],
+            archivedtask_id=models.F("task_id"),
+        )
+        submissions = copy_rows(submission_rows, ArchivedSubmission, SUBMISSION_COLUMNS)
+        delete_tasks(ids, using)
+    return len(ids), links, submissions
+
+
+def restore_task(task_id, using="default"):
+    """
+    Move an archived task back into the hot tables. Its modified_at is reset
+    so the next archive run leaves it alone. Returns (links, submissions),
+    or None when the task is not archived.
+    """
+    with transaction.atomic(using=using):
+        archived = (
+            ArchivedTask.objects.using(using).select_for_update().filter(pk=task_id)
+        )
+        if not archived.exists():
+            return None
+        copy_rows(
+            archived,
+            Task,
+            [column for column in TASK_COLUMNS if column != "modified_at"],
+            modified_at=timezone.now(),
+            **dict.fromkeys(counters.COUNTERS, 0),
+        )
+        links = copy_rows(
+            ArchivedContributor.objects.using(using).filter(task_id=task_id),
+            TaskAssignment,
+            ASSIGNMENT_COLUMNS,
+            deadline=models.F("task__deadline"),
+        )
+        copy_rows(
+            ArchivedTask.cohorts.through.objects.using(using).filter(
+                archivedtask_id=task_id
+            ),
+            Task.cohorts.through,
+            ["cohort_id"],
+            task_id=models.F("archivedtask_id"),
+        )
+        submissions = copy_rows(
+            ArchivedSubmission.objects.using(using).filter(task_id=task_id),
+            SubmittedTask,
+            SUBMISSION_COLUMNS,
+        )
+        Task.objects.using(using).filter(pk=task_id).update(
+            **counters.recount([task_id], using)[task_id]
+        )
+        archived.delete()
+    return links, submissions
@@ -0,0 +1,173 @@
+"""
+Denormalized per-task counters for the task lists.
+
+`submitted_count`, `approved_count` and `score_total` move by F()
+increments in the transaction that submits or grades. `assigned_count`
+counts the interns assigned directly or through a cohort; one intern may
+be reached both ways, so it is recounted for the affected tasks whenever
+assignments, cohort links or cohort members change.
+
+Writes that go around these paths, such as deleting submissions, leave
+drift behind for the `repair_task_counters` command.
+"""
+
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.signals import m2m_changed, post_delete, pre_delete
+from django.dispatch import receiver
+
+from internapp.models import Cohort, Task, TaskAssignment, SubmittedTask
+
+COUNTERS = ["assigned_count", "submitted_count", "approved_count", "score_total"]
+
+
+def add(deltas):
+    """Apply {task id: {counter: delta}} to the counters in one UPDATE."""
+    changes = {}
+    for counter in COUNTERS:
+        whens = [
+            When(pk=pk, then=Value(delta[counter]))
+            for pk, delta in deltas.items()
+            if delta.get(counter)
+        ]
+        if whens:
+            changes[counter] = F(counter) + Case(*whens, default=Value(0))
+    if changes:
+        Task.objects.filter(pk__in=deltas).update(**changes)
+
+
+def grade_delta(was_approved, old_score, submission):
+    return {
+        "approved_count": int(submission.is_approved) - int(was_approved),
+        "score_total": submission.score - old_score,
+    }
+
+
+def assigned_counts(task_ids, using="default"):
+    """
+    {task id: interns assigned} for `task_ids`. The UNION of the
+    assignments and the cohort members leaves one row per intern.
+    """
+    direct = (
+        TaskAssignment.objects.using(using)
+        .filter(task_id__in=task_ids)
+        .values_list("task_id", "user_id")
+    )
+    through_cohorts = (
+        Task.cohorts.through.objects.using(using)
+        .filter(task_id__in=task_ids, cohort__members__isnull=False)
+        .values_list("task_id", "cohort__members")
+    )
+    return Counter(task_id for task_id, _ in direct.union(through_cohorts))
+
+
+def recount(task_ids, using="default"):
+    """The counters of `task_ids` computed from the rows they count."""
+    counts = {pk: dict.fromkeys(COUNTERS, 0) for pk in task_ids}
+    for task_id, assigned in assigned_counts(task_ids, using).items():
+        counts[task_id]["assigned_count"] = assigned
+    submissions = (
+        SubmittedTask.objects.using(using)
+        .filter(task_id__in=task_ids)
+        .values("task_id")
+        .annotate(
+            submitted=Count("id"),
+            approved=Count("id", filter=Q(is_approved=True)),
+            score=Sum("score"),
+        )
+        .order_by()
+    )
+    for row in submissions:
+        counts[row["task_id"]].update(
+            submitted_count=row["submitted"],
+            approved_count=row["approved"],
+            score_total=row["score"] or 0,
+        )
+    return counts
+
+
+def repair(task_ids, using="default", dry_run=False):
+    """Reset the counters of `task_ids` that drifted; returns how many did."""
+    with transaction.atomic(using=using):
+        current = (
+            Task.objects.using(using)
+            .select_for_update()
+            .filter(pk__in=task_ids)
+            .values_list("pk", *COUNTERS)
+        )
+        actual = recount(task_ids, using)
+        drifted = [
+            Task(pk=pk, **actual[pk])
+            for pk, *values in current
+            if dict(zip(COUNTERS, values)) != actual[pk]
+        ]
+        if not dry_run:
+            Task.objects.using(using).bulk_update(drifted, COUNTERS)
+    return len(drifted)
+
+
+def recount_assigned(task_ids, using="default"):
+    task_ids = set(task_ids)
+    if not task_ids:
+        return
+    counts = assigned_counts(task_ids, using)
+    Task.objects.using(using).bulk_update(
+        [Task(pk=pk, assigned_count=counts.get(pk, 0)) for pk in task_ids],
+        ["assigned_count"],
+    )
+
+
+def cohort_tasks(cohort_ids, using="default"):
+    links = Task.cohorts.through.objects.using(using)
+    return links.filter(cohort_id__in=cohort_ids).values_list("task_id", flat=True)
+
+
+@receiver(m2m_changed, sender=Task.contributors.through)
+@receiver(m2m_changed, sender=Task.cohorts.through)
+def task_links_changed(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            recount_assigned([instance.pk], using)
+        return
+    # A user's or a cohort's tasks; a clear leaves no pk_set to go by.
+    field = "contributors" if sender is Task.contributors.through else "cohorts"
+    if action == "pre_clear":
+        instance._cleared_tasks = list(
+            Task.objects.using(using)
+            .filter(**{field: instance})
+            .values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        recount_assigned(instance.__dict__.pop("_cleared_tasks", []), using)
+    elif action in ("post_add", "post_remove"):
+        recount_assigned(pk_set, using)
+
+
+@receiver(m2m_changed, sender=Cohort.members.through)
+def members_changed(sender, instance, action, reverse, pk_set, using, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            recount_assigned(cohort_tasks([instance.pk], using), using)
+        return
+    if action == "pre_clear":
+        instance._cleared_cohorts = list(
+            instance.cohorts.using(using).values_list("pk", flat=True)
+        )
+    elif action == "post_clear":
+        cohorts = instance.__dict__.pop("_cleared_cohorts", [])
+        recount_assigned(cohort_tasks(cohorts, using), using)
+    elif action in ("post_add", "post_remove"):
+        recount_assigned(cohort_tasks(pk_set, using), using)
+
+
+@receiver(pre_delete, sender=Cohort)
+def cohort_deleting(sender, instance, using, **kwargs):
+    # The links go in a cascade that sends no m2m_changed.
+    instance._cohort_tasks = list(cohort_tasks([instance.pk], using))
+
+
+@receiver(post_delete, sender=Cohort)
+def cohort_deleted(sender, instance, using, **kwargs):
+    recount_assigned(instance.__dict__.pop("_cohort_tasks", []), using)
@@ -0,0 +1,303 @@
+"""
+Per-user change events for the `events/` server-sent events stream.
+
+Model signals append rows to `EventLog` inside the writing transaction. The
+log is the bridge between worker processes: every process runs one
+`EventHub` poller per shard that reads new rows and fans them out to the
+streams connected to it. A commit in the same process wakes the poller at
+once, so local events do not wait for the next poll.
+
+An event about a task is one row for the task, or for the cohort it was
+assigned to, and the readers resolve who it reaches; a cohort of any size
+costs one insert.
+
+Pollers follow the log by id, which relies on ids becoming visible in
+order; SQLite guarantees that by serializing writers.
+"""
+
+import asyncio
+from collections import defaultdict
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Max, Q
+from django.db.models.signals import m2m_changed, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from internapp.models import Cohort, EventLog, Task, TaskAssignment, SubmittedTask
+
+
+def log_events(kind, user_ids, payload):
+    """Append a `kind` event for every user in `user_ids`."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    using = router.db_for_write(EventLog)
+    EventLog.objects.using(using).bulk_create(
+        EventLog(user_id=user_id, kind=kind, payload=payload) for user_id in user_ids
+    )
+    transaction.on_commit(lambda: hub.wake(using), using=using)
+
+
+def log_many(kind, items, audience="user_id"):
+    """
+    Append one `kind` event per (id, payload) pair, in one insert. The ids
+    are users, or tasks or cohorts with `audience` "task_id" or "cohort_id".
+    """
+    events = [
+        EventLog(kind=kind, payload=payload, **{audience: pk}) for pk, payload in items
+    ]
+    if not events:
+        return
+    using = router.db_for_write(EventLog)
+    EventLog.objects.using(using).bulk_create(events)
+    transaction.on_commit(lambda: hub.wake(using), using=using)
+
+
+# Task fields interns see; saves that change none of them notify nobody.
+VISIBLE_FIELDS = ["title", "description", "status", "deadline"]
+
+
+def task_payload(task):
+    return {
+        "task_id": task.pk,
+        "title": task.title,
+        "status": task.status,
+        "deadline": task.deadline,
+    }
+
+
+def tasks_updated(tasks):
+    """`task_updated` events for tasks changed by a bulk update, keyed by pk."""
+    log_many(
+        "task_updated",
+        [(pk, task_payload(task)) for pk, task in tasks.items()],
+        audience="task_id",
+    )
+
+
+@receiver(pre_save, sender=Task)
+def task_saving(sender, instance, raw=False, update_fields=None, using=None, **kwargs):
+    instance._visible = None
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & set(VISIBLE_FIELDS):
+        return
+    instance._visible = (
+        Task.objects.using(using)
+        .filter(pk=instance.pk)
+        .values_list(*VISIBLE_FIELDS)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, raw=False, **kwargs):
+    before = instance.__dict__.pop("_visible", None)
+    if created or raw or before is None:
+        return
+    if before == tuple(getattr(instance, field) for field in VISIBLE_FIELDS):
+        return
+    log_many("task_updated", [(instance.pk, task_payload(instance))], "task_id")
+
+
+@receiver(m2m_changed, sender=Task.contributors.through)
+def contributors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove") or not pk_set:
+        return
+    kind = "task_assigned" if action == "post_add" else "task_unassigned"
+    if reverse:
+        # user.contributors.add(*tasks)
+        for task in Task.objects.filter(pk__in=pk_set):
+            log_events(kind, [instance.pk], task_payload(task))
+    else:
+        log_events(kind, pk_set, task_payload(instance))
+
+
+@receiver(m2m_changed, sender=Task.cohorts.through)
+def cohorts_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove") or not pk_set:
+        return
+    kind = "task_assigned" if action == "post_add" else "task_unassigned"
+    if reverse:
+        # cohort.tasks.add(*tasks)
+        items = [
+            (instance.pk, task_payload(task))
+            for task in Task.objects.filter(pk__in=pk_set)
+        ]
+    else:
+        items = [(cohort_id, task_payload(instance)) for cohort_id in pk_set]
+    log_many(kind, items, audience="cohort_id")
+
+
+@receiver(post_save, sender=SubmittedTask)
+def submission_saved(sender, instance, created, raw=False, **kwargs):
+    if created or raw or not instance.modifier_id or not instance.creator_id:
+        return
+    log_events("submission_graded", [instance.creator_id], grade_payload(instance))
+
+
+def grade_payload(submission):
+    return {
+        "submission_id": submission.pk,
+        "task_id": submission.task_id,
+        "score": submission.score,
+        "is_approved": submission.is_approved,
+    }
+
+
+def latest_event_id(using="default"):
+    return EventLog.objects.using(using).aggregate(latest=Max("id"))["latest"] or 0
+
+
+def events_after(last_id, user_id=None, limit=500, using="default"):
+    """
+    Events after `last_id`, only those that reach `user_id` if given. That
+    is decided by the user's assignments and cohorts as they are now.
+    """
+    events = EventLog.objects.using(using).filter(pk__gt=last_id)
+    if user_id is not None:
+        cohorts = Cohort.members.through.objects.filter(user_id=user_id)
+        events = events.filter(
+            Q(user_id=user_id)
+            | Q(task_id__in=Task.objects.assigned_to(user_id).values("pk"))
+            | Q(cohort_id__in=cohorts.values("cohort_id"))
+        )
+    return list(
+        events.order_by("pk").values(
+            "id", "user_id", "task_id", "cohort_id", "kind", "payload"
+        )[:limit]
+    )
+
+
+def audiences(events, user_ids, using="default"):
+    """
+    Which of `user_ids` each task and cohort of `events` reaches, as
+    {task or cohort id: user ids}. Task and cohort ids are both uuid7, so
+    they share the keys.
+    """
+    task_ids = {event["task_id"] for event in events if event["task_id"]}
+    cohort_ids = {event["cohort_id"] for event in events if event["cohort_id"]}
+    reached = defaultdict(set)
+    pairs = []
+    if task_ids:
+        pairs += (
+            TaskAssignment.objects.using(using)
+            .filter(task_id__in=task_ids, user_id__in=user_ids)
+            .values_list("task_id", "user_id")
+        )
+        pairs += (
+            Task.cohorts.through.objects.using(using)
+            .filter(task_id__in=task_ids, cohort__members__in=user_ids)
+            .values_list("task_id", "cohort__members")
+        )
+    if cohort_ids:
+        pairs += (
+            Cohort.members.through.objects.using(using)
+            .filter(cohort_id__in=cohort_ids, user_id__in=user_ids)
+            .values_list("cohort_id", "user_id")
+        )
+    for pk, user_id in pairs:
+        reached[pk].add(user_id)
+    return reached
+
+
+def recipients(event, reached):
+    if event["user_id"]:
+        return (event["user_id"],)
+    return reached.get(event["task_id"] or event["cohort_id"], ())
+
+
+def purge_events(hours=None):
+    hours = settings.EVENT_LOG_RETENTION_HOURS if hours is None else hours
+    cutoff = timezone.now() - timedelta(hours=hours)
+    return EventLog.objects.filter(created_at__lt=cutoff).delete()[0]
+
+
+class EventHub:
+    """
+    In-process fan-out from the event logs to the connected streams.
+
+    Each stream owns an asyncio queue. One poller task per shard and event
+    loop reads the shard's new log rows, every `SSE_POLL_SECONDS` or when
+    woken by a local commit, and only runs while somebody on that shard is
+    subscribed.
+    """
+
+    def __init__(self):
+        # shard -> user id -> queues
+        self.subscribers = defaultdict(lambda: defaultdict(set))
+        self.loop = None
+        self.wakeups = {}
+        self.ready = {}
+        self.pollers = {}
+
+    async def subscribe(self, user_id, using="default"):
+        """
+        Register a stream for `user_id` on the shard `using`. Returns once
+        the poller has its starting point, so log rows read by the stream
+        afterwards overlap with what the poller delivers instead of leaving
+        a gap.
+        """
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.wakeups = {}
+            self.pollers = {}
+        if using not in self.wakeups:
+            self.wakeups[using] = asyncio.Event()
+        queue = asyncio.Queue()
+        self.subscribers[using][user_id].add(queue)
+        poller = self.pollers.get(using)
+        if poller is None or poller.done():
+            self.ready[using] = asyncio.Event()
+            self.pollers[using] = loop.create_task(self.poll(using, self.ready[using]))
+        try:
+            await self.ready[using].wait()
+        except asyncio.CancelledError:
+            self.unsubscribe(user_id, queue, using)
+            raise
+        return queue
+
+    def unsubscribe(self, user_id, queue, using="default"):
+        queues = self.subscribers[using].get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[using][user_id]
+
+    def wake(self, using="default"):
+        """Safe to call from any thread."""
+        loop, wakeup = self.loop, self.wakeups.get(using)
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def poll(self, using, ready):
+        try:
+            last_id = await sync_to_async(latest_event_id)(using)
+        finally:
+            ready.set()
+        subscribers, wakeup = self.subscribers[using], self.wakeups[using]
+        while subscribers:
+            events = await sync_to_async(events_after)(last_id, using=using)
+            reached = {}
+            if any(not event["user_id"] for event in events):
+                reached = await sync_to_async(audiences)(
+                    events, list(subscribers), using
+                )
+            for event in events:
+                last_id = event["id"]
+                for user_id in recipients(event, reached):
+                    for queue in subscribers.get(user_id, ()):
+                        queue.put_nowait(event)
+            try:
+                await asyncio.wait_for(wakeup.wait(), settings.SSE_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            wakeup.clear()
+
+
+hub = EventHub()
@@ -0,0 +1,143 @@
+"""
+`Idempotency-Key` support for POST endpoints.
+
+The first request with a key claims it by inserting an `IdempotencyKey`
+row; the unique constraint on (scope, route, key) is the per-key lock.
+Retries find the row and get the stored response without running the view,
+waiting first while the original request is still running; the wait only
+reads the row, and claims it again once it is gone or stale. A server
+error releases the key, so the retry runs the view for real.
+"""
+
+import hashlib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.response import Response
+
+from common.exceptions import UnprocessableEntityException
+from internapp.models import IdempotencyKey
+
+KEY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+# Seconds between checks on a key whose first request is still running.
+WAIT_INTERVAL = 0.1
+
+
+def fingerprint(request):
+    digest = hashlib.sha256(request.method.encode())
+    digest.update(request.path.encode())
+    digest.update(request.body)
+    return digest.hexdigest()
+
+
+def expiry():
+    return timezone.now() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+def abandoned():
+    return timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS)
+
+
+def stale(row):
+    """Whether `claim()` would take the row over."""
+    return row.created_at < expiry() or (
+        row.status_code is None and row.created_at < abandoned()
+    )
+
+
+def find(scope, route, key):
+    return IdempotencyKey.objects.filter(scope=scope, route=route, key=key).first()
+
+
+def claim(scope, route, key, digest):
+    """The key's row, and whether this request just claimed it."""
+    keys = IdempotencyKey.objects.filter(scope=scope, route=route, key=key)
+    # A claim left behind by a worker that died mid-request is taken over.
+    keys.filter(
+        Q(created_at__lt=expiry())
+        | Q(status_code__isnull=True, created_at__lt=abandoned())
+    ).delete()
+    try:
+        with transaction.atomic(using=router.db_for_write(IdempotencyKey)):
+            row = IdempotencyKey.objects.create(
+                scope=scope, route=route, key=key, fingerprint=digest
+            )
+        return row, True
+    except IntegrityError:
+        return keys.first(), False
+
+
+def purge_keys():
+    return IdempotencyKey.objects.filter(created_at__lt=expiry()).delete()[0]
+
+
+def rejected(message, code=None):
+    return UnprocessableEntityException(
+        {
+            "title": "Idempotency",
+            "message": message,
+        },
+        code=code,
+    )
+
+
+class IdempotentMixin:
+    """
+    Replays the stored response to a POST retried with the same
+    `Idempotency-Key` header, within IDEMPOTENCY_KEY_TTL_HOURS. Requests
+    without the header are handled as usual.
+    """
+
+    def post(self, request, *args, **kwargs):
+        key = request.headers.get(KEY_HEADER)
+        if key is None:
+            return super().post(request, *args, **kwargs)
+        if not 0 < len(key) <= 255:
+            raise rejected(f"{KEY_HEADER} should be 1 to 255 characters.")
+
+        scope = str(request.user.pk) if request.user.is_authenticated else ""
+        route = request.resolver_match.url_name
+        digest = fingerprint(request)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        row, claimed = claim(scope, route, key, digest)
+        while not claimed:
+            if row is None or stale(row):
+                # Released, expired or abandoned in between, claim it again.
+                row, claimed = claim(scope, route, key, digest)
+                continue
+            if row.fingerprint != digest:
+                raise rejected(f"{KEY_HEADER} was already used for another request.")
+            if row.status_code is not None:
+                return Response(
+                    row.response,
+                    status=row.status_code,
+                    headers={REPLAYED_HEADER: "true"},
+                )
+            if time.monotonic() > deadline:
+                raise rejected(
+                    f"A request with this {KEY_HEADER} is still in progress.",
+                    code=409,
+                )
+            time.sleep(WAIT_INTERVAL)
+            row = find(scope, route, key)
+
+        try:
+            response = super().post(request, *args, **kwargs)
+        except Exception as exc:
+            try:
+                response = self.handle_exception(exc)
+            except Exception:
+                row.delete()
+                raise
+        if response.status_code >= 500:
+            row.delete()
+        else:
+            row.status_code = response.status_code
+            row.response = response.data
+            row.save(update_fields=["status_code", "response"])
+        return response
@@ -0,0 +1,77 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from common.routers import use_shard
+from internapp.archive import archivable, archive_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed tasks, their contributor links and submissions into "
+        "the archive tables in batched transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            default=settings.ARCHIVE_AFTER_DAYS,
+            help="Archive tasks completed and untouched for this many days.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--max-batches", type=int, default=None, help="Stop after this many."
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to sleep between batches, to let writers through.",
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count what would move."
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        # Receivers of the deleted tasks write to the same shard.
+        with use_shard(options["database"]):
+            self.run(*args, **options)
+
+    def run(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["older_than"])
+        using = options["database"]
+        if options["dry_run"]:
+            count = archivable(cutoff, using).count()
+            self.stdout.write(f"{count} tasks would be archived")
+            return
+
+        started = time.perf_counter()
+        totals = [0, 0, 0]
+        batches = 0
+        while options["max_batches"] is None or batches < options["max_batches"]:
+            moved = archive_batch(cutoff, options["batch_size"], using)
+            if not moved[0]:
+                break
+            batches += 1
+            totals = [total + count for total, count in zip(totals, moved)]
+            self.stdout.write(
+                "batch {}: {} tasks, {} contributor links, {} submissions".format(
+                    batches, *moved
+                )
+            )
+            if options["pause"]:
+                time.sleep(options["pause"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Archived {} tasks, {} contributor links and {} submissions "
+                "in {:.1f} s".format(*totals, time.perf_counter() - started)
+            )
+        )
@@ -0,0 +1,69 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from internapp import rollups
+from internapp.models import ArchivedSubmission, SubmissionRollup, SubmittedTask
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the hourly and daily submission rollups from the live and "
+        "archived submissions, replacing the existing rollups in one "
+        "transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        started = time.perf_counter()
+        batch_size = options["batch_size"]
+        changes = rollups.Changes()
+        count = rows = 0
+        with transaction.atomic(using=using):
+            SubmissionRollup.objects.using(using).all().delete()
+            # A task's submissions are all live or all archived. In task
+            # order, the rollups of the tasks read so far are complete and
+            # are written out, so only about a batch of them is held.
+            for model in (SubmittedTask, ArchivedSubmission):
+                current = None
+                submissions = (
+                    model.objects.using(using)
+                    .order_by("task_id")
+                    .values_list(
+                        "task_id",
+                        "submission_date",
+                        "task__deadline",
+                        "modifier_id",
+                        "score",
+                    )
+                )
+                for (
+                    task_id,
+                    submitted_at,
+                    deadline,
+                    modifier,
+                    score,
+                ) in submissions.iterator(chunk_size=batch_size):
+                    if task_id != current and len(changes.rows) >= batch_size:
+                        rows += len(changes.rows)
+                        changes.create(using, batch_size)
+                    current = task_id
+                    changes.submitted(task_id, submitted_at, deadline)
+                    if modifier is not None:
+                        changes.graded(task_id, submitted_at, score)
+                    count += 1
+                rows += len(changes.rows)
+                changes.create(using, batch_size)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Rolled up {} submissions into {} rows in {:.1f} s".format(
+                    count, rows, time.perf_counter() - started
+                )
+            )
+        )
@@ -0,0 +1,366 @@
+import json
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from internapp.models import User, Task, SubmittedTask
+
+PASSWORD = "Bench@1234"
+API = "/api/v1/"
+
+
+class Fixtures:
+    """
+    Users and rows the benchmark requests act on.
+
+    Everything is created inside the benchmark transaction and rolled back
+    with it, so the seeded database is left untouched.
+    """
+
+    def __init__(self, iterations, supervisor_email=None, intern_email=None):
+        self.rng = random.Random(0)
+        self.supervisor = self.user("S", supervisor_email)
+        self.intern = self.user("I", intern_email)
+        self.tokens = {
+            user.pk: str(RefreshToken.for_user(user).access_token)
+            for user in (self.supervisor, self.intern)
+        }
+        deadline = timezone.now() + timedelta(days=7)
+        tasks = []
+        for index in range(2 * iterations):
+            task = Task.objects.create(
+                title=f"bench {index} {self.rng.random()}",
+                description="benchmark task",
+                deadline=deadline,
+                creator=self.supervisor,
+                status="O",
+            )
+            task.contributors.add(
+                self.intern, through_defaults={"deadline": task.deadline}
+            )
+            tasks.append(task)
+        self.submissions = [
+            SubmittedTask.objects.create(task=task, creator=self.intern)
+            for task in tasks[:iterations]
+        ]
+        self.open_tasks = tasks[iterations:]
+
+    def user(self, role, email):
+        if email:
+            user = User.objects.get(email=email)
+        else:
+            # Reuse a seeded user so the list endpoints return realistic pages.
+            if role == "S":
+                pk = Task.objects.values_list("creator", flat=True).first()
+            else:
+                pk = Task.contributors.through.objects.values_list(
+                    "user", flat=True
+                ).first()
+            user = User.objects.filter(pk=pk, role=role).first()
+            if user is None:
+                user = User.objects.create(
+                    full_name=f"Bench {role}",
+                    email=f"bench-{role.lower()}@example.com",
+                    role=role,
+                )
+        user.set_password(PASSWORD)
+        user.save()
+        return user
+
+    def auth(self, user):
+        return {"HTTP_AUTHORIZATION": f"Bearer {self.tokens[user.pk]}"}
+
+
+def registration(fx, i):
+    suffix = fx.rng.randrange(10**7)
+    return (
+        "post",
+        "account-registration/",
+        {
+            "role": "I",
+            "email": f"bench{suffix}@example.com",
+            "password": PASSWORD,
+            "full_name": "Bench Intern",
+            "phone": f"984{suffix:07d}",
+            "gender": "M",
+            "profile_pic": "",
+            "date_of_birth": "2000-01-01",
+            "contact_details": "bench",
+            "educational_background": "bench",
+            "work_experience": "1",
+        },
+        {},
+    )
+
+
+def login(fx, i):
+    payload = {"email": fx.intern.email, "password": PASSWORD}
+    return "post", "account-login/", payload, {}
+
+
+def task_create(fx, i):
+    payload = {
+        "title": f"bench create {i} {fx.rng.random()}",
+        "description": "benchmark task",
+        "deadline": (timezone.now() + timedelta(days=3)).isoformat(),
+    }
+    return "post", "task-create/", payload, fx.auth(fx.supervisor)
+
+
+def task_edit(fx, i):
+    task = fx.open_tasks[i % len(fx.open_tasks)]
+    payload = {
+        "title": task.title,
+        "description": "edited",
+        "status": "O",
+        "contributors": [str(fx.intern.pk)],
+    }
+    return "patch", f"task-edit/{task.pk}/", payload, fx.auth(fx.supervisor)
+
+
+def task_list_supervisor(fx, i):
+    return "get", "task-list-supervisor/", None, fx.auth(fx.supervisor)
+
+
+def task_list_intern(fx, i):
+    return "get", "task-list-intern/", None, fx.auth(fx.intern)
+
+
+def task_list_intern_sparse(fx, i):
+    path = "task-list-intern/?fields=title,deadline,status"
+    return "get", path, None, fx.auth(fx.intern)
+
+
+def submit_task(fx, i):
+    task = fx.open_tasks[i]
+    return "post", "submit-task/", {"task": str(task.pk)}, fx.auth(fx.intern)
+
+
+def grade(fx, i):
+    submission = fx.submissions[i]
+    payload = {"score": 8, "is_approved": True, "remarks": "bench"}
+    path = f"submit-task-edit/{submission.pk}"
+    return "patch", path, payload, fx.auth(fx.supervisor)
+
+
+def bulk_grade(fx, i):
+    payload = {
+        "submissions": [
+            {
+                "id": str(fx.submissions[(i * 10 + k) % len(fx.submissions)].pk),
+                "score": 7,
+                "is_approved": True,
+                "remarks": "bench",
+            }
+            for k in range(10)
+        ]
+    }
+    return "post", "submit-task-grade/", payload, fx.auth(fx.supervisor)
+
+
+def submitted_task_list(fx, i):
+    return "get", "submitted-task-list/", None, fx.auth(fx.intern)
+
+
+def archived_task_list(fx, i):
+    return "get", "archived-task-list/", None, fx.auth(fx.intern)
+
+
+def sync(fx, i):
+    return "get", "sync/?limit=100", None, fx.auth(fx.intern)
+
+
+def user_search(fx, i):
+    prefix = fx.intern.full_name[:2]
+    return "get", f"user-search/?q={prefix}", None, fx.auth(fx.supervisor)
+
+
+def submission_report(fx, i):
+    task = fx.open_tasks[i % len(fx.open_tasks)]
+    path = f"submission-report/?task={task.pk}&granularity=D"
+    return "get", path, None, fx.auth(fx.supervisor)
+
+
+# name -> (request builder, iterations cap). Login hashes a password, so it
+# runs fewer times.
+CASES = {
+    "account-registration": (registration, 20),
+    "account-login": (login, 20),
+    "task-create": (task_create, None),
+    "task-edit": (task_edit, None),
+    "task-list-supervisor": (task_list_supervisor, None),
+    "task-list-intern": (task_list_intern, None),
+    "task-list-intern-sparse": (task_list_intern_sparse, None),
+    "submit-task": (submit_task, None),
+    "submit-task-edit": (grade, None),
+    "submit-task-grade": (bulk_grade, None),
+    "submitted-task-list": (submitted_task_list, None),
+    "archived-task-list": (archived_task_list, None),
+    "sync": (sync, None),
+    "user-search": (user_search, None),
+    "submission-report": (submission_report, None),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every internapp endpoint in-process against the current "
+        "database: latency percentiles, throughput, queries and peak memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=3)
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            choices=list(CASES),
+            help="Only run these endpoints, may be repeated.",
+        )
+        parser.add_argument("--supervisor", help="Email of the supervisor to use.")
+        parser.add_argument("--intern", help="Email of the intern to use.")
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--compare", help="Baseline JSON file to compare with.")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.2,
+            help="Allowed relative p95 slowdown before --compare fails.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["endpoint"] or list(CASES)
+        iterations = options["iterations"]
+        warmup = options["warmup"]
+        results = {
+            "meta": self.meta(iterations),
+            "endpoints": {},
+        }
+        failures = []
+
+        # Replica routing and SQL logging would skew the numbers.
+        with override_settings(
+            REPLICA_READ_ROUTES=[], SQL_INSTRUMENTATION={"ENABLED": False}
+        ), transaction.atomic():
+            fixtures = Fixtures(
+                iterations + warmup + 1, options["supervisor"], options["intern"]
+            )
+            client = Client()
+            for name in names:
+                builder, cap = CASES[name]
+                runs = min(iterations, cap or iterations)
+                result = self.run_case(client, fixtures, builder, runs, warmup)
+                results["endpoints"][name] = result
+                self.print_result(name, result)
+                if result["errors"]:
+                    failures.append(f"{name}: {result['errors']} failed requests")
+            transaction.set_rollback(True)
+
+        if options["output"]:
+            with open(options["output"], "w") as fp:
+                json.dump(results, fp, indent=2)
+        if options["compare"]:
+            failures += self.compare(results, options["compare"], options["threshold"])
+        if failures:
+            raise CommandError("; ".join(failures))
+
+    def meta(self, iterations):
+        try:
+            revision = subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+            ).stdout.strip()
+        except OSError:
+            revision = ""
+        return {
+            "revision": revision,
+            "timestamp": timezone.now().isoformat(),
+            "iterations": iterations,
+            "rows": {
+                "users": User.objects.count(),
+                "tasks": Task.objects.count(),
+                "submissions": SubmittedTask.objects.count(),
+            },
+        }
+
+    def request(self, client, fixtures, builder, index):
+        method, path, payload, headers = builder(fixtures, index)
+        kwargs = dict(headers)
+        if payload is not None:
+            kwargs.update(data=payload, content_type="application/json")
+        return getattr(client, method)(API + path, **kwargs)
+
+    def run_case(self, client, fixtures, builder, runs, warmup):
+        index = 0
+        for _ in range(warmup):
+            self.request(client, fixtures, builder, index)
+            index += 1
+
+        latencies, queries, errors = [], [], 0
+        for _ in range(runs):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = self.request(client, fixtures, builder, index)
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(len(captured))
+            errors += response.status_code >= 400
+            index += 1
+
+        # Separate run: tracemalloc slows every allocation down.
+        tracemalloc.start()
+        self.request(client, fixtures, builder, index)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else []
+        return {
+            "runs": runs,
+            "errors": errors,
+            "p50_ms": round(statistics.median(latencies), 3),
+            "p95_ms": round(cuts[94], 3) if cuts else round(latencies[0], 3),
+            "p99_ms": round(cuts[98], 3) if cuts else round(latencies[0], 3),
+            "throughput_rps": round(1000 * runs / sum(latencies), 1),
+            "queries": round(statistics.mean(queries), 2),
+            "peak_memory_kb": round(peak / 1024, 1),
+        }
+
+    def print_result(self, name, result):
+        self.stdout.write(
+            "{:<22} p50 {p50_ms:>8.2f} ms  p95 {p95_ms:>8.2f} ms  "
+            "p99 {p99_ms:>8.2f} ms  {throughput_rps:>8.1f} req/s  "
+            "{queries:>6.1f} queries  {peak_memory_kb:>8.1f} KiB  "
+            "errors {errors}".format(name, **result)
+        )
+
+    def compare(self, results, path, threshold):
+        with open(path) as fp:
+            baseline = json.load(fp)["endpoints"]
+        failures = []
+        for name, result in results["endpoints"].items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if result["p95_ms"] > before["p95_ms"] * (1 + threshold):
+                failures.append(
+                    f"{name}: p95 {result['p95_ms']} ms vs {before['p95_ms']} ms"
+                )
+            if result["queries"] > before["queries"]:
+                failures.append(
+                    f"{name}: {result['queries']} queries vs {before['queries']}"
+                )
+        for failure in failures:
+            self.stderr.write(f"Regression {failure}")
+        return failures
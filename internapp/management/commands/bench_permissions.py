@@ -0,0 +1,90 @@
+import time
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+from django.urls import resolve
+from rest_framework import permissions
+
+from common import exceptions
+from common.permissions import IsAuthenticated, IsSupervisor
+from internapp.permissions import RolePermission
+
+
+class LegacyIsSupervisor(permissions.BasePermission):
+    """The per-role class the permission matrix replaced, for comparison."""
+
+    def has_permission(self, request, view):
+        flag = False
+        try:
+            flag = bool(request.user.role == "S")
+        except:
+            pass
+        if not flag:
+            raise exceptions.UnprocessableEntityException(
+                detail={
+                    "title": "Unauthenticated",
+                    "message": "Not authenticated for supervisor request",
+                },
+                code=401,
+            )
+        return flag
+
+
+def fake_request(role, method):
+    user = SimpleNamespace(
+        role=role, is_anonymous=False, is_blocked=False, is_active=True
+    )
+    return SimpleNamespace(user=user, method=method)
+
+
+def view_for(path):
+    """An instance of the view routed at `path`, with its bound role masks."""
+    return resolve(path).func.view_class()
+
+
+class Command(BaseCommand):
+    help = "Micro-benchmark the role permission checks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--number", type=int, default=200000)
+
+    def handle(self, *args, **options):
+        number = options["number"]
+        role_view = view_for("/api/v1/task-create/")
+        any_role_view = view_for("/api/v1/task-list-supervisor/")
+        # Before the matrix, role views ran the role class alone and views
+        # open to every role ran IsAuthenticated alone.
+        cases = [
+            ("legacy IsSupervisor", LegacyIsSupervisor(), role_view, "POST"),
+            ("role_permission('S')", IsSupervisor(), role_view, "POST"),
+            ("matrix, role view", RolePermission(), role_view, "POST"),
+            ("legacy IsAuthenticated", IsAuthenticated(), any_role_view, "GET"),
+            ("matrix, any-role view", RolePermission(), any_role_view, "GET"),
+        ]
+        for label, permission, view, method in cases:
+            outcomes = [("allowed", "S"), ("denied", "I")]
+            if view is any_role_view:
+                outcomes = outcomes[:1]
+            for outcome, role in outcomes:
+                request = fake_request(role, method)
+                seconds = self.time(permission.has_permission, request, view, number)
+                self.stdout.write(
+                    "{:<24} {:<8} {:>8.3f} us/check".format(
+                        label, outcome, seconds / number * 1e6
+                    )
+                )
+
+    def time(self, check, request, view, number):
+        """Best of three runs of `number` checks, less the bare loop."""
+
+        def run(check):
+            started = time.perf_counter()
+            for _ in range(number):
+                try:
+                    check(request, view)
+                except exceptions.UnprocessableEntityException:
+                    pass
+            return time.perf_counter() - started
+
+        loop = min(run(lambda request, view: True) for _ in range(3))
+        return min(run(check) for _ in range(3)) - loop
@@ -0,0 +1,93 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+
+from internapp.api.serializers.accounts import (
+    TaskCreateSerializer,
+    SubmitTaskListSerializer,
+)
+from internapp.api.serializers.readers import TaskReader, SubmittedTaskReader
+from internapp.models import Task, SubmittedTask
+
+# name -> (queryset, model serializer, prefetch for the fair variant, reader)
+CASES = {
+    "task": (Task.objects.all(), TaskCreateSerializer, ["contributors"], TaskReader),
+    "submission": (
+        SubmittedTask.objects.all(),
+        SubmitTaskListSerializer,
+        [],
+        SubmittedTaskReader,
+    ),
+}
+
+
+def normalize(rows):
+    # Many-to-many ids come back unordered from the serializer's own query.
+    return [
+        {
+            key: sorted(value) if isinstance(value, list) else value
+            for key, value in row.items()
+        }
+        for row in rows
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the values() readers against the model serializers they "
+        "replace on list pages of the current database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            action="append",
+            help="Page size to measure, may be repeated. Defaults to 10, 100, 1000.",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes = options["rows"] or [10, 100, 1000]
+        renderer = JSONRenderer()
+        for name, (queryset, serializer_class, prefetch, reader_class) in CASES.items():
+            available = queryset.count()
+            if available < max(sizes):
+                raise CommandError(
+                    f"Only {available} {name} rows, run seed_data for a bigger set."
+                )
+            for size in sizes:
+                page = queryset.order_by("pk")
+                variants = {
+                    "serializer": lambda: serializer_class(page[:size], many=True).data,
+                    "serializer+prefetch": lambda: serializer_class(
+                        page.prefetch_related(*prefetch)[:size], many=True
+                    ).data,
+                    "reader": lambda: reader_class().serialize(
+                        reader_class().project(page)[:size]
+                    ),
+                }
+                outputs = {}
+                for label, build in variants.items():
+                    timings, queries = [], 0
+                    for _ in range(options["repeat"]):
+                        with CaptureQueriesContext(connection) as captured:
+                            started = time.perf_counter()
+                            outputs[label] = build()
+                            timings.append((time.perf_counter() - started) * 1000)
+                        queries = len(captured)
+                    self.stdout.write(
+                        "{:<11} {:>5} rows  {:<20} {:>9.2f} ms  {:>5} queries".format(
+                            name, size, label, statistics.median(timings), queries
+                        )
+                    )
+                rendered = {
+                    label: renderer.render(normalize(data))
+                    for label, data in outputs.items()
+                }
+                if rendered["reader"] != rendered["serializer"]:
+                    raise CommandError(f"{name} reader output differs at {size} rows")
@@ -0,0 +1,162 @@
+import copy
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.utils import timezone
+
+from internapp.models import SubmittedTask, Task, User
+
+PROFILES = {
+    # The stock backend with CONN_MAX_AGE = 0: a new connection per
+    # request, rollback journal and deferred transactions.
+    "stock": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "CONN_MAX_AGE": 0,
+        "CONN_HEALTH_CHECKS": False,
+        "OPTIONS": {},
+    },
+    # DATABASES["default"] as configured.
+    "tuned": {},
+}
+USERS = 500
+TASKS = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Mixed read/write benchmark of the stock SQLite backend against the "
+        "configured common.db.sqlite3 one, through the ORM on a migrated "
+        "scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--seconds", type=float, default=5.0)
+        parser.add_argument("--write-ratio", type=float, default=0.2)
+        parser.add_argument("--rows", type=int, default=50000)
+
+    def handle(self, *args, **options):
+        for name, profile in PROFILES.items():
+            with tempfile.TemporaryDirectory() as directory:
+                alias = f"bench_{name}"
+                self.add_database(
+                    alias, os.path.join(directory, "bench.sqlite3"), profile
+                )
+                try:
+                    users, tasks = self.prepare(alias, options["rows"])
+                    result = self.run_profile(alias, users, tasks, options)
+                finally:
+                    connections[alias].close()
+                    del connections.settings[alias]
+            self.report(name, result, options["seconds"])
+
+    def add_database(self, alias, path, profile):
+        settings_dict = copy.deepcopy(connections.settings["default"])
+        settings_dict.update(copy.deepcopy(profile), NAME=path)
+        connections.settings[alias] = settings_dict
+
+    def prepare(self, alias, rows):
+        call_command("migrate", database=alias, verbosity=0)
+        # bulk_create keeps the signal receivers, which write to the routed
+        # databases, out of the benchmark.
+        users = User.objects.using(alias).bulk_create(
+            User(full_name=f"Bench {i}", role="I") for i in range(USERS)
+        )
+        deadline = timezone.now() + timedelta(days=30)
+        tasks = Task.objects.using(alias).bulk_create(
+            Task(title=f"Task {i}", description="x", deadline=deadline, status="O")
+            for i in range(TASKS)
+        )
+        SubmittedTask.objects.using(alias).bulk_create(
+            (
+                SubmittedTask(
+                    task_id=tasks[i % TASKS].pk,
+                    creator_id=users[i % USERS].pk,
+                    remarks="x" * 200,
+                )
+                for i in range(rows)
+            ),
+            batch_size=1000,
+        )
+        connections[alias].close()
+        return [user.pk for user in users], [task.pk for task in tasks]
+
+    def run_profile(self, alias, users, tasks, options):
+        deadline = time.perf_counter() + options["seconds"]
+        results = {"reads": [], "writes": [], "locked": 0}
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            reads, writes, locked = [], [], 0
+            while time.perf_counter() < deadline:
+                task = rng.choice(tasks)
+                started = time.perf_counter()
+                try:
+                    if rng.random() < options["write_ratio"]:
+                        self.write(alias, task, rng.choice(users))
+                        writes.append(time.perf_counter() - started)
+                    else:
+                        list(
+                            SubmittedTask.objects.using(alias)
+                            .filter(task_id=task)
+                            .values_list("id", "creator_id", "score")[:20]
+                        )
+                        reads.append(time.perf_counter() - started)
+                except OperationalError:
+                    locked += 1
+                # What request_finished does at the end of every request.
+                connections[alias].close_if_unusable_or_obsolete()
+            connections[alias].close()
+            with lock:
+                results["reads"] += reads
+                results["writes"] += writes
+                results["locked"] += locked
+
+        threads = [
+            threading.Thread(target=worker, args=(seed,))
+            for seed in range(options["threads"])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def write(self, alias, task, user):
+        # Read then write inside one transaction, like the submit endpoint's
+        # duplicate check followed by the insert.
+        with transaction.atomic(using=alias):
+            submissions = SubmittedTask.objects.using(alias)
+            submissions.filter(task_id=task, creator_id=user).exists()
+            submissions.bulk_create(
+                [SubmittedTask(task_id=task, creator_id=user, remarks="y" * 200)]
+            )
+
+    def report(self, name, result, seconds):
+        def percentile(samples, pct):
+            if not samples:
+                return 0.0
+            return statistics.quantiles(samples, n=100)[pct - 1] * 1000
+
+        total = len(result["reads"]) + len(result["writes"])
+        self.stdout.write(
+            "{:<6} {:>8.0f} ops/s  reads p50 {:.2f} ms p95 {:.2f} ms  "
+            "writes p50 {:.2f} ms p95 {:.2f} ms  locked errors {}".format(
+                name,
+                total / seconds,
+                percentile(result["reads"], 50),
+                percentile(result["reads"], 95),
+                percentile(result["writes"], 50),
+                percentile(result["writes"], 95),
+                result["locked"],
+            )
+        )
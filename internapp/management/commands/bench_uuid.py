@@ -0,0 +1,104 @@
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from uuid import uuid4
+
+from django.core.management.base import BaseCommand
+
+from common.db.sqlite3.base import DEFAULT_PRAGMAS
+from common.utils import uuid7
+
+# Same column types Django uses for the UUID keys on SQLite.
+SCHEMA = """
+CREATE TABLE task (
+    id char(32) NOT NULL PRIMARY KEY,
+    title varchar(100) NOT NULL
+);
+CREATE TABLE submission (
+    id char(32) NOT NULL PRIMARY KEY,
+    task_id char(32) NOT NULL REFERENCES task (id),
+    remarks text
+);
+CREATE INDEX submission_task_id ON submission (task_id);
+"""
+INDEXES = ["sqlite_autoindex_submission_1", "submission_task_id"]
+
+GENERATORS = {"uuid4": uuid4, "uuid7": uuid7}
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert throughput and index size of submission rows keyed by random "
+        "uuid4 against time-ordered uuid7 primary keys."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1_000_000)
+        parser.add_argument("--batch", type=int, default=10_000)
+        # New submissions point at one of the most recent tasks.
+        parser.add_argument("--open-tasks", type=int, default=200)
+        parser.add_argument("--submissions-per-task", type=int, default=20)
+
+    def handle(self, *args, **options):
+        for name, generate in GENERATORS.items():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "bench.sqlite3")
+                result = self.run(path, generate, options)
+            self.report(name, result, options)
+
+    def run(self, path, generate, options):
+        conn = sqlite3.connect(path, isolation_level=None)
+        for pragma, value in DEFAULT_PRAGMAS.items():
+            conn.execute(f"PRAGMA {pragma} = {value}")
+        conn.executescript(SCHEMA)
+        rng = random.Random(1)
+        tasks = []
+        batches = []
+        inserted = 0
+        while inserted < options["rows"]:
+            size = min(options["batch"], options["rows"] - inserted)
+            new_tasks = [
+                generate().hex
+                for _ in range(max(1, size // options["submissions_per_task"]))
+            ]
+            tasks = (tasks + new_tasks)[-options["open_tasks"] :]
+            rows = [(generate().hex, rng.choice(tasks), "x" * 40) for _ in range(size)]
+            started = time.perf_counter()
+            conn.execute("BEGIN")
+            conn.executemany(
+                "INSERT INTO task (id, title) VALUES (?, 'bench')",
+                ((task,) for task in new_tasks),
+            )
+            conn.executemany(
+                "INSERT INTO submission (id, task_id, remarks) VALUES (?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+            batches.append(time.perf_counter() - started)
+            inserted += size
+        sizes = dict(
+            conn.execute(
+                "SELECT name, SUM(pgsize) FROM dbstat WHERE name IN (?, ?) "
+                "GROUP BY name",
+                INDEXES,
+            ).fetchall()
+        )
+        conn.close()
+        return {"batches": batches, "sizes": sizes}
+
+    def report(self, name, result, options):
+        batches = result["batches"]
+        tail = batches[-max(1, len(batches) // 10) :]
+        tail_rows = min(options["rows"], len(tail) * options["batch"])
+        self.stdout.write(
+            "{:<6} {:>8.0f} rows/s overall  {:>8.0f} rows/s last 10%  "
+            "pk index {:.1f} MB  task_id index {:.1f} MB".format(
+                name,
+                options["rows"] / sum(batches),
+                tail_rows / sum(tail),
+                result["sizes"].get(INDEXES[0], 0) / 2**20,
+                result["sizes"].get(INDEXES[1], 0) / 2**20,
+            )
+        )
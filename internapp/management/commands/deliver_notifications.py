@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from internapp.outbox import claim, deliver, purge
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued outbox notifications in batches, one email digest per "
+        "recipient."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5.0,
+            help="Seconds to wait when there is nothing to send.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the outbox is drained instead of polling.",
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        while True:
+            events = claim(options["batch_size"], using)
+            if events:
+                delivered, failed = deliver(events, using)
+                self.stdout.write(
+                    f"{len(events)} events: {delivered} delivered, {failed} failed"
+                )
+                continue
+
+            purged = purge(settings.OUTBOX_RETENTION_DAYS, using)
+            if purged:
+                self.stdout.write(f"Purged {purged} delivered events")
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from common.schema import RENDERERS, schema_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Render the OpenAPI schema into SCHEMA_CACHE_DIR so workers serve it from disk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            dest="formats",
+            action="append",
+            choices=list(RENDERERS),
+            help="Format to render, may be repeated. Defaults to every format.",
+        )
+
+    def handle(self, *args, **options):
+        entries = schema_cache.generate(options["formats"])
+        for fmt, entry in entries.items():
+            self.stdout.write(
+                "{} {} bytes ({} gzipped) etag={}".format(
+                    schema_cache.path_for(fmt),
+                    len(entry.body),
+                    len(entry.gzipped),
+                    entry.etag,
+                )
+            )
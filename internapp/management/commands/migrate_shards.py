@@ -0,0 +1,32 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from common.routers import shard_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        "Run migrate on every shard in SHARD_DATABASES, the default database "
+        "first. The catalog tables are only created on the default one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("app_label", nargs="?")
+        parser.add_argument("migration_name", nargs="?")
+
+    def handle(self, *args, **options):
+        arguments = [
+            argument
+            for argument in (options["app_label"], options["migration_name"])
+            if argument
+        ]
+        for alias in shard_aliases():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"Shard {alias}:"))
+            call_command(
+                "migrate",
+                *arguments,
+                database=alias,
+                interactive=False,
+                verbosity=options["verbosity"],
+                stdout=self.stdout,
+            )
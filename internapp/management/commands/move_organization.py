@@ -0,0 +1,70 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from internapp.models import Organization
+from internapp.tenants import flush_tables, move_organization, tenant_models
+
+
+class Command(BaseCommand):
+    help = (
+        "Move an organization to another, empty shard. The organization is "
+        "read only during the copy; its rows stay on the old shard unless "
+        "--purge-source is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("organization", help="Slug of the organization.")
+        parser.add_argument("shard", help="Database alias to move it to.")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--no-wait",
+            action="store_true",
+            help=(
+                "Copy at once instead of waiting SHARD_CACHE_SECONDS for the "
+                "workers to stop writing; only when none are running."
+            ),
+        )
+        parser.add_argument(
+            "--purge-source",
+            action="store_true",
+            help="Delete the organization's rows from the old shard afterwards.",
+        )
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.filter(slug=options["organization"]).first()
+        if organization is None:
+            raise CommandError(f"No organization '{options['organization']}'.")
+        source = organization.shard
+        started = time.perf_counter()
+        try:
+            copied = move_organization(
+                organization,
+                options["shard"],
+                batch_size=options["batch_size"],
+                wait=not options["no_wait"],
+                log=self.stdout.write,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Moved {} from {} to {}: {} rows in {:.1f} s".format(
+                    organization.slug,
+                    source,
+                    organization.shard,
+                    sum(copied.values()),
+                    time.perf_counter() - started,
+                )
+            )
+        )
+        if options["purge_source"]:
+            if not options["no_wait"]:
+                # Workers may read the old shard until their cache expires.
+                time.sleep(settings.SHARD_CACHE_SECONDS)
+            try:
+                flush_tables(tenant_models(), source)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(f"Deleted the rows left on {source}")
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh SQLite planner statistics with PRAGMA optimize (or a full "
+        "ANALYZE) and checkpoint the WAL. Schedule it, or pass --every."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--analyze", action="store_true", help="Run a full ANALYZE."
+        )
+        parser.add_argument(
+            "--every",
+            type=int,
+            default=0,
+            help="Repeat every N seconds instead of running once.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            self.optimize(options["database"], options["analyze"])
+            if not options["every"]:
+                break
+            time.sleep(options["every"])
+
+    def optimize(self, alias, analyze):
+        connection = connections[alias]
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE" if analyze else "PRAGMA optimize")
+            cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            busy, wal_pages, checkpointed = cursor.fetchone()
+        self.stdout.write(
+            "{} {} in {:.1f} ms, wal checkpoint busy={} pages={}/{}".format(
+                alias,
+                "ANALYZE" if analyze else "PRAGMA optimize",
+                (time.perf_counter() - started) * 1000,
+                busy,
+                checkpointed,
+                wal_pages,
+            )
+        )
+        connection.close()
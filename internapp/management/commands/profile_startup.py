@@ -0,0 +1,185 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter so nothing is already imported. Prints the
+# phase timings as one JSON line; `-X importtime` writes to stderr.
+PROBE = """
+import json, os, sys, time
+t0 = time.perf_counter()
+phases = {}
+
+def mark(name):
+    global t0
+    now = time.perf_counter()
+    phases[name] = (now - t0) * 1000
+    t0 = now
+
+import django
+from django.conf import settings
+mark("import django")
+settings.INSTALLED_APPS
+mark("settings")
+from django.utils.log import configure_logging
+configure_logging(settings.LOGGING_CONFIG, settings.LOGGING)
+mark("logging")
+from django.apps import apps
+apps.populate(settings.INSTALLED_APPS)
+mark("apps.populate")
+from django.urls import get_resolver
+get_resolver().url_patterns
+mark("urlconf")
+if %(check)r:
+    from django.core import checks
+    checks.run_checks()
+    mark("checks")
+if %(path)r:
+    from django.test import Client
+    Client(raise_request_exception=False).get(%(path)r)
+    mark("first request")
+print(json.dumps(phases))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile cold start in a fresh interpreter: import time per module "
+        "(-X importtime), django.setup() phases and the first request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default="/api/v1/task-list-intern/",
+            help="Request path used for the first-request phase.",
+        )
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument(
+            "--no-check", action="store_true", help="Skip the system checks phase."
+        )
+        parser.add_argument(
+            "--runs", type=int, default=3, help="Keep the fastest of this many runs."
+        )
+        parser.add_argument("--json", action="store_true", help="Emit JSON only.")
+        parser.add_argument(
+            "--enforce",
+            action="store_true",
+            help="Fail when a phase exceeds STARTUP_BUDGET_MS.",
+        )
+
+    def handle(self, *args, **options):
+        best = None
+        for _ in range(max(options["runs"], 1)):
+            result = self.probe(options["path"], not options["no_check"])
+            if best is None or result["total_ms"] < best["total_ms"]:
+                best = result
+        modules = best.pop("modules")
+        best["top_modules"] = sorted(
+            modules, key=lambda item: item["cumulative_ms"], reverse=True
+        )[: options["top"]]
+        best["packages"] = self.by_package(modules, options["top"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(best, indent=2))
+        else:
+            self.report(best)
+
+        if options["enforce"]:
+            self.enforce(best)
+
+    def probe(self, path, check):
+        env = dict(os.environ)
+        env.setdefault("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [
+                sys.executable,
+                "-X",
+                "importtime",
+                "-c",
+                PROBE % {"path": path, "check": check},
+            ],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        wall = (time.perf_counter() - started) * 1000
+        if proc.returncode:
+            raise CommandError(self.failure(proc))
+        phases = json.loads(proc.stdout.strip().splitlines()[-1])
+        return {
+            "wall_ms": round(wall, 1),
+            "total_ms": round(sum(phases.values()), 1),
+            "phases": {name: round(ms, 1) for name, ms in phases.items()},
+            "modules": self.parse_importtime(proc.stderr),
+        }
+
+    def failure(self, proc):
+        # The traceback is mixed in with the `-X importtime` lines, and a
+        # crash may leave no output at all.
+        lines = [
+            line
+            for line in proc.stderr.splitlines()
+            if line.strip() and not line.startswith("import time:")
+        ]
+        if lines:
+            return lines[-1]
+        return f"Startup probe exited with status {proc.returncode}."
+
+    def parse_importtime(self, stderr):
+        modules = []
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "self [us]" in line:
+                continue
+            own, cumulative, name = line[len("import time:") :].split("|")
+            modules.append(
+                {
+                    "module": name.strip(),
+                    "self_ms": int(own) / 1000,
+                    "cumulative_ms": int(cumulative) / 1000,
+                }
+            )
+        return modules
+
+    def by_package(self, modules, top):
+        totals = defaultdict(float)
+        for item in modules:
+            totals[item["module"].split(".")[0]] += item["self_ms"]
+        ordered = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+        return [
+            {"package": name, "self_ms": round(ms, 1)} for name, ms in ordered[:top]
+        ]
+
+    def report(self, result):
+        self.stdout.write(
+            "Cold start: {total_ms} ms in phases, {wall_ms} ms wall".format(**result)
+        )
+        for name, ms in result["phases"].items():
+            self.stdout.write(f"  {name:<16} {ms:>9.1f} ms")
+        self.stdout.write("\nSlowest packages (self time):")
+        for item in result["packages"]:
+            self.stdout.write(f"  {item['package']:<40} {item['self_ms']:>9.1f} ms")
+        self.stdout.write("\nSlowest modules (cumulative):")
+        for item in result["top_modules"]:
+            self.stdout.write(
+                f"  {item['module']:<50} {item['cumulative_ms']:>9.1f} ms"
+            )
+
+    def enforce(self, result):
+        budget = getattr(settings, "STARTUP_BUDGET_MS", {})
+        measured = dict(result["phases"], total=result["total_ms"])
+        over = [
+            f"{name} {measured[name]:.1f} ms > {limit} ms"
+            for name, limit in budget.items()
+            if name in measured and measured[name] > limit
+        ]
+        if over:
+            raise CommandError("Startup budget exceeded: " + "; ".join(over))
+        self.stdout.write(self.style.SUCCESS("Startup within budget"))
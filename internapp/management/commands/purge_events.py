@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from common.routers import use_shard
+from internapp.events import purge_events
+from internapp.idempotency import purge_keys
+from internapp.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete event log rows older than EVENT_LOG_RETENTION_HOURS, sync "
+        "tombstones older than SYNC_TOMBSTONE_RETENTION_DAYS and idempotency "
+        "keys older than IDEMPOTENCY_KEY_TTL_HOURS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours", type=int, default=settings.EVENT_LOG_RETENTION_HOURS
+        )
+        parser.add_argument(
+            "--tombstone-days",
+            type=int,
+            default=settings.SYNC_TOMBSTONE_RETENTION_DAYS,
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        with use_shard(options["database"]):
+            self.run(*args, **options)
+
+    def run(self, *args, **options):
+        events = purge_events(options["hours"])
+        tombstones = purge_tombstones(options["tombstone_days"])
+        keys = purge_keys()
+        self.stdout.write(
+            f"Deleted {events} events, {tombstones} tombstones and {keys} "
+            "idempotency keys"
+        )
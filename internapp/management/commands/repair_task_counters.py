@@ -0,0 +1,45 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from internapp.counters import repair
+from internapp.models import Task
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the assigned, submitted, approved and score counters of "
+        "every task and fix the ones that drifted, in batched transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Only count the drifted tasks."
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        started = time.perf_counter()
+        checked = drifted = 0
+        last = None
+        while True:
+            tasks = Task.objects.using(using).order_by("pk")
+            if last is not None:
+                tasks = tasks.filter(pk__gt=last)
+            ids = list(tasks.values_list("pk", flat=True)[: options["batch_size"]])
+            if not ids:
+                break
+            last = ids[-1]
+            checked += len(ids)
+            drifted += repair(ids, using, dry_run=options["dry_run"])
+
+        verb = "would be repaired" if options["dry_run"] else "repaired"
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Checked {} tasks, {} {} in {:.1f} s".format(
+                    checked, drifted, verb, time.perf_counter() - started
+                )
+            )
+        )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from common.routers import use_shard
+from common.utils import validate_uuid
+from internapp.archive import restore_task
+
+
+class Command(BaseCommand):
+    help = "Move archived tasks back into the hot tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument("task_ids", nargs="+")
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        # Receivers of the restored rows write to the same shard.
+        with use_shard(options["database"]):
+            self.run(*args, **options)
+
+    def run(self, *args, **options):
+        missing = []
+        for task_id in options["task_ids"]:
+            if not validate_uuid(task_id):
+                raise CommandError(f"Invalid task id: {task_id}")
+            restored = restore_task(task_id, options["database"])
+            if restored is None:
+                missing.append(task_id)
+                continue
+            self.stdout.write(
+                "Restored {} with {} contributor links and {} submissions".format(
+                    task_id, *restored
+                )
+            )
+        if missing:
+            raise CommandError("Not archived: " + ", ".join(missing))
@@ -0,0 +1,388 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from internapp import rollups
+from internapp.models import (
+    Organization,
+    OrganizationMember,
+    User,
+    InternProfile,
+    SupervisorProfile,
+    Task,
+    TaskAssignment,
+    SubmittedTask,
+)
+
+FIRST_NAMES = (
+    "Aarav Anita Bikash Deepa Gita Hari Kiran Laxmi Manish Nisha Prakash "
+    "Ramesh Sita Sunil Suraj Usha"
+).split()
+LAST_NAMES = (
+    "Adhikari Basnet Gurung Karki Khadka Magar Rai Shahi Sharma Shrestha "
+    "Tamang Thapa"
+).split()
+TITLE_WORDS = (
+    "api audit cache dashboard deploy docs export fix import login migrate "
+    "report review search"
+).split()
+
+
+class RowInserter:
+    """
+    Prepared INSERT for `model`, fed with values keyed by attname.
+
+    Skips model instantiation and per batch SQL compilation. Columns that
+    are not given get the field default, so new model fields keep working.
+    """
+
+    def __init__(self, model, using):
+        self.connection = connections[using]
+        self.fields = [
+            field
+            for field in model._meta.concrete_fields
+            if not (field.primary_key and isinstance(field, models.AutoField))
+        ]
+        quote = self.connection.ops.quote_name
+        self.sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            quote(model._meta.db_table),
+            ", ".join(quote(field.column) for field in self.fields),
+            ", ".join(["%s"] * len(self.fields)),
+        )
+        self.rows = []
+        self.count = 0
+
+    def add(self, **values):
+        self.rows.append(
+            tuple(
+                field.get_db_prep_save(
+                    (
+                        values[field.attname]
+                        if field.attname in values
+                        else field.get_default()
+                    ),
+                    connection=self.connection,
+                )
+                for field in self.fields
+            )
+        )
+
+    def flush(self):
+        if self.rows:
+            with self.connection.cursor() as cursor:
+                cursor.executemany(self.sql, self.rows)
+            self.count += len(self.rows)
+            self.rows = []
+
+
+@contextmanager
+def manual_timestamps(*models):
+    """Let generated rows carry their own created/submission dates."""
+    fields = [
+        field
+        for model in models
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now_add", False) or getattr(field, "auto_now", False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic dataset of users, profiles, tasks, contributor "
+        "links and submissions for scale testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--tasks", type=int, default=5000)
+        parser.add_argument("--submissions", type=int, default=20000)
+        parser.add_argument(
+            "--supervisor-ratio",
+            type=float,
+            default=0.02,
+            help="Share of generated users who are supervisors.",
+        )
+        parser.add_argument(
+            "--fanout",
+            type=float,
+            default=5.0,
+            help="Average number of interns assigned to a task.",
+        )
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--password", default="Password@123")
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--organization",
+            help=(
+                "Slug of the organization to seed, on its shard. A missing one "
+                "is created on --database."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.db = options["database"]
+        self.organization = self.get_organization(options["organization"])
+        if self.organization is not None:
+            self.db = self.organization.shard
+        self.chunk_size = options["chunk_size"]
+        self.now = timezone.now()
+        self.days = options["days"]
+        started = time.perf_counter()
+
+        with manual_timestamps(User):
+            supervisors, interns = self.create_users(options)
+            self.create_tasks(supervisors, interns, options)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Seeded in {:.1f} s".format(time.perf_counter() - started)
+            )
+        )
+
+    def get_organization(self, slug):
+        if not slug:
+            return Organization.objects.filter(shard=self.db).first()
+        organization = Organization.objects.filter(slug=slug).first()
+        if organization is None:
+            if Organization.objects.filter(shard=self.db).exists():
+                raise CommandError(f"'{self.db}' already holds an organization.")
+            organization = Organization.objects.create(
+                name=slug, slug=slug, shard=self.db
+            )
+        return organization
+
+    def random_past(self):
+        return self.now - timedelta(seconds=self.rng.randrange(self.days * 86400))
+
+    def flush(self, model, rows):
+        if rows:
+            model.objects.using(self.db).bulk_create(rows, batch_size=self.chunk_size)
+            rows.clear()
+
+    def report(self, label, count, started):
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            "{:<12} {:>10} rows in {:>6.1f} s ({:.0f} rows/s)".format(
+                label, count, elapsed, count / elapsed if elapsed else 0
+            )
+        )
+
+    def taken_indices(self, indices):
+        """
+        The user indices whose generated email or phone is already used on
+        this shard or, since they are unique across the shards, in the
+        directory.
+        """
+        emails = {f"user{index}@example.com": index for index in indices}
+        phones = {f"98{index:08d}": index for index in indices}
+        taken = set()
+        for users in (User.objects.using(self.db), OrganizationMember.objects):
+            taken.update(
+                emails[email]
+                for email in users.filter(email__in=emails).values_list(
+                    "email", flat=True
+                )
+            )
+            taken.update(
+                phones[phone]
+                for phone in users.filter(phone__in=phones).values_list(
+                    "phone", flat=True
+                )
+            )
+        return taken
+
+    def free_indices(self, start, count):
+        """`count` user indices from `start` on, skipping the taken ones."""
+        while count:
+            batch = range(start, start + min(count, self.chunk_size))
+            taken = self.taken_indices(batch)
+            for index in batch:
+                if index not in taken:
+                    count -= 1
+                    yield index
+            start = batch.stop
+
+    def create_users(self, options):
+        started = time.perf_counter()
+        password = make_password(options["password"])
+        offset = max(
+            User.objects.using(self.db).count(), OrganizationMember.objects.count()
+        )
+        total = options["users"]
+        supervisor_count = max(1, int(total * options["supervisor_ratio"]))
+        supervisors, interns = [], []
+        users, intern_profiles, supervisor_profiles = [], [], []
+
+        for position, index in enumerate(self.free_indices(offset, total)):
+            is_supervisor = position < supervisor_count
+            name = "{} {}".format(
+                self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            )
+            user = User(
+                full_name=name,
+                slug=f"{slugify(name)}-{index}",
+                email=f"user{index}@example.com",
+                phone=f"98{index:08d}",
+                gender=self.rng.choice("MFO"),
+                role="S" if is_supervisor else "I",
+                password=password,
+                joined_date=self.random_past(),
+            )
+            users.append(user)
+            (supervisors if is_supervisor else interns).append(user.id)
+            profile = (SupervisorProfile if is_supervisor else InternProfile)(
+                user=user,
+                contact_details=user.phone,
+                educational_background="Bachelor in Computer Science",
+                work_experience=str(self.rng.randint(0, 5)),
+            )
+            (supervisor_profiles if is_supervisor else intern_profiles).append(profile)
+
+            if len(users) >= self.chunk_size:
+                self.flush_users(users, intern_profiles, supervisor_profiles)
+        self.flush_users(users, intern_profiles, supervisor_profiles)
+        self.report("users", total, started)
+        return supervisors, interns
+
+    def flush_users(self, users, intern_profiles, supervisor_profiles):
+        members = []
+        if self.organization is not None:
+            members = [
+                OrganizationMember(
+                    user_id=user.id,
+                    organization=self.organization,
+                    email=user.email,
+                    phone=user.phone,
+                )
+                for user in users
+            ]
+        with transaction.atomic(using=self.db):
+            self.flush(User, users)
+            self.flush(InternProfile, intern_profiles)
+            self.flush(SupervisorProfile, supervisor_profiles)
+        # The directory is on the default database, written once the users are.
+        OrganizationMember.objects.bulk_create(members, batch_size=self.chunk_size)
+
+    def create_tasks(self, supervisors, interns, options):
+        started = time.perf_counter()
+        tasks = RowInserter(Task, self.db)
+        contributors = RowInserter(TaskAssignment, self.db)
+        submissions = RowInserter(SubmittedTask, self.db)
+        changes = rollups.Changes()
+        total = options["tasks"]
+        fanout = min(options["fanout"], len(interns))
+        # Probability that an assignment is submitted, so the expected total
+        # matches --submissions.
+        submit_rate = min(1.0, options["submissions"] / max(total * fanout, 1))
+        remaining = options["submissions"]
+        rollup_count = 0
+
+        for index in range(total):
+            task_id = Task._meta.pk.get_default()
+            creator = self.rng.choice(supervisors)
+            created_at = self.random_past()
+            deadline = created_at + timedelta(days=self.rng.randint(1, 30))
+            if deadline < self.now:
+                status = self.rng.choices("OC", weights=(2, 8))[0]
+            else:
+                status = self.rng.choices("DO", weights=(1, 4))[0]
+
+            size = min(len(interns), max(1, round(self.rng.expovariate(1 / fanout))))
+            counts = {"submitted_count": 0, "approved_count": 0, "score_total": 0}
+            for intern in self.rng.sample(interns, size):
+                progress = "A"
+                if remaining and status != "D" and self.rng.random() < submit_rate:
+                    remaining -= 1
+                    submission = self.add_submission(
+                        submissions, task_id, creator, intern, created_at, deadline
+                    )
+                    progress = "R" if submission["modifier_id"] else "S"
+                    changes.submitted(task_id, submission["submission_date"], deadline)
+                    if submission["modifier_id"]:
+                        changes.graded(
+                            task_id, submission["submission_date"], submission["score"]
+                        )
+                    counts["submitted_count"] += 1
+                    counts["approved_count"] += submission["is_approved"]
+                    counts["score_total"] += submission["score"]
+                contributors.add(
+                    task_id=task_id,
+                    user_id=intern,
+                    status=progress,
+                    deadline=deadline,
+                    assigned_at=created_at,
+                )
+            tasks.add(
+                id=task_id,
+                title="{} {} #{}".format(
+                    self.rng.choice(TITLE_WORDS), self.rng.choice(TITLE_WORDS), index
+                ),
+                description=" ".join(self.rng.choices(TITLE_WORDS, k=60)),
+                creator_id=creator,
+                status=status,
+                deadline=deadline,
+                created_at=created_at,
+                modified_at=created_at,
+                assigned_count=size,
+                **counts,
+            )
+
+            if len(tasks.rows) >= self.chunk_size:
+                rollup_count += self.flush_tasks(
+                    tasks, contributors, submissions, changes
+                )
+        rollup_count += self.flush_tasks(tasks, contributors, submissions, changes)
+        self.report("tasks", tasks.count, started)
+        self.report("contributors", contributors.count, started)
+        self.report("submissions", submissions.count, started)
+        self.report("rollups", rollup_count, started)
+
+    def add_submission(self, rows, task_id, creator, intern, created_at, deadline):
+        submitted_at = min(
+            created_at + (deadline - created_at) * (self.rng.random() * 1.2),
+            self.now,
+        )
+        graded = self.rng.random() < 0.7
+        score = self.rng.randint(3, 10) if graded else 0
+        submission = dict(
+            id=SubmittedTask._meta.pk.get_default(),
+            task_id=task_id,
+            creator_id=intern,
+            modifier_id=creator if graded else None,
+            submission_date=submitted_at,
+            created_at=submitted_at,
+            modified_at=submitted_at,
+            is_approved=graded and score >= 5,
+            score=score,
+            remarks="Looks good" if graded else None,
+        )
+        rows.add(**submission)
+        return submission
+
+    def flush_tasks(self, tasks, contributors, submissions, changes):
+        """Write a chunk of tasks; their rollups are complete with them."""
+        rollup_count = len(changes.rows)
+        with transaction.atomic(using=self.db):
+            tasks.flush()
+            contributors.flush()
+            submissions.flush()
+            changes.create(self.db, self.chunk_size)
+        return rollup_count
@@ -0,0 +1,48 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from common.routers import shard_aliases
+from internapp.models import Organization, OrganizationMember, SubmittedTask, Task, User
+
+
+class Command(BaseCommand):
+    help = (
+        "Per shard: its organization, directory entries, users, tasks and "
+        "submissions, and the size of its database file."
+    )
+
+    def handle(self, *args, **options):
+        organizations = dict(Organization.objects.values_list("shard", "slug"))
+        members = dict(
+            OrganizationMember.objects.values("organization__shard")
+            .annotate(count=models.Count("pk"))
+            .values_list("organization__shard", "count")
+        )
+        self.stdout.write(
+            "{:<12} {:<16} {:>9} {:>9} {:>9} {:>12} {:>10}".format(
+                "shard",
+                "organization",
+                "members",
+                "users",
+                "tasks",
+                "submissions",
+                "size MB",
+            )
+        )
+        for alias in shard_aliases():
+            name = settings.DATABASES[alias]["NAME"]
+            size = os.path.getsize(name) if os.path.exists(name) else 0
+            self.stdout.write(
+                "{:<12} {:<16} {:>9} {:>9} {:>9} {:>12} {:>10.1f}".format(
+                    alias,
+                    organizations.get(alias, "-"),
+                    members.get(alias, 0),
+                    User.objects.using(alias).count(),
+                    Task.objects.using(alias).count(),
+                    SubmittedTask.objects.using(alias).count(),
+                    size / 1024 / 1024,
+                )
+            )
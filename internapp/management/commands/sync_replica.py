@@ -0,0 +1,55 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from common.routers import replica_alias
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the primary SQLite database onto the replica file with the "
+        "SQLite online backup API. Stand-in for real replication."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every",
+            type=float,
+            default=0,
+            help="Repeat every N seconds instead of syncing once.",
+        )
+        parser.add_argument(
+            "--pages",
+            type=int,
+            default=-1,
+            help="Pages copied per backup step; -1 copies everything at once.",
+        )
+
+    def handle(self, *args, **options):
+        alias = replica_alias()
+        if alias is None:
+            raise CommandError("REPLICA_DATABASE is not configured.")
+        primary = str(settings.DATABASES["default"]["NAME"])
+        replica = str(settings.DATABASES[alias]["NAME"])
+        while True:
+            self.sync(primary, replica, options["pages"])
+            if not options["every"]:
+                break
+            time.sleep(options["every"])
+
+    def sync(self, primary, replica, pages):
+        started = time.perf_counter()
+        source = sqlite3.connect(primary)
+        target = sqlite3.connect(replica, timeout=30)
+        try:
+            source.backup(target, pages=pages)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(
+            "Synced {} -> {} in {:.1f} ms".format(
+                primary, replica, (time.perf_counter() - started) * 1000
+            )
+        )
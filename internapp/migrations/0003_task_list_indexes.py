@@ -0,0 +1,47 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0002_task_contributors"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["creator", "status", "deadline"],
+                name="task_creator_status_deadline",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["creator", "deadline"], name="task_creator_deadline"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["creator", "status", "created_at"],
+                name="task_creator_status_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["creator", "created_at"], name="task_creator_created"
+            ),
+        ),
+        # The auto-created contributors table only indexes user_id on its
+        # own; (user_id, task_id) answers "tasks of this intern" from the
+        # index without touching the table.
+        migrations.RunSQL(
+            "CREATE INDEX task_contributors_user_task "
+            "ON internapp_task_contributors (user_id, task_id)",
+            "DROP INDEX task_contributors_user_task",
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:20
+
+from django.conf import settings
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0005_outbox"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="outboxevent",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("task_assigned", "Task assigned"),
+                    ("task_unassigned", "Task unassigned"),
+                    ("task_updated", "Task updated"),
+                    ("submission_graded", "Submission graded"),
+                ],
+                max_length=32,
+            ),
+        ),
+        migrations.CreateModel(
+            name="EventLog",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("task_assigned", "Task assigned"),
+                            ("task_unassigned", "Task unassigned"),
+                            ("task_updated", "Task updated"),
+                            ("submission_graded", "Submission graded"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                (
+                    "payload",
+                    models.JSONField(
+                        default=dict,
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["user", "id"], name="eventlog_user_id")
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:23
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0006_event_log"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[("task", "Task"), ("submission", "Submission")],
+                        max_length=16,
+                    ),
+                ),
+                ("object_id", models.UUIDField()),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="submittedtask",
+            index=models.Index(
+                fields=["creator", "modified_at"], name="submittedtask_creator_modified"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["creator", "modified_at"], name="task_creator_modified"
+            ),
+        ),
+        migrations.AddField(
+            model_name="tombstone",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(fields=["user", "id"], name="tombstone_user_id"),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0008_idempotency_keys"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["status", "created_at"], name="task_status_created"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(fields=["role", "joined_date"], name="user_role_joined"),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:32
+
+import common.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0009_admin_indexes"),
+    ]
+
+    # Only the Python-side default changes. SQLite would otherwise rebuild
+    # the three tables to apply a no-op column change.
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name="submittedtask",
+                    name="id",
+                    field=models.UUIDField(
+                        db_index=True,
+                        default=common.utils.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="task",
+                    name="id",
+                    field=models.UUIDField(
+                        db_index=True,
+                        default=common.utils.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                migrations.AlterField(
+                    model_name="user",
+                    name="id",
+                    field=models.UUIDField(
+                        db_index=True,
+                        default=common.utils.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+            ],
+        ),
+    ]
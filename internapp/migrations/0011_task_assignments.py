@@ -0,0 +1,155 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0010_uuid7_ids"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskAssignment",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("A", "Assigned"),
+                            ("S", "Submitted"),
+                            ("R", "Reviewed"),
+                        ],
+                        default="A",
+                        max_length=1,
+                    ),
+                ),
+                ("deadline", models.DateTimeField()),
+                (
+                    "assigned_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "task",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assignments",
+                        to="internapp.task",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="assignments",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        # Carry the contributor links over, with each intern's progress read
+        # from their submission, before the auto-created table is dropped.
+        migrations.RunSQL(
+            """
+            INSERT INTO internapp_taskassignment
+                (task_id, user_id, status, deadline, assigned_at)
+            SELECT
+                link.task_id,
+                link.user_id,
+                CASE
+                    WHEN EXISTS (
+                        SELECT 1 FROM internapp_submittedtask AS submission
+                        WHERE submission.task_id = link.task_id
+                        AND submission.creator_id = link.user_id
+                        AND submission.modifier_id IS NOT NULL
+                    ) THEN 'R'
+                    WHEN EXISTS (
+                        SELECT 1 FROM internapp_submittedtask AS submission
+                        WHERE submission.task_id = link.task_id
+                        AND submission.creator_id = link.user_id
+                    ) THEN 'S'
+                    ELSE 'A'
+                END,
+                task.deadline,
+                task.created_at
+            FROM internapp_task_contributors AS link
+            JOIN internapp_task AS task ON task.id = link.task_id
+            ORDER BY link.id
+            """,
+            """
+            INSERT INTO internapp_task_contributors (task_id, user_id)
+            SELECT task_id, user_id FROM internapp_taskassignment ORDER BY id
+            """,
+        ),
+        # Adding through= to an existing M2M is not an AlterField.
+        migrations.RemoveField(
+            model_name="task",
+            name="contributors",
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="contributors",
+            field=models.ManyToManyField(
+                related_name="contributors",
+                through="internapp.TaskAssignment",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskassignment",
+            index=models.Index(
+                fields=["user", "status", "deadline", "task"],
+                name="assignment_user_status_due",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taskassignment",
+            index=models.Index(
+                fields=["user", "deadline", "task"], name="assignment_user_due"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="taskassignment",
+            constraint=models.UniqueConstraint(
+                fields=("task", "user"), name="taskassignment_task_user"
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedcontributor",
+            name="status",
+            field=models.CharField(
+                choices=[("A", "Assigned"), ("S", "Submitted"), ("R", "Reviewed")],
+                default="A",
+                max_length=1,
+            ),
+        ),
+        migrations.AddField(
+            model_name="archivedcontributor",
+            name="assigned_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE internapp_archivedcontributor SET assigned_at = (
+                SELECT created_at FROM internapp_archivedtask
+                WHERE internapp_archivedtask.id = internapp_archivedcontributor.task_id
+            )
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
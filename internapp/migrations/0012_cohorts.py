@@ -0,0 +1,89 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:43
+
+import common.utils
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0011_task_assignments"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Cohort",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=common.utils.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, db_index=True, verbose_name="Created at"
+                    ),
+                ),
+                (
+                    "modified_at",
+                    models.DateTimeField(
+                        auto_now=True, db_index=True, verbose_name="Last modified at"
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name="taskassignment",
+            name="assignment_user_status_due",
+        ),
+        migrations.AddField(
+            model_name="cohort",
+            name="creator",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="%(app_label)s_%(class)s_creator",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Created by",
+            ),
+        ),
+        migrations.AddField(
+            model_name="cohort",
+            name="members",
+            field=models.ManyToManyField(
+                blank=True, related_name="cohorts", to=settings.AUTH_USER_MODEL
+            ),
+        ),
+        migrations.AddField(
+            model_name="cohort",
+            name="modifier",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="%(app_label)s_%(class)s_modifier",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Modified_by",
+            ),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="cohorts",
+            field=models.ManyToManyField(
+                blank=True, related_name="tasks", to="internapp.cohort"
+            ),
+        ),
+    ]
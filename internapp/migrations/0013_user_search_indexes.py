@@ -0,0 +1,35 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:47
+
+from django.db import migrations, models
+import django.db.models.functions.comparison
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0012_cohorts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate("full_name", "NOCASE"),
+                name="user_full_name_ci",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate("email", "NOCASE"),
+                name="user_email_ci",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.comparison.Collate("phone", "NOCASE"),
+                name="user_phone_ci",
+            ),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0013_user_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="approved_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="assigned_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="score_total",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="task",
+            name="submitted_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        # Interns in a cohort of the task count once, also when assigned
+        # directly or through another cohort.
+        migrations.RunSQL(
+            """
+            UPDATE internapp_task SET
+                assigned_count = (
+                    SELECT COUNT(*) FROM internapp_taskassignment assignment
+                    WHERE assignment.task_id = internapp_task.id
+                ) + (
+                    SELECT COUNT(DISTINCT member.user_id)
+                    FROM internapp_task_cohorts link
+                    JOIN internapp_cohort_members member
+                        ON member.cohort_id = link.cohort_id
+                    WHERE link.task_id = internapp_task.id
+                    AND member.user_id NOT IN (
+                        SELECT assignment.user_id
+                        FROM internapp_taskassignment assignment
+                        WHERE assignment.task_id = internapp_task.id
+                    )
+                ),
+                submitted_count = (
+                    SELECT COUNT(*) FROM internapp_submittedtask submission
+                    WHERE submission.task_id = internapp_task.id
+                ),
+                approved_count = (
+                    SELECT COUNT(*) FROM internapp_submittedtask submission
+                    WHERE submission.task_id = internapp_task.id
+                    AND submission.is_approved
+                ),
+                score_total = (
+                    SELECT COALESCE(SUM(submission.score), 0)
+                    FROM internapp_submittedtask submission
+                    WHERE submission.task_id = internapp_task.id
+                )
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
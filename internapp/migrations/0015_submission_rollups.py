@@ -0,0 +1,40 @@
+# Generated by Django 4.2.2 on 2026-10-19 00:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0014_task_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SubmissionRollup",
+            fields=[
+                ("id", models.BigAutoField(primary_key=True, serialize=False)),
+                ("task_id", models.UUIDField()),
+                (
+                    "granularity",
+                    models.CharField(
+                        choices=[("H", "Hourly"), ("D", "Daily")], max_length=1
+                    ),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("submitted", models.IntegerField(default=0)),
+                ("late", models.IntegerField(default=0)),
+                ("graded", models.IntegerField(default=0)),
+                ("score_total", models.IntegerField(default=0)),
+                ("lateness", models.JSONField(default=dict)),
+                ("scores", models.JSONField(default=dict)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="submissionrollup",
+            constraint=models.UniqueConstraint(
+                fields=("task_id", "granularity", "bucket"),
+                name="rollup_task_granularity_bucket",
+            ),
+        ),
+    ]
@@ -0,0 +1,83 @@
+# Generated by Django 4.2.2 on 2026-10-19 01:00
+
+import common.utils
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def default_organization(apps, schema_editor):
+    """The users already on the default database form its organization."""
+    Organization = apps.get_model("internapp", "Organization")
+    OrganizationMember = apps.get_model("internapp", "OrganizationMember")
+    User = apps.get_model("internapp", "User")
+    organization = Organization.objects.create(
+        name="Default", slug="default", shard="default"
+    )
+    OrganizationMember.objects.bulk_create(
+        (
+            OrganizationMember(
+                user_id=pk, organization=organization, email=email, phone=phone
+            )
+            for pk, email, phone in User.objects.values_list("pk", "email", "phone")
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0015_submission_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Organization",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=common.utils.uuid7,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, unique=True)),
+                ("slug", models.SlugField(unique=True)),
+                ("shard", models.CharField(max_length=64, unique=True)),
+                ("read_only", models.BooleanField(default=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="OrganizationMember",
+            fields=[
+                ("user_id", models.UUIDField(primary_key=True, serialize=False)),
+                (
+                    "email",
+                    models.EmailField(
+                        blank=True, max_length=254, null=True, unique=True
+                    ),
+                ),
+                (
+                    "phone",
+                    models.CharField(blank=True, max_length=10, null=True, unique=True),
+                ),
+                (
+                    "organization",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="members",
+                        to="internapp.organization",
+                    ),
+                ),
+            ],
+        ),
+        migrations.RunPython(
+            default_organization,
+            migrations.RunPython.noop,
+            # Only where the catalog is, see ShardRouter.allow_migrate.
+            hints={"model_name": "organization"},
+        ),
+    ]
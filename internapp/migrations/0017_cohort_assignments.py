@@ -0,0 +1,56 @@
+# Generated by Django 4.2.2 on 2026-10-19 01:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0016_organizations"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskassignment",
+            name="direct",
+            field=models.BooleanField(default=True),
+        ),
+        # Cohort members not assigned directly get a cohort assignment, with
+        # their progress read from their submission.
+        migrations.RunSQL(
+            """
+            INSERT INTO internapp_taskassignment
+                (task_id, user_id, status, deadline, assigned_at, direct)
+            SELECT DISTINCT
+                link.task_id,
+                member.user_id,
+                CASE
+                    WHEN EXISTS (
+                        SELECT 1 FROM internapp_submittedtask AS submission
+                        WHERE submission.task_id = link.task_id
+                        AND submission.creator_id = member.user_id
+                        AND submission.modifier_id IS NOT NULL
+                    ) THEN 'R'
+                    WHEN EXISTS (
+                        SELECT 1 FROM internapp_submittedtask AS submission
+                        WHERE submission.task_id = link.task_id
+                        AND submission.creator_id = member.user_id
+                    ) THEN 'S'
+                    ELSE 'A'
+                END,
+                task.deadline,
+                task.created_at,
+                FALSE
+            FROM internapp_task_cohorts AS link
+            JOIN internapp_cohort_members AS member
+                ON member.cohort_id = link.cohort_id
+            JOIN internapp_task AS task ON task.id = link.task_id
+            WHERE NOT EXISTS (
+                SELECT 1 FROM internapp_taskassignment AS assignment
+                WHERE assignment.task_id = link.task_id
+                AND assignment.user_id = member.user_id
+            )
+            """,
+            "DELETE FROM internapp_taskassignment WHERE NOT direct",
+        ),
+    ]
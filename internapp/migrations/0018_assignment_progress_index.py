@@ -0,0 +1,20 @@
+# Generated by Django 4.2.2 on 2026-10-19 01:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0017_cohort_assignments"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="taskassignment",
+            index=models.Index(
+                fields=["user", "status", "deadline", "task"],
+                name="assignment_user_status_due",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.2 on 2026-10-19 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0018_assignment_progress_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivedcontributor",
+            name="direct",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name="archivedtask",
+            name="cohorts",
+            field=models.ManyToManyField(
+                blank=True, related_name="archived_tasks", to="internapp.cohort"
+            ),
+        ),
+    ]
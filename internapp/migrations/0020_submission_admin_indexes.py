@@ -0,0 +1,27 @@
+# Generated by Django 4.2.2 on 2026-10-19 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0019_archived_cohorts"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="archivedsubmission",
+            index=models.Index(
+                fields=["is_approved", "created_at"],
+                name="archivedsub_approved_created",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="submittedtask",
+            index=models.Index(
+                fields=["is_approved", "created_at"],
+                name="submittedtask_approved_created",
+            ),
+        ),
+    ]
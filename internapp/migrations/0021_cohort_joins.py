@@ -0,0 +1,119 @@
+# Generated by Django 4.2.2 on 2026-10-19 02:01
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0020_submission_admin_indexes"),
+    ]
+
+    operations = [
+        # Cohort members reach the cohort's tasks through the links again,
+        # so the copied cohort-only rows go.
+        migrations.RunSQL(
+            """
+            DELETE FROM internapp_taskassignment WHERE NOT direct;
+            DELETE FROM internapp_archivedcontributor WHERE NOT direct;
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.RemoveIndex(
+            model_name="taskassignment",
+            name="assignment_user_status_due",
+        ),
+        migrations.RemoveField(
+            model_name="archivedcontributor",
+            name="direct",
+        ),
+        migrations.RemoveField(
+            model_name="taskassignment",
+            name="direct",
+        ),
+        migrations.AddField(
+            model_name="eventlog",
+            name="cohort_id",
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="eventlog",
+            name="task_id",
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="outboxevent",
+            name="cohort",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="internapp.cohort",
+            ),
+        ),
+        migrations.AddField(
+            model_name="tombstone",
+            name="cohort_id",
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="eventlog",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="outboxevent",
+            name="recipient",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="outbox_events",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="tombstone",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventlog",
+            index=models.Index(
+                condition=models.Q(("task_id__isnull", False)),
+                fields=["task_id", "id"],
+                name="eventlog_task_id",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eventlog",
+            index=models.Index(
+                condition=models.Q(("cohort_id__isnull", False)),
+                fields=["cohort_id", "id"],
+                name="eventlog_cohort_id",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(
+                condition=models.Q(("cohort_id__isnull", False)),
+                fields=["cohort_id", "id"],
+                name="tombstone_cohort_id",
+            ),
+        ),
+    ]
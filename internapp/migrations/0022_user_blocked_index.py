@@ -0,0 +1,21 @@
+# Generated by Django 4.2.2 on 2026-10-19 02:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("internapp", "0021_cohort_joins"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="user",
+            index=models.Index(
+                condition=models.Q(("is_blocked", True)),
+                fields=["joined_date"],
+                name="user_blocked_joined",
+            ),
+        ),
+    ]
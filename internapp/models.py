@@ -1,9 +1,12 @@
 from django.db import models
+from django.db.models import Case, Exists, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Collate
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.dispatch import receiver
 from django.db.models.signals import pre_save, post_save
-from uuid import uuid4
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.core.serializers.json import DjangoJSONEncoder
 
 
 from common.models import CommonInfo
@@ -11,9 +14,15 @@ from common.enums import (
     GENDER_CHOICES,
     ROLE_CHOICES,
     STATUS_CHOICES,
+    ASSIGNMENT_STATUS_CHOICES,
+    EVENT_CHOICES,
+    DELIVERY_STATUS_CHOICES,
+    TOMBSTONE_CHOICES,
+    ROLLUP_GRANULARITY_CHOICES,
 )
 from common.utils import (
     unique_slug_generator,
+    uuid7,
 )
 
 
@@ -50,7 +59,7 @@ class UserManager(BaseUserManager):
 
 class User(AbstractBaseUser):
     id = models.UUIDField(
-        primary_key=True, default=uuid4, editable=False, db_index=True
+        primary_key=True, default=uuid7, editable=False, db_index=True
     )
     slug = models.SlugField(unique=True, null=True, blank=True)
     full_name = models.CharField(max_length=255, null=False, blank=False)
@@ -93,6 +102,23 @@ class User(AbstractBaseUser):
         db_table = "user"
         verbose_name = "User"
         verbose_name_plural = "All Users"
+        indexes = [
+            # The admin's role filter, newest first.
+            models.Index(fields=["role", "joined_date"], name="user_role_joined"),
+            # The admin's blocked filter, newest first. Django writes the
+            # filter as a bare `WHERE is_blocked`, which SQLite matches to this
+            # condition but not to an index on the column.
+            models.Index(
+                fields=["joined_date"],
+                name="user_blocked_joined",
+                condition=models.Q(is_blocked=True),
+            ),
+            # SQLite serves case-insensitive LIKE 'prefix%' from NOCASE
+            # indexes only: `user-search/` and the admin's ^ search fields.
+            models.Index(Collate("full_name", "NOCASE"), name="user_full_name_ci"),
+            models.Index(Collate("email", "NOCASE"), name="user_email_ci"),
+            models.Index(Collate("phone", "NOCASE"), name="user_phone_ci"),
+        ]
 
 
 @receiver(pre_save, sender=User)
@@ -101,6 +127,44 @@ def user_pre_save_receiver(sender, instance=User, *args, **kwargs):
         instance.slug = unique_slug_generator(instance)
 
 
+class Organization(models.Model):
+    """
+    A partner company. Its users, tasks, submissions and everything hanging
+    off them live in the `shard` database alias, one organization per
+    alias. Catalog model: always on the default database.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(unique=True)
+    shard = models.CharField(max_length=64, unique=True)
+    # Writes are refused while set; `move_organization` sets it for the copy.
+    read_only = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+class OrganizationMember(models.Model):
+    """
+    Directory of which organization every user belongs to, for routing a
+    request or a login to its shard. Catalog model: always on the default
+    database, so it refers to the user by id rather than a foreign key.
+    """
+
+    user_id = models.UUIDField(primary_key=True)
+    organization = models.ForeignKey(
+        Organization, on_delete=models.CASCADE, related_name="members"
+    )
+    # Unique across shards, so logins resolve to one user.
+    email = models.EmailField(unique=True, null=True, blank=True)
+    phone = models.CharField(unique=True, max_length=10, null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.user_id} in {self.organization_id}"
+
+
 class InternProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     contact_details = models.CharField(max_length=100)
@@ -115,16 +179,148 @@ class SupervisorProfile(models.Model):
     work_experience = models.TextField()
 
 
+class Cohort(CommonInfo):
+    """
+    A group of interns, such as an intake. A task assigned to a cohort is
+    one link row, and reaches every member, including later ones, through
+    a join at read time.
+    """
+
+    name = models.CharField(max_length=100, unique=True)
+    members = models.ManyToManyField(User, related_name="cohorts", blank=True)
+
+    def __str__(self):
+        return self.name
+
+
+class TaskQuerySet(models.QuerySet):
+    def assigned_to(self, user):
+        """Tasks assigned to `user` directly or through one of their cohorts."""
+        return self.filter(
+            models.Q(pk__in=TaskAssignment.objects.filter(user=user).values("task"))
+            | models.Q(
+                pk__in=Task.cohorts.through.objects.filter(cohort__members=user).values(
+                    "task"
+                )
+            )
+        )
+
+    def with_progress(self, user):
+        """
+        Annotate `user`'s progress on each task. Cohort tasks have no
+        assignment row, so it follows from their submission instead.
+        """
+        submissions = SubmittedTask.objects.filter(task=OuterRef("pk"), creator=user)
+        return self.annotate(
+            progress=Coalesce(
+                Subquery(
+                    TaskAssignment.objects.filter(
+                        task=OuterRef("pk"), user=user
+                    ).values("status")
+                ),
+                Case(
+                    When(
+                        Exists(submissions.filter(modifier__isnull=False)),
+                        then=Value("R"),
+                    ),
+                    When(Exists(submissions), then=Value("S")),
+                    default=Value("A"),
+                ),
+            )
+        )
+
+
 class Task(CommonInfo):
     title = models.CharField(max_length=100)
     description = models.TextField()
-    contributors = models.ManyToManyField(User, related_name="contributors")
+    contributors = models.ManyToManyField(
+        User, through="TaskAssignment", related_name="contributors"
+    )
+    cohorts = models.ManyToManyField(Cohort, related_name="tasks", blank=True)
     status = models.CharField(max_length=1, choices=STATUS_CHOICES, default="D")
     deadline = models.DateTimeField()
+    # Maintained by `internapp.counters`.
+    assigned_count = models.IntegerField(default=0, editable=False)
+    submitted_count = models.IntegerField(default=0, editable=False)
+    approved_count = models.IntegerField(default=0, editable=False)
+    score_total = models.IntegerField(default=0, editable=False)
+
+    objects = TaskQuerySet.as_manager()
 
     def __str__(self):
         return f"Task is: {self.title}"
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["creator", "status", "deadline"],
+                name="task_creator_status_deadline",
+            ),
+            models.Index(fields=["creator", "deadline"], name="task_creator_deadline"),
+            models.Index(
+                fields=["creator", "status", "created_at"],
+                name="task_creator_status_created",
+            ),
+            models.Index(fields=["creator", "created_at"], name="task_creator_created"),
+            models.Index(
+                fields=["creator", "modified_at"], name="task_creator_modified"
+            ),
+            # The admin's status filter, across creators.
+            models.Index(fields=["status", "created_at"], name="task_status_created"),
+        ]
+
+
+class TaskAssignment(models.Model):
+    """
+    An intern's assignment to a task, the `Task.contributors` through model,
+    with their own progress and a copy of the task's deadline. Add and
+    remove assignments through `task.contributors` with
+    `through_defaults={"deadline": task.deadline}`, so the m2m_changed
+    receivers see them.
+    """
+
+    # Both are the leading column of an index or constraint below.
+    task = models.ForeignKey(
+        Task, on_delete=models.CASCADE, related_name="assignments", db_index=False
+    )
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="assignments", db_index=False
+    )
+    status = models.CharField(
+        max_length=1, choices=ASSIGNMENT_STATUS_CHOICES, default="A"
+    )
+    deadline = models.DateTimeField()
+    assigned_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.user_id} on {self.task_id}"
+
+    def save(self, *args, **kwargs):
+        if self.deadline is None:
+            self.deadline = self.task.deadline
+        super().save(*args, **kwargs)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task", "user"], name="taskassignment_task_user"
+            ),
+        ]
+        # The trailing task column makes it cover "tasks of this intern".
+        indexes = [
+            models.Index(
+                fields=["user", "deadline", "task"], name="assignment_user_due"
+            ),
+        ]
+
+
+@receiver(post_save, sender=Task)
+def task_post_save_receiver(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        TaskAssignment.objects.filter(task=instance).exclude(
+            deadline=instance.deadline
+        ).update(deadline=instance.deadline)
+
 
 class SubmittedTask(CommonInfo):
     task = models.ForeignKey(
@@ -139,3 +335,273 @@ class SubmittedTask(CommonInfo):
 
     def __str__(self):
         return f"SubmittedTask: {self.task.title}"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["creator", "modified_at"], name="submittedtask_creator_modified"
+            ),
+            # The admin's approval filter, newest first.
+            models.Index(
+                fields=["is_approved", "created_at"],
+                name="submittedtask_approved_created",
+            ),
+        ]
+
+
+class ArchivedTask(models.Model):
+    """Cold copy of a completed `Task`, keeping its id and timestamps."""
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    title = models.CharField(max_length=100)
+    description = models.TextField()
+    contributors = models.ManyToManyField(
+        User, through="ArchivedContributor", related_name="archived_tasks"
+    )
+    cohorts = models.ManyToManyField(Cohort, related_name="archived_tasks", blank=True)
+    status = models.CharField(max_length=1, choices=STATUS_CHOICES)
+    deadline = models.DateTimeField()
+    created_at = models.DateTimeField()
+    creator = models.ForeignKey(
+        User, null=True, blank=True, related_name="+", on_delete=models.SET_NULL
+    )
+    modified_at = models.DateTimeField()
+    modifier = models.ForeignKey(
+        User, null=True, blank=True, related_name="+", on_delete=models.SET_NULL
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Archived task: {self.title}"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["creator", "archived_at"], name="archivedtask_creator_archived"
+            ),
+        ]
+
+
+class ArchivedContributor(models.Model):
+    task = models.ForeignKey(
+        ArchivedTask, on_delete=models.CASCADE, related_name="contributor_links"
+    )
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    status = models.CharField(
+        max_length=1, choices=ASSIGNMENT_STATUS_CHOICES, default="A"
+    )
+    assigned_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            # User first, so it also serves "archived tasks of this intern".
+            models.UniqueConstraint(
+                fields=["user", "task"], name="archivedcontributor_user_task"
+            ),
+        ]
+
+
+class ArchivedSubmission(models.Model):
+    """Cold copy of a `SubmittedTask` whose task was archived."""
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    task = models.ForeignKey(
+        ArchivedTask, on_delete=models.CASCADE, related_name="submissions"
+    )
+    submission_date = models.DateTimeField()
+    is_approved = models.BooleanField(default=False)
+    remarks = models.TextField(blank=True, null=True)
+    score = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField()
+    creator = models.ForeignKey(
+        User, null=True, blank=True, related_name="+", on_delete=models.SET_NULL
+    )
+    modified_at = models.DateTimeField()
+    modifier = models.ForeignKey(
+        User, null=True, blank=True, related_name="+", on_delete=models.SET_NULL
+    )
+
+    class Meta:
+        indexes = [
+            # The admin's approval filter, newest first.
+            models.Index(
+                fields=["is_approved", "created_at"],
+                name="archivedsub_approved_created",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Archived submission: {self.task_id}"
+
+
+class SubmissionRollup(models.Model):
+    """
+    Submissions to one task in one hour or day, by submission time, for the
+    supervisor reports. See `internapp.rollups`. Keyed by the task id
+    rather than a foreign key, so the history outlives archiving.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    task_id = models.UUIDField()
+    granularity = models.CharField(max_length=1, choices=ROLLUP_GRANULARITY_CHOICES)
+    bucket = models.DateTimeField()
+    submitted = models.IntegerField(default=0)
+    late = models.IntegerField(default=0)
+    graded = models.IntegerField(default=0)
+    score_total = models.IntegerField(default=0)
+    # `common.sketches` histograms: seconds past the deadline of the late
+    # submissions, in log bins, and the scores of the graded ones.
+    lateness = models.JSONField(default=dict)
+    scores = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f"{self.task_id} {self.granularity} {self.bucket}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task_id", "granularity", "bucket"],
+                name="rollup_task_granularity_bucket",
+            ),
+        ]
+
+
+class OutboxEvent(models.Model):
+    """
+    Notification waiting to be delivered, written in the same transaction
+    as the change it reports. See `internapp.outbox`.
+    """
+
+    kind = models.CharField(max_length=32, choices=EVENT_CHOICES)
+    recipient = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="outbox_events",
+    )
+    # Set instead of the recipient for a notice to every member, which
+    # `internapp.outbox.claim` splits into one event per member.
+    cohort = models.ForeignKey(
+        Cohort, null=True, blank=True, on_delete=models.CASCADE, related_name="+"
+    )
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(
+        max_length=1, choices=DELIVERY_STATUS_CHOICES, default="P"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Not claimable before this; a claim pushes it forward as a lease.
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+
+    def __str__(self):
+        return f"{self.kind} for {self.recipient_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "available_at"], name="outbox_status_available"
+            ),
+        ]
+
+
+class EventLog(models.Model):
+    """
+    Change events behind the `events/` stream. The auto-increment id is the
+    SSE event id, so clients resume with `Last-Event-ID`, and it lets every
+    worker process pick up events written by the others.
+
+    An event is for one `user`, for everyone `task_id` is assigned to, or
+    for the members of `cohort_id`; the last two are resolved when the
+    event is read.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.CASCADE, related_name="+"
+    )
+    # Not foreign keys, so the events outlive the task or cohort.
+    task_id = models.UUIDField(null=True, blank=True)
+    cohort_id = models.UUIDField(null=True, blank=True)
+    kind = models.CharField(max_length=32, choices=EVENT_CHOICES)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} for {self.user_id or self.task_id or self.cohort_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="eventlog_user_id"),
+            models.Index(
+                fields=["task_id", "id"],
+                name="eventlog_task_id",
+                condition=models.Q(task_id__isnull=False),
+            ),
+            models.Index(
+                fields=["cohort_id", "id"],
+                name="eventlog_cohort_id",
+                condition=models.Q(cohort_id__isnull=False),
+            ),
+        ]
+
+
+class Tombstone(models.Model):
+    """
+    Marks a task or submission that disappeared from `user`'s view, by
+    deletion or unassignment, for the `sync/` endpoint. A task that left a
+    cohort's view is one row for the cohort instead, read by its members.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.CASCADE, related_name="+"
+    )
+    # Not a foreign key, so the row outlives a deleted cohort.
+    cohort_id = models.UUIDField(null=True, blank=True)
+    kind = models.CharField(max_length=16, choices=TOMBSTONE_CHOICES)
+    object_id = models.UUIDField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} gone for {self.user_id or self.cohort_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "id"], name="tombstone_user_id"),
+            models.Index(
+                fields=["cohort_id", "id"],
+                name="tombstone_cohort_id",
+                condition=models.Q(cohort_id__isnull=False),
+            ),
+        ]
+
+
+class IdempotencyKey(models.Model):
+    """
+    First response to a POST sent with an `Idempotency-Key` header, replayed
+    to retries of the same request. See `internapp.idempotency`.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    # The user's pk, empty for anonymous requests such as registration.
+    scope = models.CharField(max_length=36, blank=True)
+    route = models.CharField(max_length=64)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    # Null while the first request is still running.
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    response = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.route} {self.key}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "route", "key"], name="idempotency_scope_route_key"
+            ),
+        ]
@@ -0,0 +1,209 @@
+"""
+Transactional outbox for user notifications.
+
+Changes call `record()` inside their own transaction, so an event exists
+exactly when the change it reports was committed. `deliver_notifications`
+claims pending events in batches and sends every recipient one digest
+through Django's email backend.
+
+A notice to a cohort is a single event until it is claimed, and only then
+split into one event per member, so assigning a task to a large cohort
+stays one insert in the request.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from internapp.models import Cohort, OutboxEvent, TaskAssignment
+
+
+def record(kind, recipients, **payload):
+    """Queue a `kind` event for each of `recipients` (users or user ids)."""
+    recipient_ids = {getattr(recipient, "pk", recipient) for recipient in recipients}
+    OutboxEvent.objects.bulk_create(
+        OutboxEvent(kind=kind, recipient_id=recipient_id, payload=payload)
+        for recipient_id in recipient_ids
+    )
+
+
+def record_many(kind, items):
+    """Queue one `kind` event per (recipient, payload) pair, in one insert."""
+    OutboxEvent.objects.bulk_create(
+        OutboxEvent(
+            kind=kind, recipient_id=getattr(recipient, "pk", recipient), payload=payload
+        )
+        for recipient, payload in items
+    )
+
+
+def record_cohorts(kind, cohorts, **payload):
+    """Queue a `kind` event for the members of each of `cohorts`."""
+    cohort_ids = {getattr(cohort, "pk", cohort) for cohort in cohorts}
+    OutboxEvent.objects.bulk_create(
+        OutboxEvent(kind=kind, cohort_id=cohort_id, payload=payload)
+        for cohort_id in cohort_ids
+    )
+
+
+def split_cohort_events(now, using="default"):
+    """
+    Replace the due cohort events with one event per member, leaving out
+    the interns a task notice already reached directly, or through another
+    cohort in the same batch.
+    """
+    events = OutboxEvent.objects.using(using)
+    due = list(
+        events.filter(status="P", available_at__lte=now, recipient__isnull=True)
+        .order_by("pk")
+        .values_list("pk", "kind", "cohort_id", "payload")
+    )
+    if not due:
+        return
+    members = Cohort.members.through.objects.using(using)
+    notified = set()
+    split = []
+    for pk, kind, cohort_id, payload in due:
+        task_id = payload.get("task_id")
+        user_ids = members.filter(cohort_id=cohort_id).values_list("user_id", flat=True)
+        if task_id:
+            user_ids = user_ids.exclude(
+                user_id__in=TaskAssignment.objects.using(using)
+                .filter(task_id=task_id)
+                .values("user_id")
+            )
+        for user_id in user_ids:
+            if (kind, task_id, user_id) not in notified:
+                notified.add((kind, task_id, user_id))
+                split.append(
+                    OutboxEvent(
+                        kind=kind,
+                        recipient_id=user_id,
+                        payload=payload,
+                        available_at=now,
+                    )
+                )
+    events.bulk_create(split)
+    events.filter(pk__in=[pk for pk, *_ in due]).delete()
+
+
+def claim(batch_size, using="default"):
+    """
+    Lease up to `batch_size` due events to this worker. A worker that dies
+    mid-batch loses its lease after OUTBOX_LEASE_SECONDS and the events are
+    claimed again.
+    """
+    now = timezone.now()
+    events = OutboxEvent.objects.using(using)
+    with transaction.atomic(using=using):
+        split_cohort_events(now, using)
+        ids = list(
+            events.select_for_update(skip_locked=True)
+            .filter(status="P", available_at__lte=now)
+            .order_by("available_at", "pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        events.filter(pk__in=ids).update(
+            available_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+            attempts=F("attempts") + 1,
+        )
+    return list(events.filter(pk__in=ids).select_related("recipient").order_by("pk"))
+
+
+def describe(event):
+    payload = event.payload
+    if event.kind == "task_assigned":
+        return 'You were assigned "{title}", due {deadline}.'.format(**payload)
+    if event.kind == "submission_graded":
+        line = 'Your submission for "{}" was graded {}/10 and {}.'.format(
+            payload["title"],
+            payload["score"],
+            "approved" if payload["is_approved"] else "not approved",
+        )
+        if payload.get("remarks"):
+            line += " Remarks: {}".format(payload["remarks"])
+        return line
+    return event.get_kind_display()
+
+
+def digest(user, events, connection):
+    if len(events) == 1:
+        subject = events[0].get_kind_display()
+    else:
+        subject = f"{len(events)} updates on your tasks"
+    lines = [f"Hello {user.full_name},", ""]
+    lines += [f"- {describe(event)}" for event in events]
+    return EmailMessage(
+        subject=subject,
+        body="\n".join(lines),
+        to=[user.email],
+        connection=connection,
+    )
+
+
+def fail(ids, attempts, error, using="default"):
+    """Retry with exponential backoff, or give up after OUTBOX_MAX_ATTEMPTS."""
+    events = OutboxEvent.objects.using(using).filter(pk__in=ids)
+    if attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        events.update(status="F", last_error=error)
+    else:
+        delay = settings.OUTBOX_RETRY_SECONDS * 2 ** (attempts - 1)
+        events.update(
+            available_at=timezone.now() + timedelta(seconds=delay), last_error=error
+        )
+
+
+def deliver(events, using="default"):
+    """Send one digest per recipient. Returns (delivered, failed) event counts."""
+    by_recipient = defaultdict(list)
+    for event in events:
+        by_recipient[event.recipient].append(event)
+
+    try:
+        connection = get_connection()
+        connection.open()
+    except Exception as exc:
+        # Nothing can be sent, so the whole batch is retried.
+        for group in by_recipient.values():
+            attempts = max(event.attempts for event in group)
+            fail([event.pk for event in group], attempts, repr(exc), using)
+        return 0, len(events)
+
+    delivered, failed = [], 0
+    try:
+        for user, group in by_recipient.items():
+            ids = [event.pk for event in group]
+            attempts = max(event.attempts for event in group)
+            if not user.email:
+                fail(ids, settings.OUTBOX_MAX_ATTEMPTS, "Recipient has no email", using)
+                failed += len(ids)
+                continue
+            try:
+                digest(user, group, connection).send()
+            except Exception as exc:
+                fail(ids, attempts, repr(exc), using)
+                failed += len(ids)
+            else:
+                delivered += ids
+
+        OutboxEvent.objects.using(using).filter(pk__in=delivered).update(
+            status="D", delivered_at=timezone.now(), last_error=""
+        )
+    finally:
+        connection.close()
+    return len(delivered), failed
+
+
+def purge(days, using="default"):
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = (
+        OutboxEvent.objects.using(using)
+        .filter(status="D", delivered_at__lt=cutoff)
+        .delete()
+    )
+    return deleted
@@ -0,0 +1,23 @@
+from common.permissions import ANY_ROLE, PermissionMatrix
+
+# url name -> method -> roles allowed to call it. Bound to the views by
+# internapp.urls.
+PERMISSION_MATRIX = PermissionMatrix(
+    {
+        "task-create": {"POST": ["S"]},
+        "task-list-supervisor": {"GET": ANY_ROLE},
+        "task-edit": {"PATCH": ["S"]},
+        "submit-task": {"POST": ["I"]},
+        "submitted-task-list": {"GET": ["S", "I"]},
+        "submit-task-edit": {"PATCH": ["S"]},
+        "submit-task-grade": {"POST": ["S"]},
+        "task-list-intern": {"GET": ANY_ROLE},
+        "archived-task-list": {"GET": ["S", "I"]},
+        "events-token": {"POST": ANY_ROLE},
+        "sync": {"GET": ["S", "I"]},
+        "user-search": {"GET": ["S"]},
+        "submission-report": {"GET": ["S"]},
+    }
+)
+
+RolePermission = PERMISSION_MATRIX.permission_class()
@@ -0,0 +1,170 @@
+"""
+Hourly and daily submission rollups behind `submission-report/`.
+
+Submitting and grading fold each submission into the hourly and daily
+bucket of its submission time, inside the writing transaction; a regrade
+moves the score within the same buckets. Reports read the rollups only,
+merging buckets across tasks and sketches across buckets.
+`backfill_rollups` rebuilds everything from the submissions.
+"""
+
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db.models import Q
+
+from common import sketches
+from internapp.models import SubmissionRollup
+
+GRANULARITIES = {"H": timedelta(hours=1), "D": timedelta(days=1)}
+COUNTERS = ["submitted", "late", "graded", "score_total"]
+SKETCHES = ["lateness", "scores"]
+QUANTILES = {"p50": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+def truncate(moment, granularity):
+    """Start of the UTC hour or day holding `moment`."""
+    moment = moment.astimezone(dt_timezone.utc)
+    moment = moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "D":
+        moment = moment.replace(hour=0)
+    return moment
+
+
+def empty():
+    return {**dict.fromkeys(COUNTERS, 0), **{name: {} for name in SKETCHES}}
+
+
+def combine(total, change):
+    for counter in COUNTERS:
+        total[counter] += change[counter]
+    for name in SKETCHES:
+        sketches.merge(total[name], change[name])
+
+
+class Changes:
+    """Pending changes to rollup rows, keyed by (task id, granularity, bucket)."""
+
+    def __init__(self):
+        self.rows = defaultdict(empty)
+
+    def buckets(self, task_id, submitted_at):
+        for granularity in GRANULARITIES:
+            yield self.rows[(task_id, granularity, truncate(submitted_at, granularity))]
+
+    def submitted(self, task_id, submitted_at, deadline):
+        late = (submitted_at - deadline).total_seconds()
+        for change in self.buckets(task_id, submitted_at):
+            change["submitted"] += 1
+            if late > 0:
+                change["late"] += 1
+                sketches.add(change["lateness"], sketches.log_bin(late))
+
+    def graded(self, task_id, submitted_at, score, old_score=None):
+        """A submission's score, replacing `old_score` if it was graded before."""
+        for change in self.buckets(task_id, submitted_at):
+            if old_score is None:
+                change["graded"] += 1
+            else:
+                change["score_total"] -= old_score
+                sketches.add(change["scores"], old_score, -1)
+            change["score_total"] += score
+            sketches.add(change["scores"], score)
+
+    def save(self):
+        """Fold the changes into the rollup rows, inside the writing transaction."""
+        if not self.rows:
+            return
+        keys = Q()
+        for task_id, granularity, bucket in self.rows:
+            keys |= Q(task_id=task_id, granularity=granularity, bucket=bucket)
+        existing = {
+            (row.task_id, row.granularity, row.bucket): row
+            for row in SubmissionRollup.objects.select_for_update().filter(keys)
+        }
+        created, updated = [], []
+        for key, change in self.rows.items():
+            row = existing.get(key)
+            if row is None:
+                task_id, granularity, bucket = key
+                row = SubmissionRollup(
+                    task_id=task_id, granularity=granularity, bucket=bucket
+                )
+                created.append(row)
+            else:
+                updated.append(row)
+            for counter in COUNTERS:
+                setattr(row, counter, getattr(row, counter) + change[counter])
+            for name in SKETCHES:
+                sketches.merge(getattr(row, name), change[name])
+        SubmissionRollup.objects.bulk_create(created)
+        SubmissionRollup.objects.bulk_update(updated, COUNTERS + SKETCHES)
+        self.rows.clear()
+
+    def create(self, using="default", batch_size=1000):
+        """Insert the changes as new rows, for a rebuild from scratch."""
+        SubmissionRollup.objects.using(using).bulk_create(
+            (
+                SubmissionRollup(
+                    task_id=task_id, granularity=granularity, bucket=bucket, **change
+                )
+                for (task_id, granularity, bucket), change in self.rows.items()
+            ),
+            batch_size=batch_size,
+        )
+        self.rows.clear()
+
+
+def summary(change):
+    graded = change["graded"]
+    return {
+        "submitted": change["submitted"],
+        "late": change["late"],
+        "graded": graded,
+        "average_score": round(change["score_total"] / graded, 2) if graded else None,
+        "score_percentiles": dict(
+            zip(QUANTILES, sketches.quantiles(change["scores"], QUANTILES.values()))
+        ),
+        "lateness_percentiles_seconds": dict(
+            zip(
+                QUANTILES,
+                (
+                    None if value is None else round(value)
+                    for value in sketches.quantiles(
+                        change["lateness"], QUANTILES.values(), sketches.log_bin_value
+                    )
+                ),
+            )
+        ),
+    }
+
+
+def report(task_ids, granularity, start, end):
+    """Buckets of `task_ids` from `start` to `end`, merged across the tasks."""
+    rows = (
+        SubmissionRollup.objects.filter(
+            task_id__in=task_ids,
+            granularity=granularity,
+            bucket__gte=truncate(start, granularity),
+            bucket__lt=end,
+        )
+        .order_by("bucket")
+        .values_list("bucket", *COUNTERS, *SKETCHES)
+    )
+    buckets = defaultdict(empty)
+    for bucket, *values in rows:
+        combine(buckets[bucket], dict(zip(COUNTERS + SKETCHES, values)))
+    total = empty()
+    for change in buckets.values():
+        combine(total, change)
+    return {
+        "buckets": [
+            {"bucket": bucket, **summary(change)} for bucket, change in buckets.items()
+        ],
+        "totals": {
+            **summary(total),
+            "score_histogram": {
+                key: total["scores"][key] for key in sorted(total["scores"], key=int)
+            },
+        },
+    }
@@ -0,0 +1,200 @@
+"""
+Prefix search over users for the `user-search/` typeahead.
+
+Active interns are served from `UserIndex`, an in-process sorted array of
+(normalized key, user id) pairs: the keys starting with a prefix are one
+contiguous run, found by bisection. Every worker holds its own copy per
+shard, built in the background when the worker starts (see `warm_up`) and
+kept current, entry by entry, by the `User` signal receivers below.
+Changes the receivers never see, made by other workers or by queryset
+updates, show up once the copy is older than USER_SEARCH_INDEX_TTL_SECONDS
+and is rebuilt.
+
+Other roles, and searches while another thread builds the first copy, are
+answered by a prefix query on the NOCASE indexes of `User` instead.
+"""
+
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from common.routers import shard_alias, shard_aliases
+from internapp.models import User
+
+FIELDS = ["id", "full_name", "email", "phone", "role"]
+
+
+def normalize(value):
+    return value.casefold() if value else ""
+
+
+def search_keys(user):
+    """The full name, each later word of it, the email and the phone."""
+    name = normalize(user["full_name"])
+    words = name.split()
+    keys = {name, normalize(user["email"]), normalize(user["phone"])}
+    keys.update(" ".join(words[start:]) for start in range(1, len(words)))
+    keys.discard("")
+    return keys
+
+
+class UserIndex:
+    """
+    `users` and the sorted `keys` are changed in place under `lock`, which
+    searches hold while they read. A rebuild, under `building`, reads the
+    database without `lock` and swaps its result in; updates wait for it,
+    so they land in the new copy.
+    """
+
+    def __init__(self, using="default"):
+        self.using = using
+        self.lock = threading.Lock()
+        self.building = threading.Lock()
+        self.users = None
+        self.keys = None
+        self.built_at = None
+
+    def build(self):
+        users = {}
+        interns = User.objects.using(self.using).filter(
+            role="I", is_active=True, is_blocked=False
+        )
+        for user in interns.values(*FIELDS):
+            user["id"] = str(user["id"])
+            users[user["id"]] = user
+        keys = sorted(
+            (key, pk) for pk, user in users.items() for key in search_keys(user)
+        )
+        with self.lock:
+            self.users, self.keys = users, keys
+            self.built_at = time.monotonic()
+
+    def invalidate(self):
+        self.built_at = None
+
+    def stale(self):
+        return (
+            self.built_at is None
+            or time.monotonic() - self.built_at > settings.USER_SEARCH_INDEX_TTL_SECONDS
+        )
+
+    def refresh(self):
+        """Rebuild if stale, unless another thread already is."""
+        if self.stale() and self.building.acquire(blocking=False):
+            # One thread rebuilds, the others go on with the copy they have.
+            try:
+                if self.stale():
+                    self.build()
+            finally:
+                self.building.release()
+
+    def search(self, prefix, limit):
+        """
+        Up to `limit` users with a key starting with `prefix`, in key order,
+        or None while another thread builds the first copy.
+        """
+        self.refresh()
+        prefix = normalize(prefix)
+        found = {}
+        with self.lock:
+            if self.keys is None:
+                return None
+            keys = self.keys
+            position = bisect_left(keys, (prefix,))
+            while position < len(keys) and len(found) < limit:
+                key, pk = keys[position]
+                if not key.startswith(prefix):
+                    break
+                found.setdefault(pk, self.users[pk])
+                position += 1
+        return list(found.values())
+
+    def update(self, user):
+        """
+        Index `user`, a dict of FIELDS with a string id, in place of what
+        was indexed for it, or drop it when it is not an intern anymore.
+        """
+        pk = user["id"]
+        with self.building, self.lock:
+            if self.built_at is None:
+                # The next search rebuilds from the database.
+                return
+            old = self.users.pop(pk, None)
+            if old is not None:
+                for key in search_keys(old):
+                    position = bisect_left(self.keys, (key, pk))
+                    if self.keys[position : position + 1] == [(key, pk)]:
+                        del self.keys[position]
+            if user["role"] == "I":
+                self.users[pk] = user
+                for key in search_keys(user):
+                    insort(self.keys, (key, pk))
+
+    def remove(self, pk):
+        self.update({"id": pk, "role": None})
+
+
+user_indexes = {}
+
+
+def user_index(using):
+    """The index of the interns on the shard `using`."""
+    if using not in user_indexes:
+        user_indexes[using] = UserIndex(using)
+    return user_indexes[using]
+
+
+def warm_up():
+    """Build every shard's index in the background, before the first search."""
+
+    def build():
+        for using in shard_aliases():
+            user_index(using).refresh()
+
+    threading.Thread(target=build, name="user-index-warm-up", daemon=True).start()
+
+
+def database_search(prefix, role, limit):
+    """Prefix query on the NOCASE indexes; the full name matches from its start."""
+    matches = (
+        Q(full_name__istartswith=prefix)
+        | Q(email__istartswith=prefix)
+        | Q(phone__istartswith=prefix)
+    )
+    users = (
+        User.objects.filter(matches, role=role, is_active=True, is_blocked=False)
+        .order_by("full_name")
+        .values(*FIELDS)[:limit]
+    )
+    return [{**user, "id": str(user["id"])} for user in users]
+
+
+def search_users(prefix, role, limit):
+    if role == "I":
+        users = user_index(shard_alias()).search(prefix, limit)
+        if users is not None:
+            return users
+    return database_search(prefix, role, limit)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, using, raw=False, **kwargs):
+    if raw:
+        return
+    user = {field: getattr(instance, field) for field in FIELDS}
+    user["id"] = str(instance.pk)
+    if not instance.is_active or instance.is_blocked:
+        user["role"] = None
+    transaction.on_commit(lambda: user_index(using).update(user), using=using)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, using, **kwargs):
+    pk = str(instance.pk)
+    transaction.on_commit(lambda: user_index(using).remove(pk), using=using)
@@ -0,0 +1,247 @@
+"""
+Delta sync for offline clients.
+
+A sync token records, per model, the last (modified_at, pk) the client has
+seen, plus the last tombstone id. Changes are read with a keyset over
+`modified_at`, oldest first. Rows younger than SYNC_SETTLE_SECONDS are left
+for the next sync, so a transaction that commits after a later one with an
+earlier `modified_at` is still picked up.
+
+Rows leaving a user's view, by deletion or unassignment, are recorded as
+`Tombstone` rows by the receivers below. A task leaving a cohort gets one
+row for the cohort, which its members read. Joining or leaving a cohort
+writes nothing: the token remembers the user's cohorts, and the next sync
+resends the task list after a join and buries the left cohorts' tasks. Bulk deletes of tasks go through
+`internapp.archive.delete_tasks` instead, which writes the tombstones in
+bulk and deletes without running these receivers.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from common.exceptions import UnprocessableEntityException
+from internapp.models import Cohort, Task, SubmittedTask, Tombstone
+
+TOKEN_SALT = "internapp.sync"
+
+
+def bury(kind, object_id, user_ids):
+    Tombstone.objects.bulk_create(
+        Tombstone(user_id=user_id, kind=kind, object_id=object_id)
+        for user_id in set(user_ids)
+        if user_id is not None
+    )
+
+
+def bury_for_cohorts(links):
+    """Task tombstones for cohort members, from (task id, cohort id) pairs."""
+    Tombstone.objects.bulk_create(
+        Tombstone(cohort_id=cohort_id, kind="task", object_id=task_id)
+        for task_id, cohort_id in set(links)
+    )
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    # Contributor and cohort links are gone by post_delete.
+    contributors = list(instance.contributors.values_list("id", flat=True))
+    bury("task", instance.pk, [instance.creator_id, *contributors])
+    bury_for_cohorts(
+        (instance.pk, cohort_id)
+        for cohort_id in instance.cohorts.values_list("id", flat=True)
+    )
+
+
+@receiver(pre_delete, sender=Cohort)
+def cohort_deleted(sender, instance, **kwargs):
+    # Its members cannot be told apart once it is gone, but their tokens
+    # still list it.
+    bury_for_cohorts(
+        (task_id, instance.pk)
+        for task_id in instance.tasks.values_list("id", flat=True)
+    )
+
+
+@receiver(pre_delete, sender=SubmittedTask)
+def submission_deleted(sender, instance, **kwargs):
+    supervisor = (
+        Task.objects.filter(pk=instance.task_id)
+        .values_list("creator_id", flat=True)
+        .first()
+    )
+    bury("submission", instance.pk, [instance.creator_id, supervisor])
+
+
+@receiver(m2m_changed, sender=Task.contributors.through)
+def contributors_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        if reverse:
+            links = Task.objects.filter(contributors=instance).values_list("pk")
+            for (task_id,) in links:
+                bury("task", task_id, [instance.pk])
+        else:
+            bury(
+                "task", instance.pk, instance.contributors.values_list("id", flat=True)
+            )
+    elif action == "post_remove":
+        if reverse:
+            for task_id in pk_set:
+                bury("task", task_id, [instance.pk])
+        else:
+            bury("task", instance.pk, pk_set)
+    elif action == "post_add":
+        # A newly assigned task must show up in the new contributor's delta,
+        # however old its last edit is.
+        task_ids = pk_set if reverse else [instance.pk]
+        Task.objects.filter(pk__in=task_ids).update(modified_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Task.cohorts.through)
+def cohorts_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == "pre_clear":
+        if reverse:
+            links = instance.tasks.values_list("id", flat=True)
+            bury_for_cohorts((task_id, instance.pk) for task_id in links)
+        else:
+            links = instance.cohorts.values_list("id", flat=True)
+            bury_for_cohorts((instance.pk, cohort_id) for cohort_id in links)
+    elif action == "post_remove":
+        if reverse:
+            bury_for_cohorts((task_id, instance.pk) for task_id in pk_set)
+        else:
+            bury_for_cohorts((instance.pk, cohort_id) for cohort_id in pk_set)
+    elif action == "post_add":
+        task_ids = pk_set if reverse else [instance.pk]
+        Task.objects.filter(pk__in=task_ids).update(modified_at=timezone.now())
+
+
+def purge_tombstones(days=None):
+    days = settings.SYNC_TOMBSTONE_RETENTION_DAYS if days is None else days
+    cutoff = timezone.now() - timedelta(days=days)
+    return Tombstone.objects.filter(created_at__lt=cutoff).delete()[0]
+
+
+def encode_token(state):
+    return signing.dumps(state, salt=TOKEN_SALT, compress=True)
+
+
+def decode_token(token):
+    invalid = UnprocessableEntityException(
+        {
+            "title": "Sync",
+            "message": "Invalid sync token.",
+        }
+    )
+    if not token:
+        return {"task": None, "submission": None, "tombstone": 0, "cohorts": None}
+    try:
+        state = signing.loads(token, salt=TOKEN_SALT)
+    except signing.BadSignature:
+        raise invalid
+    issued = parse_datetime(state.get("issued", ""))
+    if issued is None:
+        raise invalid
+    retention = timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+    if issued < timezone.now() - retention:
+        # Tombstones that old may be purged already.
+        raise UnprocessableEntityException(
+            {
+                "title": "Sync",
+                "message": "Sync token expired, start a full sync.",
+            },
+            code=410,
+        )
+    return state
+
+
+def changed(queryset, position, settled, limit):
+    """
+    Up to `limit` rows changed after `position` (an ISO time and pk pair),
+    oldest first, with the position of the last one.
+    """
+    queryset = queryset.filter(modified_at__lte=settled)
+    if position is not None:
+        modified_at, pk = parse_datetime(position[0]), position[1]
+        queryset = queryset.filter(
+            Q(modified_at__gt=modified_at) | Q(modified_at=modified_at, pk__gt=pk)
+        )
+    rows = list(
+        queryset.order_by("modified_at", "pk").values_list("pk", "modified_at")[
+            : limit + 1
+        ]
+    )
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if rows:
+        pk, modified_at = rows[-1]
+        position = [modified_at.isoformat(), str(pk)]
+    return [pk for pk, _ in rows], position, more
+
+
+def delta(user, token, limit):
+    """
+    Changes in `user`'s tasks and submissions since `token`: the changed
+    ids per model, the tombstones, the next token and whether more remain.
+    """
+    state = decode_token(token)
+    settled = timezone.now() - timedelta(seconds=settings.SYNC_SETTLE_SECONDS)
+    cohorts = set(map(str, user.cohorts.values_list("id", flat=True)))
+    # Tokens from before cohorts were tracked count as up to date.
+    previous = cohorts if state.get("cohorts") is None else set(state["cohorts"])
+    if user.role == "S":
+        tasks = Task.objects.filter(creator=user)
+        submissions = SubmittedTask.objects.filter(task__creator=user)
+    else:
+        tasks = Task.objects.assigned_to(user)
+        submissions = SubmittedTask.objects.filter(creator=user)
+    if cohorts - previous:
+        # The joined cohorts' tasks may be older than the client's position.
+        state["task"] = None
+    state["cohorts"] = sorted(cohorts)
+
+    task_ids, state["task"], more_tasks = changed(tasks, state["task"], settled, limit)
+    submission_ids, state["submission"], more_submissions = changed(
+        submissions, state["submission"], settled, limit
+    )
+    tombstones = list(
+        Tombstone.objects.filter(
+            Q(user=user) | Q(cohort_id__in=cohorts | previous),
+            pk__gt=state["tombstone"],
+        )
+        .order_by("pk")
+        .values("id", "kind", "object_id")[: limit + 1]
+    )
+    more_tombstones = len(tombstones) > limit
+    tombstones = tombstones[:limit]
+    if tombstones:
+        state["tombstone"] = tombstones[-1]["id"]
+    left = Task.cohorts.through.objects.filter(cohort_id__in=previous - cohorts)
+    tombstones += [
+        {"kind": "task", "object_id": task_id}
+        for task_id in left.values_list("task_id", flat=True).distinct()
+    ]
+    if tombstones:
+        # Reassigned since: the row itself comes, or came, with the changes.
+        visible = set()
+        for kind, queryset in (("task", tasks), ("submission", submissions)):
+            ids = [row["object_id"] for row in tombstones if row["kind"] == kind]
+            if ids:
+                visible.update(queryset.filter(pk__in=ids).values_list("pk", flat=True))
+        tombstones = [row for row in tombstones if row["object_id"] not in visible]
+    state["issued"] = timezone.now().isoformat()
+    return {
+        "task_ids": task_ids,
+        "submission_ids": submission_ids,
+        "tombstones": [
+            {"kind": row["kind"], "id": str(row["object_id"])} for row in tombstones
+        ],
+        "next": encode_token(state),
+        "has_more": more_tasks or more_submissions or more_tombstones,
+    }
@@ -0,0 +1,314 @@
+"""
+Organizations and their shards.
+
+Each organization's rows live in its own database alias, the shard named
+on the `Organization`. `ShardRoutingMiddleware` looks up the requesting
+user's organization in the `OrganizationMember` directory, on the default
+database, and points the ORM at its shard for the rest of the request.
+Logins and registrations pick the shard themselves, by email or phone and
+by organization slug. Registrations without a slug join the
+DEFAULT_ORGANIZATION, wherever its shard is.
+
+`move_organization` copies an organization to another shard while it is
+read only, then switches it over. A shard holds one organization and
+nothing else, so the copy, and the purge of the old shard afterwards, take
+whole tables.
+"""
+
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.http import JsonResponse
+from rest_framework.permissions import SAFE_METHODS
+
+from common.exceptions import UnprocessableEntityException
+from common.middleware import token_user_id
+from common.routers import end_shard, is_catalog, shard_aliases, start_shard
+from internapp.models import Organization, OrganizationMember, User
+
+DEFAULT = ("default", False)
+MOVING = {
+    "title": "Organization",
+    "message": "Organization is moving to another shard, try again shortly.",
+}
+
+
+def cache_key(user_id):
+    return f"shard-user:{user_id}"
+
+
+def user_shard(user_id):
+    """(shard, read only) of the organization `user_id` belongs to."""
+    key = cache_key(user_id)
+    found = cache.get(key)
+    if found is None:
+        member = (
+            OrganizationMember.objects.filter(pk=user_id)
+            .values_list("organization__shard", "organization__read_only")
+            .first()
+        )
+        found = tuple(member) if member else DEFAULT
+        cache.set(key, found, settings.SHARD_CACHE_SECONDS)
+    return found
+
+
+def login_shard(email=None, phone=None):
+    """Shard of the user logging in with `email` or `phone`."""
+    if not (email or phone):
+        return "default"
+    lookup = Q(email=email) if email else Q(phone=phone)
+    shard = (
+        OrganizationMember.objects.filter(lookup)
+        .values_list("organization__shard", flat=True)
+        .first()
+    )
+    return shard or "default"
+
+
+def registration_shard(slug):
+    """
+    Shard new users of the organization `slug` go to, the
+    DEFAULT_ORGANIZATION's without a slug.
+    """
+    organization = Organization.objects.filter(
+        slug=slug or settings.DEFAULT_ORGANIZATION
+    ).first()
+    if organization is None:
+        if not slug:
+            return "default"
+        raise UnprocessableEntityException(
+            {
+                "title": "Accounts",
+                "message": f"Organization '{slug}' does not exist.",
+            }
+        )
+    if organization.read_only:
+        raise read_only_error()
+    return organization.shard
+
+
+def read_only_error():
+    return UnprocessableEntityException(MOVING, code=503)
+
+
+def taken(email=None, phone=None):
+    """Whether any organization already has a user with `email` or `phone`."""
+    lookup = Q()
+    if email:
+        lookup |= Q(email=email)
+    if phone:
+        lookup |= Q(phone=phone)
+    return bool(lookup) and OrganizationMember.objects.filter(lookup).exists()
+
+
+class ShardRoutingMiddleware:
+    """
+    Routes the ORM to the shard of the user the request's JWT belongs to,
+    and refuses writes while that organization is read only.
+
+    Requests without a token, such as the admin's, stay on the default
+    shard.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        user_id = token_user_id(request)
+        if user_id is None:
+            return self.get_response(request)
+        shard, read_only = user_shard(user_id)
+        if read_only and request.method not in SAFE_METHODS:
+            return JsonResponse(MOVING, status=503)
+        token = start_shard(shard)
+        try:
+            return self.get_response(request)
+        finally:
+            end_shard(token)
+
+
+def record_member(user_id, email, phone, using):
+    """Add a user created on `using` to the directory of its organization."""
+    organization = Organization.objects.filter(shard=using).first()
+    if organization is not None:
+        OrganizationMember.objects.create(
+            user_id=user_id, organization=organization, email=email, phone=phone
+        )
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, using, raw=False, **kwargs):
+    if raw:
+        return
+    pk, email, phone = instance.pk, instance.email, instance.phone
+    if created:
+        # Only once the user exists; the directory is another database.
+        transaction.on_commit(
+            lambda: record_member(pk, email, phone, using), using=using
+        )
+    else:
+        transaction.on_commit(
+            lambda: OrganizationMember.objects.filter(pk=pk).update(
+                email=email, phone=phone
+            ),
+            using=using,
+        )
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, using, **kwargs):
+    pk = instance.pk
+
+    def forget():
+        OrganizationMember.objects.filter(pk=pk).delete()
+        cache.delete(cache_key(pk))
+
+    transaction.on_commit(forget, using=using)
+
+
+def tenant_models():
+    """Every model with rows on the shards, many-to-many tables included."""
+    return [
+        model
+        for model in apps.get_app_config("internapp").get_models(
+            include_auto_created=True
+        )
+        if model._meta.managed
+        and not is_catalog(model._meta.app_label, model._meta.model_name)
+    ]
+
+
+def copy_table(model, source, target, batch_size):
+    """Copy every row of `model`, primary keys and timestamps as they are."""
+    connection = connections[target]
+    fields = model._meta.concrete_fields
+    quote = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        quote(model._meta.db_table),
+        ", ".join(quote(field.column) for field in fields),
+        ", ".join(["%s"] * len(fields)),
+    )
+    rows = (
+        model._base_manager.using(source)
+        .order_by()
+        .values_list(*(field.attname for field in fields))
+        .iterator(chunk_size=batch_size)
+    )
+    count = 0
+    batch = []
+    with connection.cursor() as cursor:
+        for row in rows:
+            batch.append(
+                tuple(
+                    field.get_db_prep_save(value, connection=connection)
+                    for field, value in zip(fields, row)
+                )
+            )
+            if len(batch) >= batch_size:
+                cursor.executemany(sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(sql, batch)
+            count += len(batch)
+    return count
+
+
+def flush_tables(models, using):
+    """Empty the tables of `models` on a shard an organization moved off."""
+    check_vacated(using)
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        for model in models:
+            cursor.execute(f"DELETE FROM {quote(model._meta.db_table)}")
+
+
+def check_vacated(using):
+    if Organization.objects.filter(shard=using).exists():
+        raise ValueError(f"'{using}' still holds an organization.")
+
+
+def check_source(organization):
+    """The source shard must hold `organization`'s users and no one else's."""
+    source = organization.shard
+    users = User.objects.using(source).count()
+    members = OrganizationMember.objects.filter(organization=organization).count()
+    if users != members:
+        raise ValueError(
+            f"'{source}' holds {users} users but {organization} has {members}; "
+            "a shard with users outside its organization cannot be moved."
+        )
+
+
+def check_target(organization, target):
+    if target not in shard_aliases():
+        raise ValueError(f"'{target}' is not one of SHARD_DATABASES.")
+    if target == organization.shard:
+        raise ValueError(f"{organization} is already on '{target}'.")
+    # The copy relies on holding the source's write lock from the start.
+    source = connections[organization.shard]
+    if getattr(source, "transaction_mode", None) != "IMMEDIATE":
+        raise ValueError(
+            f"'{organization.shard}' does not start transactions with "
+            "BEGIN IMMEDIATE."
+        )
+    if Organization.objects.filter(shard=target).exists():
+        raise ValueError(f"'{target}' already holds an organization.")
+    if User.objects.using(target).exists():
+        raise ValueError(f"'{target}' is not empty.")
+
+
+def move_organization(organization, target, batch_size=1000, wait=True, log=None):
+    """
+    Copy `organization` from its shard to the empty shard `target` and
+    switch it over. Writes are refused from when every worker has seen the
+    organization turn read only, SHARD_CACHE_SECONDS after it did, until
+    the switch. The copy holds the source's write lock, so nothing else on
+    the source can write during it either. Returns {model label: rows
+    copied}; the old shard keeps its rows for `flush_tables()`.
+    """
+    log = log or (lambda message: None)
+    check_target(organization, target)
+    check_source(organization)
+    source = organization.shard
+    Organization.objects.filter(pk=organization.pk).update(read_only=True)
+    try:
+        if wait:
+            log(f"Waiting {settings.SHARD_CACHE_SECONDS} s for workers to stop writing")
+            time.sleep(settings.SHARD_CACHE_SECONDS)
+        copied = {}
+        # BEGIN IMMEDIATE: a write that started before the organization
+        # turned read only and is still running has to commit before the
+        # copy reads, and later ones wait, or fail after busy_timeout, until
+        # the switch.
+        with transaction.atomic(using=source):
+            # SQLite checks the deferred foreign keys at commit, whatever the
+            # order the tables are copied in.
+            with transaction.atomic(using=target):
+                for model in tenant_models():
+                    started = time.perf_counter()
+                    copied[model._meta.label] = copy_table(
+                        model, source, target, batch_size
+                    )
+                    log(
+                        "{:<36} {:>10} rows in {:.1f} s".format(
+                            model._meta.label,
+                            copied[model._meta.label],
+                            time.perf_counter() - started,
+                        )
+                    )
+            Organization.objects.filter(pk=organization.pk).update(
+                shard=target, read_only=False
+            )
+    except BaseException:
+        Organization.objects.filter(pk=organization.pk).update(read_only=False)
+        raise
+    organization.refresh_from_db()
+    return copied
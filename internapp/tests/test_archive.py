@@ -0,0 +1,163 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from internapp import rollups
+from internapp.archive import archive_batch, restore_task
+from internapp.models import (
+    User,
+    Cohort,
+    Task,
+    TaskAssignment,
+    SubmittedTask,
+    ArchivedTask,
+    ArchivedContributor,
+    ArchivedSubmission,
+    Tombstone,
+)
+
+
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.supervisor = User.objects.create(full_name="Supervisor", role="S")
+        self.direct, self.member, self.later = (
+            User.objects.create(full_name=f"Intern {index}", role="I")
+            for index in range(3)
+        )
+        self.cohort = Cohort.objects.create(name="Intake", creator=self.supervisor)
+        self.cohort.members.add(self.member)
+        self.task = Task.objects.create(
+            title="Task",
+            description="Task",
+            deadline=timezone.now(),
+            creator=self.supervisor,
+            status="C",
+        )
+        self.task.contributors.add(
+            self.direct, through_defaults={"deadline": self.task.deadline}
+        )
+        self.task.cohorts.add(self.cohort)
+        SubmittedTask.objects.create(
+            task=self.task, creator=self.member, score=7, is_approved=True
+        )
+        Task.objects.filter(pk=self.task.pk).update(
+            modified_at=timezone.now() - timedelta(days=60)
+        )
+
+    def archive(self):
+        return archive_batch(timezone.now() - timedelta(days=30), 100)
+
+    def assignments(self):
+        return set(
+            TaskAssignment.objects.filter(task=self.task).values_list(
+                "user_id", flat=True
+            )
+        )
+
+    def test_archive_moves_every_row(self):
+        self.assertEqual(self.archive(), (1, 1, 1))
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+        self.assertFalse(TaskAssignment.objects.filter(task=self.task.pk).exists())
+        archived = ArchivedTask.objects.get(pk=self.task.pk)
+        self.assertEqual(list(archived.cohorts.all()), [self.cohort])
+        self.assertEqual(
+            list(
+                ArchivedContributor.objects.filter(task=archived).values_list(
+                    "user_id", flat=True
+                )
+            ),
+            [self.direct.pk],
+        )
+        self.assertEqual(ArchivedSubmission.objects.get(task=archived).score, 7)
+
+    def test_archive_writes_tombstones(self):
+        self.archive()
+        submission = ArchivedSubmission.objects.get(task=self.task.pk)
+        self.assertEqual(
+            set(
+                Tombstone.objects.values_list(
+                    "kind", "object_id", "user_id", "cohort_id"
+                )
+            ),
+            {
+                ("task", self.task.pk, self.supervisor.pk, None),
+                ("task", self.task.pk, self.direct.pk, None),
+                ("task", self.task.pk, None, self.cohort.pk),
+                ("submission", submission.pk, self.member.pk, None),
+                ("submission", submission.pk, self.supervisor.pk, None),
+            },
+        )
+
+    def test_batch_queries_do_not_grow_with_rows(self):
+        old = timezone.now() - timedelta(days=60)
+        for index in range(5):
+            task = Task.objects.create(
+                title=f"More {index}",
+                description="Task",
+                deadline=timezone.now(),
+                creator=self.supervisor,
+                status="C",
+            )
+            task.cohorts.add(self.cohort)
+            SubmittedTask.objects.create(task=task, creator=self.member)
+        Task.objects.exclude(pk=self.task.pk).update(
+            modified_at=old + timedelta(days=1)
+        )
+        Task.objects.filter(pk=self.task.pk).update(modified_at=old)
+        with CaptureQueriesContext(connection) as one:
+            self.assertEqual(archive_batch(timezone.now(), 1)[0], 1)
+        with CaptureQueriesContext(connection) as five:
+            self.assertEqual(archive_batch(timezone.now(), 10)[0], 5)
+        self.assertEqual(len(five), len(one))
+
+    def test_restore_follows_the_cohort(self):
+        self.archive()
+        self.cohort.members.add(self.later)
+        self.cohort.members.remove(self.member)
+        self.assertEqual(restore_task(self.task.pk), (1, 1))
+        self.assertFalse(ArchivedTask.objects.filter(pk=self.task.pk).exists())
+        self.assertEqual(list(self.task.cohorts.all()), [self.cohort])
+        self.assertEqual(self.assignments(), {self.direct.pk})
+        self.task.refresh_from_db()
+        self.assertEqual(
+            (
+                self.task.assigned_count,
+                self.task.submitted_count,
+                self.task.approved_count,
+                self.task.score_total,
+            ),
+            (2, 1, 1, 7),
+        )
+
+    def test_restore_missing_task(self):
+        self.assertIsNone(restore_task(self.task.pk))
+
+    def test_archived_list_of_cohort_members(self):
+        self.archive()
+        self.cohort.members.add(self.later)
+        for user, expected in ((self.later, 1), (self.direct, 1)):
+            client = APIClient()
+            token = RefreshToken.for_user(user).access_token
+            client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+            response = client.get("/api/v1/archived-task-list/")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()["data"]["pagination"]["count"], expected)
+
+    def test_cohort_report_includes_archived_tasks(self):
+        changes = rollups.Changes()
+        changes.submitted(self.task.pk, timezone.now(), self.task.deadline)
+        changes.save()
+        self.archive()
+        client = APIClient()
+        token = RefreshToken.for_user(self.supervisor).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        response = client.get(
+            f"/api/v1/submission-report/?cohort={self.cohort.pk}&granularity=D"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["totals"]["submitted"], 1)
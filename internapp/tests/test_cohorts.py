@@ -0,0 +1,179 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from internapp import outbox
+from internapp.events import audiences, events_after
+from internapp.models import (
+    User,
+    Cohort,
+    Task,
+    TaskAssignment,
+    EventLog,
+    OutboxEvent,
+    Tombstone,
+)
+
+
+class CohortAssignmentTests(TestCase):
+    """Cohort members reach the cohort's tasks through a join, not copied rows."""
+
+    def setUp(self):
+        self.supervisor = User.objects.create(full_name="Supervisor", role="S")
+        self.first, self.second, self.later = (
+            User.objects.create(
+                full_name=f"Intern {index}",
+                role="I",
+                email=f"intern{index}@example.com",
+            )
+            for index in range(3)
+        )
+        self.cohort = Cohort.objects.create(name="Intake", creator=self.supervisor)
+        self.cohort.members.add(self.first, self.second)
+        self.task = Task.objects.create(
+            title="Task",
+            description="Task",
+            deadline=timezone.now(),
+            creator=self.supervisor,
+            status="O",
+        )
+
+    def client_for(self, user):
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def assigned_count(self):
+        return Task.objects.get(pk=self.task.pk).assigned_count
+
+    def rows(self):
+        return [
+            model.objects.count()
+            for model in (TaskAssignment, EventLog, OutboxEvent, Tombstone)
+        ]
+
+    def test_link_writes_no_rows_per_member(self):
+        self.task.cohorts.add(self.cohort)
+        self.assertFalse(TaskAssignment.objects.exists())
+        self.assertEqual(
+            list(EventLog.objects.values_list("kind", "user_id", "cohort_id")),
+            [("task_assigned", None, self.cohort.pk)],
+        )
+        self.assertEqual(self.assigned_count(), 2)
+
+    def test_member_joining_writes_no_rows(self):
+        self.task.cohorts.add(self.cohort)
+        before = self.rows()
+        self.cohort.members.add(self.later)
+        self.assertEqual(self.rows(), before)
+        self.assertEqual(self.assigned_count(), 3)
+        self.cohort.members.remove(self.first)
+        self.assertEqual(self.rows(), before)
+        self.assertEqual(self.assigned_count(), 2)
+
+    def test_direct_and_cohort_intern_counted_once(self):
+        self.task.contributors.add(
+            self.first, through_defaults={"deadline": self.task.deadline}
+        )
+        self.task.cohorts.add(self.cohort)
+        self.assertEqual(self.assigned_count(), 2)
+        self.task.cohorts.remove(self.cohort)
+        self.assertEqual(self.assigned_count(), 1)
+        self.task.cohorts.add(self.cohort)
+        self.cohort.delete()
+        self.assertEqual(self.assigned_count(), 1)
+
+    def test_intern_list_and_submit(self):
+        self.task.cohorts.add(self.cohort)
+        self.cohort.members.add(self.later)
+        client = self.client_for(self.later)
+        response = client.get("/api/v1/task-list-intern/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [row["id"] for row in response.json()["data"]["docs"]],
+            [str(self.task.pk)],
+        )
+        response = client.post(
+            "/api/v1/submit-task/", {"task": str(self.task.pk)}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        response = client.get("/api/v1/task-list-intern/?progress=S")
+        self.assertEqual(response.json()["data"]["pagination"]["count"], 1)
+        self.cohort.members.remove(self.later)
+        response = self.client_for(self.later).get("/api/v1/task-list-intern/")
+        self.assertEqual(response.json()["data"]["pagination"]["count"], 0)
+
+    def test_events_reach_the_members(self):
+        self.task.cohorts.add(self.cohort)
+        self.task.title = "Renamed"
+        self.task.save()
+        # Nothing interns see changed.
+        self.task.save()
+        self.task.save(update_fields=["modified_at"])
+        self.cohort.members.add(self.later)
+        kinds = [event["kind"] for event in events_after(0, self.later.pk)]
+        self.assertEqual(kinds, ["task_assigned", "task_updated"])
+        self.assertEqual(events_after(0, self.supervisor.pk), [])
+        events = events_after(0)
+        reached = audiences(events, [self.first.pk, self.supervisor.pk])
+        self.assertEqual(reached[self.task.pk], {self.first.pk})
+        self.assertEqual(reached[self.cohort.pk], {self.first.pk})
+
+    def test_outbox_splits_the_cohort_notice(self):
+        response = self.client_for(self.supervisor).patch(
+            f"/api/v1/task-edit/{self.task.pk}/",
+            {
+                "title": "Task",
+                "description": "Task",
+                "status": "O",
+                "contributors": [str(self.first.pk)],
+                "cohorts": [str(self.cohort.pk)],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(OutboxEvent.objects.count(), 2)
+        # Assigned both ways, the first intern is told once.
+        recipients = [event.recipient for event in outbox.claim(10)]
+        self.assertCountEqual(recipients, [self.first, self.second])
+        self.assertFalse(OutboxEvent.objects.filter(recipient=None).exists())
+
+    def test_sync_follows_the_membership(self):
+        self.task.cohorts.add(self.cohort)
+        Task.objects.filter(pk=self.task.pk).update(
+            modified_at=timezone.now() - timezone.timedelta(days=1)
+        )
+        tokens = {}
+        for user in (self.first, self.later):
+            data = self.client_for(user).get("/api/v1/sync/").json()["data"]
+            tokens[user] = data["next"]
+        self.cohort.members.remove(self.first)
+        self.cohort.members.add(self.later)
+        data = self.sync(self.later, tokens[self.later])
+        self.assertEqual([row["id"] for row in data["tasks"]], [str(self.task.pk)])
+        data = self.sync(self.first, tokens[self.first])
+        self.assertEqual(
+            data["tombstones"], [{"kind": "task", "id": str(self.task.pk)}]
+        )
+        # Buried once, not on every sync.
+        self.assertEqual(self.sync(self.first, data["next"])["tombstones"], [])
+
+    def test_unlinking_buries_the_task_for_the_cohort(self):
+        self.task.cohorts.add(self.cohort)
+        token = self.client_for(self.second).get("/api/v1/sync/").json()["data"]
+        self.task.cohorts.remove(self.cohort)
+        self.assertEqual(
+            list(Tombstone.objects.values_list("user_id", "cohort_id")),
+            [(None, self.cohort.pk)],
+        )
+        data = self.sync(self.second, token["next"])
+        self.assertEqual(
+            data["tombstones"], [{"kind": "task", "id": str(self.task.pk)}]
+        )
+
+    def sync(self, user, token):
+        response = self.client_for(user).get("/api/v1/sync/", {"since": token})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["data"]
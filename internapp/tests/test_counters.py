@@ -0,0 +1,110 @@
+from types import SimpleNamespace
+
+from django.contrib import admin
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from internapp.admin import TaskAdmin
+from internapp.api.serializers.accounts import (
+    TaskEditSerializer,
+    SubmitTaskEditSerializer,
+)
+from internapp.models import User, Task, SubmittedTask
+
+
+class CounterTests(TestCase):
+    """Edits that load the task before a submit lands keep its counters."""
+
+    def setUp(self):
+        self.supervisor = User.objects.create(full_name="Supervisor", role="S")
+        self.first, self.second = (
+            User.objects.create(full_name=f"Intern {index}", role="I")
+            for index in range(2)
+        )
+        self.task = Task.objects.create(
+            title="Task",
+            description="Task",
+            deadline=timezone.now(),
+            creator=self.supervisor,
+            status="O",
+        )
+        for user in (self.first, self.second):
+            self.task.contributors.add(
+                user, through_defaults={"deadline": self.task.deadline}
+            )
+
+    def client_for(self, user):
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def submit(self, user):
+        response = self.client_for(user).post(
+            "/api/v1/submit-task/", {"task": str(self.task.pk)}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def counts(self):
+        task = Task.objects.get(pk=self.task.pk)
+        return (
+            task.assigned_count,
+            task.submitted_count,
+            task.approved_count,
+            task.score_total,
+        )
+
+    def test_edit_alongside_submit(self):
+        stale = Task.objects.get(pk=self.task.pk)
+        self.submit(self.first)
+        serializer = TaskEditSerializer(
+            stale,
+            data={
+                "title": "Renamed",
+                "description": "Task",
+                "status": "O",
+                "contributors": [str(self.first.pk)],
+            },
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(Task.objects.get(pk=self.task.pk).title, "Renamed")
+        self.assertEqual(self.counts(), (2, 1, 0, 0))
+
+    def test_grade_alongside_submit(self):
+        self.submit(self.first)
+        submission = SubmittedTask.objects.select_related("task").get(
+            creator=self.first
+        )
+        self.submit(self.second)
+        serializer = SubmitTaskEditSerializer(
+            submission,
+            data={"is_approved": True, "remarks": "Good", "score": 8},
+            context={"request": SimpleNamespace(user=self.supervisor)},
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        self.assertEqual(self.counts(), (2, 2, 1, 8))
+
+    def test_admin_change_alongside_submit(self):
+        stale = Task.objects.get(pk=self.task.pk)
+        self.submit(self.first)
+        stale.status = "C"
+        TaskAdmin(Task, admin.site).save_model(None, stale, None, change=True)
+        self.assertEqual(Task.objects.get(pk=self.task.pk).status, "C")
+        self.assertEqual(self.counts(), (2, 1, 0, 0))
+
+    def test_counters_only_on_the_supervisor_list(self):
+        self.submit(self.first)
+        for user, url, shown in (
+            (self.supervisor, "/api/v1/task-list-supervisor/", True),
+            (self.first, "/api/v1/task-list-intern/", False),
+        ):
+            response = self.client_for(user).get(url)
+            self.assertEqual(response.status_code, 200)
+            [task] = response.json()["data"]["docs"]
+            self.assertEqual("submitted_count" in task, shown)
+            if shown:
+                self.assertEqual(task["submitted_count"], 1)
@@ -0,0 +1,39 @@
+from django.core import signing
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from internapp.api.viewsets.events import stream_token, stream_user
+from internapp.models import User
+
+
+class StreamTokenTests(TestCase):
+    def setUp(self):
+        self.intern = User.objects.create(full_name="Intern", role="I")
+        self.access = str(RefreshToken.for_user(self.intern).access_token)
+
+    def user(self, path, **headers):
+        return stream_user(RequestFactory().get(path, **headers))[0]
+
+    def test_token_endpoint(self):
+        client = APIClient()
+        self.assertEqual(client.post("/api/v1/events/token/").status_code, 401)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.access}")
+        response = client.post("/api/v1/events/token/")
+        self.assertEqual(response.status_code, 200)
+        token = response.json()["data"]["token"]
+        self.assertEqual(self.user(f"/?token={token}"), self.intern)
+
+    def test_access_token_only_in_the_header(self):
+        self.assertEqual(
+            self.user("/", HTTP_AUTHORIZATION=f"Bearer {self.access}"), self.intern
+        )
+        self.assertIsNone(self.user(f"/?token={self.access}"))
+
+    def test_stream_token_is_single_purpose(self):
+        other = signing.dumps(str(self.intern.pk), salt="internapp.sync")
+        self.assertIsNone(self.user(f"/?token={other}"))
+
+    @override_settings(SSE_TOKEN_SECONDS=-1)
+    def test_expired_stream_token(self):
+        self.assertIsNone(self.user(f"/?token={stream_token(self.intern.pk)}"))
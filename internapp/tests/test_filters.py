@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from internapp.models import User, Task, TaskAssignment
+
+
+class InternListFilterTests(TestCase):
+    url = "/api/v1/task-list-intern/"
+
+    def setUp(self):
+        supervisor = User.objects.create(full_name="Supervisor", role="S")
+        self.intern = User.objects.create(full_name="Intern", role="I")
+        now = timezone.now()
+        self.tasks = []
+        for days in (3, 1, 2):
+            task = Task.objects.create(
+                title=f"Due in {days}",
+                description="Task",
+                deadline=now + timedelta(days=days),
+                creator=supervisor,
+                status="O",
+            )
+            task.contributors.add(
+                self.intern, through_defaults={"deadline": task.deadline}
+            )
+            self.tasks.append(task)
+        TaskAssignment.objects.filter(task=self.tasks[0]).update(status="S")
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.intern).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def titles(self, query=""):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return [row["title"] for row in response.json()["data"]["docs"]]
+
+    def test_deadline_order(self):
+        self.assertEqual(self.titles(), ["Due in 1", "Due in 2", "Due in 3"])
+        self.assertEqual(
+            self.titles("?ordering=-deadline"), ["Due in 3", "Due in 2", "Due in 1"]
+        )
+
+    def test_progress_filter(self):
+        self.assertEqual(self.titles("?progress=A"), ["Due in 1", "Due in 2"])
+        self.assertEqual(self.titles("?progress=S&status=O"), ["Due in 3"])
+
+    def test_uncovered_ordering(self):
+        response = self.client.get(self.url + "?ordering=created_at")
+        self.assertEqual(response.status_code, 422)
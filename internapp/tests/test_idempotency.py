@@ -0,0 +1,108 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from internapp.models import User, Task, IdempotencyKey
+
+TASK = {
+    "title": "Task",
+    "description": "Task",
+    "deadline": "2030-01-01T00:00:00Z",
+}
+
+
+class IdempotencyTests(TestCase):
+    url = "/api/v1/task-create/"
+
+    def setUp(self):
+        self.supervisor = User.objects.create(full_name="Supervisor", role="S")
+        self.client = APIClient()
+        token = RefreshToken.for_user(self.supervisor).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def post(self, data=TASK, key="key-1"):
+        return self.client.post(self.url, data, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post()
+        self.assertEqual(first.status_code, 200)
+        second = self.post()
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second["Idempotent-Replayed"], "true")
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(Task.objects.count(), 1)
+        # Another key is another request.
+        self.assertEqual(self.post(dict(TASK, title="Other"), "key-2").status_code, 200)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_key_reused_for_another_request(self):
+        self.post()
+        response = self.post(dict(TASK, title="Other"))
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_retry_waits_for_the_first_request(self):
+        self.post()
+        row = IdempotencyKey.objects.get()
+        stored = (row.status_code, row.response)
+        IdempotencyKey.objects.update(status_code=None, response=None)
+
+        polls = []
+
+        def finish(seconds):
+            polls.append(seconds)
+            if len(polls) == 3:
+                IdempotencyKey.objects.update(status_code=stored[0], response=stored[1])
+
+        with mock.patch(
+            "internapp.idempotency.time.sleep", side_effect=finish
+        ), CaptureQueriesContext(connection) as queries:
+            response = self.post()
+        self.assertEqual(len(polls), 3)
+        # Only the first attempt to claim the key writes.
+        writes = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith(("INSERT", "DELETE"))
+            and "idempotencykey" in query["sql"]
+        ]
+        self.assertEqual(len(writes), 2)
+        self.assertEqual(response["Idempotent-Replayed"], "true")
+        self.assertEqual(response.json(), stored[1])
+        self.assertEqual(Task.objects.count(), 1)
+
+    @override_settings(IDEMPOTENCY_WAIT_SECONDS=-1)
+    def test_retry_gives_up_on_a_running_request(self):
+        self.post()
+        IdempotencyKey.objects.update(status_code=None, response=None)
+        response = self.post()
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_abandoned_claim_is_taken_over(self):
+        self.post()
+        IdempotencyKey.objects.update(
+            status_code=None,
+            response=None,
+            created_at=timezone.now() - timedelta(minutes=5),
+        )
+        Task.objects.all().delete()
+        self.assertEqual(self.post().status_code, 200)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_server_error_releases_the_key(self):
+        with mock.patch(
+            "internapp.api.serializers.accounts.TaskCreateSerializer.create",
+            side_effect=RuntimeError("database went away"),
+        ):
+            with self.assertRaises(RuntimeError):
+                self.post()
+        self.assertFalse(IdempotencyKey.objects.exists())
+        self.assertEqual(self.post().status_code, 200)
+        self.assertEqual(Task.objects.count(), 1)
@@ -0,0 +1,48 @@
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from internapp import outbox
+from internapp.models import User, OutboxEvent
+
+
+class RefusingBackend(BaseEmailBackend):
+    def open(self):
+        raise ConnectionRefusedError("SMTP server refused the connection")
+
+    def send_messages(self, messages):
+        raise AssertionError("Nothing is sent without a connection")
+
+
+@override_settings(
+    EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    OUTBOX_MAX_ATTEMPTS=2,
+)
+class DeliverTests(TestCase):
+    def setUp(self):
+        self.intern = User.objects.create(
+            full_name="Intern", role="I", email="intern@example.com"
+        )
+        self.other = User.objects.create(
+            full_name="Other", role="I", email="other@example.com"
+        )
+        outbox.record("task_assigned", [self.intern, self.other], title="T", deadline=1)
+
+    def test_one_digest_per_recipient(self):
+        self.assertEqual(outbox.deliver(outbox.claim(10)), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertFalse(OutboxEvent.objects.exclude(status="D").exists())
+
+    @override_settings(EMAIL_BACKEND="internapp.tests.test_outbox.RefusingBackend")
+    def test_connection_failure_fails_the_batch(self):
+        self.assertEqual(outbox.deliver(outbox.claim(10)), (0, 2))
+        for event in OutboxEvent.objects.all():
+            self.assertEqual(event.status, "P")
+            self.assertIn("refused the connection", event.last_error)
+        # The events are retried, then given up on.
+        OutboxEvent.objects.update(available_at=timezone.now())
+        self.assertEqual(outbox.deliver(outbox.claim(10)), (0, 2))
+        self.assertEqual(
+            set(OutboxEvent.objects.values_list("status", flat=True)), {"F"}
+        )
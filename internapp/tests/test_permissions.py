@@ -0,0 +1,64 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from internapp.api.viewsets.accounts import TaskCreateViewSet, TaskListViewSet
+from internapp.models import User
+from internapp.permissions import PERMISSION_MATRIX
+
+
+class RolePermissionTests(TestCase):
+    url = "/api/v1/task-create/"
+
+    def client_for(self, **fields):
+        user = User.objects.create(full_name="Someone", **fields)
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def test_views_are_bound(self):
+        self.assertEqual(
+            TaskCreateViewSet.role_masks, PERMISSION_MATRIX.views["task-create"]
+        )
+        self.assertEqual(
+            TaskListViewSet.role_masks["HEAD"],
+            PERMISSION_MATRIX.views["task-list-supervisor"]["GET"],
+        )
+
+    def test_allowed_role(self):
+        response = self.client_for(role="S").post(self.url, {}, format="json")
+        self.assertNotEqual(response.status_code, 401)
+
+    def test_other_role(self):
+        response = self.client_for(role="I").post(self.url, {}, format="json")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(
+            response.json()["message"], "Not authenticated for supervisor request"
+        )
+
+    def test_blocked_user(self):
+        client = self.client_for(role="S", is_blocked=True)
+        response = client.get("/api/v1/task-list-supervisor/")
+        self.assertEqual(response.status_code, 417)
+        # Role views check the role only, as the per-role classes did.
+        response = client.post(self.url, {}, format="json")
+        self.assertNotIn(response.status_code, (401, 417))
+
+    def test_anonymous(self):
+        response = APIClient().post(self.url, {}, format="json")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(
+            response.json()["message"], "Not authenticated for supervisor request"
+        )
+        response = APIClient().get("/api/v1/task-list-supervisor/")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()["message"], "Not Authenticated")
+
+    def test_any_role_view(self):
+        response = self.client_for(role="I").get("/api/v1/task-list-supervisor/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_unlisted_method(self):
+        response = self.client_for(role="S").put(self.url, {}, format="json")
+        self.assertEqual(response.status_code, 401)
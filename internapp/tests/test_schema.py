@@ -0,0 +1,38 @@
+from django.test import SimpleTestCase, TestCase
+
+from common.schema import accepts_gzip
+
+
+class AcceptsGzipTests(SimpleTestCase):
+    def test_listed(self):
+        self.assertTrue(accepts_gzip("gzip"))
+        self.assertTrue(accepts_gzip("br, GZIP;q=0.5"))
+
+    def test_refused(self):
+        self.assertFalse(accepts_gzip(""))
+        self.assertFalse(accepts_gzip("br"))
+        self.assertFalse(accepts_gzip("gzip;q=0"))
+        self.assertFalse(accepts_gzip("gzip; q=0.0, br"))
+
+    def test_wildcard(self):
+        self.assertTrue(accepts_gzip("deflate, *"))
+        self.assertFalse(accepts_gzip("*;q=0"))
+        self.assertFalse(accepts_gzip("*, gzip;q=0"))
+
+
+class SchemaViewTests(TestCase):
+    url = "/api/v1/doc/schema/"
+
+    def test_gzip_refused_with_zero_quality(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip;q=0")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_gzip_served(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        etag = response["ETag"]
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
@@ -0,0 +1,40 @@
+from django.test import TestCase
+
+from internapp.models import User
+from internapp.search import UserIndex
+
+
+class UserIndexTests(TestCase):
+    def setUp(self):
+        self.ada = User.objects.create(full_name="Ada Lovelace", role="I")
+        self.index = UserIndex()
+        self.index.build()
+
+    def names(self, prefix):
+        return [user["full_name"] for user in self.index.search(prefix, 10)]
+
+    def update(self, user):
+        self.index.update(
+            {
+                "id": str(user.pk),
+                "full_name": user.full_name,
+                "email": user.email,
+                "phone": user.phone,
+                "role": user.role,
+            }
+        )
+
+    def test_updates_in_place(self):
+        keys = self.index.keys
+        alan = User.objects.create(full_name="Alan Turing", role="I")
+        self.update(alan)
+        self.assertEqual(self.names("a"), ["Ada Lovelace", "Alan Turing"])
+        self.assertEqual(self.names("tur"), ["Alan Turing"])
+        alan.full_name = "Grace Hopper"
+        self.update(alan)
+        self.assertEqual(self.names("a"), ["Ada Lovelace"])
+        self.assertEqual(self.names("hop"), ["Grace Hopper"])
+        self.index.remove(str(alan.pk))
+        self.assertEqual(self.names("g"), [])
+        self.assertIs(self.index.keys, keys)
+        self.assertEqual(len(keys), 2)
@@ -0,0 +1,133 @@
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from common.routers import use_shard
+from internapp.models import (
+    User,
+    Cohort,
+    Task,
+    Organization,
+    OrganizationMember,
+)
+from internapp.tenants import (
+    flush_tables,
+    move_organization,
+    registration_shard,
+    tenant_models,
+)
+
+SHARD = next(iter(settings.SHARDS), None)
+
+
+@skipUnless(SHARD, "Set DB_SHARDS to run the shard tests.")
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class ShardTests(TestCase):
+    databases = {"default", *settings.SHARDS[:1]}
+
+    def setUp(self):
+        cache.clear()
+
+    def add_organization(self, shard):
+        # The default shard's organization comes with the migrations.
+        organization, _ = Organization.objects.get_or_create(
+            shard=shard, defaults={"name": "Acme", "slug": "acme"}
+        )
+        with use_shard(shard):
+            supervisor = User.objects.create(full_name="Supervisor", role="S")
+            intern = User.objects.create(full_name="Intern", role="I")
+            task = Task.objects.create(
+                title="Task",
+                description="Task",
+                deadline=timezone.now(),
+                creator=supervisor,
+                status="O",
+            )
+            task.contributors.add(intern, through_defaults={"deadline": task.deadline})
+            cohort = Cohort.objects.create(name="Intake", creator=supervisor)
+            cohort.members.add(intern)
+        # The directory is filled in on commit, which tests never reach.
+        for user in (supervisor, intern):
+            OrganizationMember.objects.create(
+                user_id=user.pk, organization=organization
+            )
+        return organization, intern
+
+    def client_for(self, user):
+        client = APIClient()
+        token = RefreshToken.for_user(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+        return client
+
+    def intern_titles(self, user):
+        response = self.client_for(user).get("/api/v1/task-list-intern/")
+        self.assertEqual(response.status_code, 200)
+        return [row["title"] for row in response.json()["data"]["docs"]]
+
+    def test_requests_use_the_organization_shard(self):
+        organization, intern = self.add_organization(SHARD)
+        self.assertFalse(Task.objects.using("default").exists())
+        self.assertEqual(self.intern_titles(intern), ["Task"])
+
+    def test_read_only_refuses_writes(self):
+        organization, intern = self.add_organization(SHARD)
+        Organization.objects.update(read_only=True)
+        client = self.client_for(intern)
+        self.assertEqual(client.get("/api/v1/task-list-intern/").status_code, 200)
+        response = client.post("/api/v1/task-create/", {}, format="json")
+        self.assertEqual(response.status_code, 503)
+
+    def test_move(self):
+        organization, intern = self.add_organization("default")
+        copied = move_organization(organization, SHARD, wait=False)
+        self.assertEqual(copied["internapp.User"], 2)
+        self.assertEqual(copied["internapp.Task"], 1)
+        self.assertEqual(copied["internapp.TaskAssignment"], 1)
+        self.assertEqual(copied["internapp.Cohort_members"], 1)
+        self.assertEqual((organization.shard, organization.read_only), (SHARD, False))
+        self.assertEqual(Task.objects.using(SHARD).get().title, "Task")
+        # Registrations without a slug follow the default organization.
+        self.assertEqual(registration_shard(None), SHARD)
+        # Requests follow once the workers' cached shard expires.
+        cache.clear()
+        flush_tables(tenant_models(), "default")
+        self.assertEqual(self.intern_titles(intern), ["Task"])
+
+    def test_failed_move_stays_put(self):
+        organization, intern = self.add_organization("default")
+        with mock.patch(
+            "internapp.tenants.copy_table", side_effect=RuntimeError("disk full")
+        ):
+            with self.assertRaises(RuntimeError):
+                move_organization(organization, SHARD, wait=False)
+        organization.refresh_from_db()
+        self.assertEqual(
+            (organization.shard, organization.read_only), ("default", False)
+        )
+
+    def test_move_to_a_used_shard(self):
+        organization, intern = self.add_organization("default")
+        User.objects.using(SHARD).create(full_name="Someone", role="I")
+        with self.assertRaises(ValueError):
+            move_organization(organization, SHARD, wait=False)
+
+    def test_move_of_a_shard_with_other_users(self):
+        organization, intern = self.add_organization("default")
+        # Not in the organization's directory, so it would be copied along.
+        User.objects.create(full_name="Stray", role="I")
+        with self.assertRaises(ValueError):
+            move_organization(organization, SHARD, wait=False)
+        self.assertFalse(User.objects.using(SHARD).exists())
+
+    def test_purge_of_a_shard_in_use(self):
+        self.add_organization("default")
+        with self.assertRaises(ValueError):
+            flush_tables(tenant_models(), "default")
+        self.assertTrue(Task.objects.exists())
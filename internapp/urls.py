@@ -7,18 +7,54 @@ from internapp.api.viewsets.accounts import (
     TaskEditViewSet,
     SubmitTaskViewSet,
     SubmitTaskEditViewSet,
+    SubmitTaskGradeViewSet,
     TaskSubmitListViewSet,
     TaskListInternViewSet,
+    ArchivedTaskListViewSet,
+    SyncViewSet,
+    UserSearchViewSet,
+    SubmissionReportViewSet,
 )
+from internapp.api.viewsets.events import EventTokenViewSet, event_stream
+from internapp.permissions import PERMISSION_MATRIX
 
 urlpatterns = [
-    path("account-registration/", UserViewSet.as_view()),
-    path("account-login/", LoginViewSet.as_view()),
-    path("task-create/", TaskCreateViewSet.as_view()),
-    path("task-list-supervisor/", TaskListViewSet.as_view()),
-    path("task-edit/<str:pk>/", TaskEditViewSet.as_view()),
-    path("submit-task/", SubmitTaskViewSet.as_view()),
-    path("submit-task-edit/<str:pk>", SubmitTaskEditViewSet.as_view()),
-    path("submitted-task-list/", TaskSubmitListViewSet.as_view()),
-    path("task-list-intern/", TaskListInternViewSet.as_view()),
+    path("account-registration/", UserViewSet.as_view(), name="account-registration"),
+    path("account-login/", LoginViewSet.as_view(), name="account-login"),
+    path("task-create/", TaskCreateViewSet.as_view(), name="task-create"),
+    path(
+        "task-list-supervisor/", TaskListViewSet.as_view(), name="task-list-supervisor"
+    ),
+    path("task-edit/<str:pk>/", TaskEditViewSet.as_view(), name="task-edit"),
+    path("submit-task/", SubmitTaskViewSet.as_view(), name="submit-task"),
+    path(
+        "submit-task-edit/<str:pk>",
+        SubmitTaskEditViewSet.as_view(),
+        name="submit-task-edit",
+    ),
+    path(
+        "submit-task-grade/", SubmitTaskGradeViewSet.as_view(), name="submit-task-grade"
+    ),
+    path(
+        "submitted-task-list/",
+        TaskSubmitListViewSet.as_view(),
+        name="submitted-task-list",
+    ),
+    path("task-list-intern/", TaskListInternViewSet.as_view(), name="task-list-intern"),
+    path(
+        "archived-task-list/",
+        ArchivedTaskListViewSet.as_view(),
+        name="archived-task-list",
+    ),
+    path("events/", event_stream, name="events"),
+    path("events/token/", EventTokenViewSet.as_view(), name="events-token"),
+    path("sync/", SyncViewSet.as_view(), name="sync"),
+    path("user-search/", UserSearchViewSet.as_view(), name="user-search"),
+    path(
+        "submission-report/",
+        SubmissionReportViewSet.as_view(),
+        name="submission-report",
+    ),
 ]
+
+PERMISSION_MATRIX.bind(urlpatterns)